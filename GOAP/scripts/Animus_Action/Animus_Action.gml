@@ -20,6 +20,9 @@ function Animus_Action(name, preconditions, effects, cost) constructor {
     preconditions = Animus_Predicate.normalize_list(preconditions, "condition");
     effects = Animus_Predicate.normalize_list(effects, "effect");
 
+    // a callable cost reads the state by key: the planner keeps struct states for such actions
+    cost_reads_state = Animus_Core.is_callable(cost);
+
     var cost_fn;
     if (Animus_Core.is_callable(cost)) {
         cost_fn = cost;
@@ -19,6 +19,31 @@ function Animus_Planner() constructor {
 
     last_plan = undefined;
 
+    // Optional table from tools/planner_relevance.py: per goal name, the indices of the
+    // actions that can contribute to it. Used only while the action names and the predicates it
+    // recorded (per action, and per goal) match the agent's.
+    relevance_table = undefined;
+    relevance_subsets = undefined;   // goal name -> actions for the current plan() call
+
+    // Optional registry from tools/key_registry.py (keys by index, their state_hash order and
+    // an index struct). With it, searches run on flat state arrays whenever every predicate key
+    // of the plan() call is registered and no action's cost reads the state: a clone is one
+    // array copy and hashing sorts nothing.
+    key_registry = undefined;
+
+    // Optional dispatch table from tools/predicate_compiler.py: straight-line GML functions per
+    // action (preconditions, effects) and per goal (heuristic). plan() binds each to its action or
+    // goal while the predicates recorded at generation still match, replacing the interpreted checks.
+    compiled_predicates = undefined;
+
+    // Optional tables from tools/planner_heuristics.py: a relaxed heuristic (h_max, h_add or
+    // landmarks) over the domain's predicates, used in place of counting unmet desired effects
+    // while its action names match the agent's (and, for flat states, all its keys are registered),
+    // for the goals whose desired effects are still the ones it was generated from.
+    heuristic_table = undefined;
+    heuristic_bound = undefined;     // heuristic_table for the current plan() call, or undefined
+    heuristic_goals = undefined;     // goal name -> its entry of heuristic_bound.goals, if still current
+
     var build_initial_state = function(memory, referenced_keys) {
         var state = {};
         if (is_struct(memory) && Animus_Core.is_callable(memory.keys)) {
@@ -35,6 +60,12 @@ function Animus_Planner() constructor {
     };
 
     var clone_state = function(state) {
+        if (is_array(state)) {
+            var count = array_length(state);
+            var flat = array_create(count);
+            array_copy(flat, 0, state, 0, count);
+            return flat;
+        }
         var copy = {};
         if (!is_struct(state)) {
             return copy;
@@ -58,7 +89,31 @@ function Animus_Planner() constructor {
         return copy;
     };
 
-    var state_hash = function(state) {
+    var state_hash = function(state, segments) {
+        if (is_array(state)) {
+            // same text as for a struct: present keys in sorted order, keys outside the
+            // registry as constant "key:value" segments (slot -1)
+            var builder = "";
+            var first = true;
+            var segment_count = array_length(segments);
+            for (var s = 0; s < segment_count; ++s) {
+                var segment = segments[s];
+                var part = segment.text;
+                if (segment.slot >= 0) {
+                    var slot_value = state[segment.slot];
+                    if (is_struct(slot_value) && slot_value == Animus_Predicate.absent) {
+                        continue;
+                    }
+                    part += string(slot_value);
+                }
+                if (!first) {
+                    builder += "|";
+                }
+                builder += part;
+                first = false;
+            }
+            return builder;
+        }
         if (!is_struct(state)) {
             return "{}";
         }
@@ -80,15 +135,131 @@ function Animus_Planner() constructor {
         return builder;
     };
 
+    var relaxed_estimate = function(table, goal, state) {
+        // heuristic_bound's estimate, or undefined for a goal not in heuristic_goals. Never 0 while
+        // a desired effect is unmet (search_plan takes h == 0 as the goal test); 100000 when one
+        // has no achiever.
+        var targets = variable_struct_get(heuristic_goals, goal.name);
+        if (is_undefined(targets)) {
+            return undefined;
+        }
+        var preds = table.preds;
+        var flat = is_array(state);
+        var unmet = [];
+        var target_count = array_length(targets);
+        for (var i = 0; i < target_count; ++i) {
+            var met = flat ? Animus_Predicate.evaluate_flat(state, preds[targets[i]]) : Animus_Predicate.evaluate(state, preds[targets[i]]);
+            if (!met) {
+                array_push(unmet, targets[i]);
+            }
+        }
+        var unmet_count = array_length(unmet);
+        if (unmet_count == 0) {
+            return 0;
+        }
+        var pred_count = array_length(preds);
+        var h = 0;
+
+        if (table.mode == "landmarks") {
+            // unmet desired effects, then (transitively) the unmet preconditions shared by all
+            // achievers of an unmet landmark, each at its cheapest achiever's cost
+            var seen = array_create(pred_count, false);
+            var stack = [];
+            for (var u = 0; u < unmet_count; ++u) {
+                seen[unmet[u]] = true;
+                array_push(stack, unmet[u]);
+            }
+            while (array_length(stack) > 0) {
+                var p = array_pop(stack);
+                if (table.min_cost[p] < 0) {
+                    return 100000;
+                }
+                h += table.min_cost[p];
+                var needs = table.needs[p];
+                var need_count = array_length(needs);
+                for (var n = 0; n < need_count; ++n) {
+                    var q = needs[n];
+                    if (seen[q]) {
+                        continue;
+                    }
+                    seen[q] = true;
+                    var holds = flat ? Animus_Predicate.evaluate_flat(state, preds[q]) : Animus_Predicate.evaluate(state, preds[q]);
+                    if (!holds) {
+                        array_push(stack, q);
+                    }
+                }
+            }
+            return max(h, 0.001);
+        }
+
+        // h_max / h_add: relaxed cost of every predicate, iterated to a fixed point
+        var add = table.mode == "add";
+        var cost = array_create(pred_count, infinity);
+        for (var k = 0; k < pred_count; ++k) {
+            var now = flat ? Animus_Predicate.evaluate_flat(state, preds[k]) : Animus_Predicate.evaluate(state, preds[k]);
+            if (now) {
+                cost[k] = 0;
+            }
+        }
+        var pre = table.pre;
+        var achieves = table.achieves;
+        var costs = table.costs;
+        var action_count = array_length(pre);
+        var changed = true;
+        while (changed) {
+            changed = false;
+            for (var a = 0; a < action_count; ++a) {
+                var conditions = pre[a];
+                var condition_count = array_length(conditions);
+                var base = 0;
+                for (var c = 0; c < condition_count && base < infinity; ++c) {
+                    base = add ? base + cost[conditions[c]] : max(base, cost[conditions[c]]);
+                }
+                if (base == infinity) {
+                    continue;
+                }
+                var value = base + costs[a];
+                var out = achieves[a];
+                var out_count = array_length(out);
+                for (var o = 0; o < out_count; ++o) {
+                    if (value < cost[out[o]]) {
+                        cost[out[o]] = value;
+                        changed = true;
+                    }
+                }
+            }
+        }
+        for (var t = 0; t < unmet_count; ++t) {
+            var target_cost = cost[unmet[t]];
+            if (target_cost == infinity) {
+                return 100000;
+            }
+            h = add ? h + target_cost : max(h, target_cost);
+        }
+        return max(h, 0.001);
+    };
+
     var heuristic_to_goal = function(goal, state) {
         if (!is_struct(goal) || !variable_struct_exists(goal, "desired_effects")) {
             return 0;
         }
+        if (is_struct(heuristic_bound)) {
+            var estimate = relaxed_estimate(heuristic_bound, goal, state);
+            if (!is_undefined(estimate)) {
+                return estimate;
+            }
+        }
+        var compiled = goal[$ "compiled_heuristic"];
+        if (!is_undefined(compiled)) {
+            return compiled(state);
+        }
         var desired = goal.desired_effects;
         var unsatisfied = 0;
+        var flat = is_array(state);
         var len = array_length(desired);
         for (var i = 0; i < len; ++i) {
-            if (!Animus_Predicate.evaluate(state, desired[i])) {
+            var met = flat ? Animus_Predicate.evaluate_flat(state, desired[i]) : Animus_Predicate.evaluate(state, desired[i]);
+            if (!met) {
                 unsatisfied += 1;
             }
         }
@@ -99,10 +270,16 @@ function Animus_Planner() constructor {
         if (!is_struct(action) || !variable_struct_exists(action, "preconditions")) {
             return false;
         }
+        var compiled = action[$ "compiled_applicable"];
+        if (!is_undefined(compiled)) {
+            return compiled(state);
+        }
         var preconditions = action.preconditions;
+        var flat = is_array(state);
         var len = array_length(preconditions);
         for (var i = 0; i < len; ++i) {
-            if (!Animus_Predicate.evaluate(state, preconditions[i])) {
+            var met = flat ? Animus_Predicate.evaluate_flat(state, preconditions[i]) : Animus_Predicate.evaluate(state, preconditions[i]);
+            if (!met) {
                 return false;
             }
         }
@@ -110,11 +287,186 @@ function Animus_Planner() constructor {
     };
 
     var apply_action_effects = function(state, action) {
+        var compiled = action[$ "compiled_apply"];
         var effects = action.effects;
         var len = array_length(effects);
+        if (!is_undefined(compiled)) {
+            compiled(state);
+        } else if (is_array(state)) {
+            for (var i = 0; i < len; ++i) {
+                Animus_Predicate.apply_effect_flat(state, effects[i]);
+            }
+        } else {
+            for (var j = 0; j < len; ++j) {
+                Animus_Predicate.apply_effect(state, effects[j]);
+            }
+        }
+    };
+
+    var slot_predicates = function(predicates, index) {
+        var len = array_length(predicates);
         for (var i = 0; i < len; ++i) {
-            Animus_Predicate.apply_effect(state, effects[i]);
+            var pred = predicates[i];
+            if (!variable_struct_exists(index, pred.key)) {
+                return false;
+            }
+            pred.slot = variable_struct_get(index, pred.key);
+        }
+        return true;
+    };
+
+    var same_predicate = function(a, b) {
+        return a.key == b.key && a.op == b.op && typeof(a.value) == typeof(b.value) && a.value == b.value;
+    };
+
+    var predicates_match = function(predicates, signature) {
+        // true when `signature`, a generated table's { key, op, value } list, holds exactly these
+        // predicates in this order (undefined, for values a table cannot inline, never matches)
+        var len = array_length(predicates);
+        var match = is_array(signature) && array_length(signature) == len;
+        for (var i = 0; match && i < len; ++i) {
+            match = same_predicate(predicates[i], signature[i]);
+        }
+        return match;
+    };
+
+    var bind_compiled = function(actions, prioritized_goals, flat) {
+        // Sets compiled_applicable/compiled_apply on each action and compiled_heuristic on each
+        // goal for this call. Each is compiled_predicates' function only when the table lists the
+        // action (same index and name) or goal with exactly the predicates it has now and, for
+        // flat states, was built on this key registry; otherwise undefined, so it is interpreted.
+        var table = compiled_predicates;
+        var len = array_length(actions);
+        var use = is_struct(table) && is_array(table.actions) && array_length(table.actions) == len;
+        if (use && flat) {
+            use = is_array(table.registry) && array_equals(table.registry, key_registry.keys);
+        }
+        var applicable = use ? (flat ? table.flat_applicable : table.applicable) : undefined;
+        var apply = use ? (flat ? table.flat_apply : table.apply) : undefined;
+        var heuristics = use ? (flat ? table.flat_goals : table.goals) : undefined;
+        for (var j = 0; j < len; ++j) {
+            var action = actions[j];
+            var signature = (use && table.actions[j] == action.name) ? table.signatures[j] : [undefined, undefined];
+            action.compiled_applicable = predicates_match(action.preconditions, signature[0]) ? applicable[j] : undefined;
+            action.compiled_apply = predicates_match(action.effects, signature[1]) ? apply[j] : undefined;
+        }
+        var goal_count = array_length(prioritized_goals);
+        for (var k = 0; k < goal_count; ++k) {
+            var goal = prioritized_goals[k].goal;
+            var expected = use ? variable_struct_get(table.goal_signatures, goal.name) : undefined;
+            goal.compiled_heuristic = predicates_match(goal.desired_effects, expected) ? variable_struct_get(heuristics, goal.name) : undefined;
+        }
+    };
+
+    var targets_match = function(desired, preds, targets) {
+        // true when the table predicates at `targets` are exactly the goal's desired effects
+        var desired_count = array_length(desired);
+        var target_count = array_length(targets);
+        var match = true;
+        for (var i = 0; match && i < desired_count; ++i) {
+            match = false;
+            for (var t = 0; !match && t < target_count; ++t) {
+                match = same_predicate(desired[i], preds[targets[t]]);
+            }
+        }
+        for (var u = 0; match && u < target_count; ++u) {
+            match = false;
+            for (var d = 0; !match && d < desired_count; ++d) {
+                match = same_predicate(desired[d], preds[targets[u]]);
+            }
+        }
+        return match;
+    };
+
+    var bind_heuristic = function(actions, prioritized_goals, flat) {
+        // heuristic_bound for this call: heuristic_table when it lists these actions by name and,
+        // for flat states, every one of its predicate keys is in the key registry. Its goal entries
+        // decide h == 0, so heuristic_goals keeps only those still equal to the goal's desired
+        // effects; other goals use the interpreted count.
+        heuristic_bound = undefined;
+        heuristic_goals = {};
+        var table = heuristic_table;
+        var len = array_length(actions);
+        var use = is_struct(table) && is_array(table[$ "actions"]) && array_length(table.actions) == len;
+        for (var i = 0; use && i < len; ++i) {
+            use = table.actions[i] == actions[i].name;
+        }
+        if (use && flat) {
+            use = slot_predicates(table.preds, key_registry.index);
+        }
+        if (use) {
+            heuristic_bound = table;
+            var goal_count = array_length(prioritized_goals);
+            for (var k = 0; k < goal_count; ++k) {
+                var goal = prioritized_goals[k].goal;
+                var targets = variable_struct_get(table.goals, goal.name);
+                if (is_array(targets) && targets_match(goal.desired_effects, table.preds, targets)) {
+                    variable_struct_set(heuristic_goals, goal.name, targets);
+                }
+            }
+        }
+    };
+
+    var intern_state = function(registry, actions, prioritized_goals, state) {
+        // { state: flat array, segments } for the search, or undefined if a predicate key is
+        // not registered or an action's cost may read the state (cost(state) expects a struct;
+        // actions not built by Animus_Action count as such). Memory keys outside the registry
+        // are never written by an action, so each is one constant hash segment, merged into the
+        // registry's key order.
+        var index = registry.index;
+        var action_count = array_length(actions);
+        for (var i = 0; i < action_count; ++i) {
+            var action = actions[i];
+            if (!variable_struct_exists(action, "cost_reads_state") || action.cost_reads_state) {
+                return undefined;
+            }
+            if (!slot_predicates(action.preconditions, index) || !slot_predicates(action.effects, index)) {
+                return undefined;
+            }
+        }
+        var goal_count = array_length(prioritized_goals);
+        for (var gi = 0; gi < goal_count; ++gi) {
+            if (!slot_predicates(prioritized_goals[gi].goal.desired_effects, index)) {
+                return undefined;
+            }
+        }
+
+        var names = registry.keys;
+        var flat = array_create(array_length(names), Animus_Predicate.absent);
+        var extra = [];
+        var state_keys = variable_struct_get_names(state);
+        var key_count = array_length(state_keys);
+        for (var k = 0; k < key_count; ++k) {
+            var key = state_keys[k];
+            if (variable_struct_exists(index, key)) {
+                flat[variable_struct_get(index, key)] = variable_struct_get(state, key);
+            } else {
+                array_push(extra, key);
+            }
+        }
+        array_sort(extra, function(a, b) {
+            if (a == b) return 0;
+            return (a < b) ? -1 : 1;
+        });
+
+        var order = registry.hash_order;
+        var order_len = array_length(order);
+        var extra_len = array_length(extra);
+        var segments = [];
+        var a = 0;
+        var b = 0;
+        while (a < order_len || b < extra_len) {
+            if (b < extra_len && (a >= order_len || extra[b] < names[order[a]])) {
+                var extra_key = extra[b];
+                array_push(segments, { text: extra_key + ":" + string(variable_struct_get(state, extra_key)), slot: -1 });
+                b += 1;
+            } else {
+                var slot = order[a];
+                array_push(segments, { text: names[slot] + ":", slot: slot });
+                a += 1;
+            }
         }
+        return { state: flat, segments: segments };
     };
 
     var add_keys_from_action = function(action, referenced_keys) {
@@ -151,6 +503,50 @@ function Animus_Planner() constructor {
         return plan_struct;
     };
 
+    var bind_relevance = function(actions, prioritized_goals) {
+        // relevance_subsets for this call: goal name -> its actions, for the goals relevance_table
+        // lists with the desired effects they have now, and only when the table's action names
+        // and predicates still match. Checked on every call: actions edited in place since the
+        // table was generated could otherwise be pruned although a goal now needs them.
+        relevance_subsets = undefined;
+        var table = relevance_table;
+        var len = array_length(actions);
+        var matches = is_struct(table) && is_array(table[$ "actions"]) && array_length(table.actions) == len
+            && is_array(table[$ "signatures"]) && array_length(table.signatures) == len
+            && is_struct(table[$ "goals"]) && is_struct(table[$ "goal_signatures"]);
+        for (var i = 0; matches && i < len; ++i) {
+            matches = table.actions[i] == actions[i].name
+                && predicates_match(actions[i].preconditions, table.signatures[i][0])
+                && predicates_match(actions[i].effects, table.signatures[i][1]);
+        }
+        if (matches) {
+            relevance_subsets = {};
+        }
+        var goal_count = matches ? array_length(prioritized_goals) : 0;
+        for (var k = 0; k < goal_count; ++k) {
+            var goal = prioritized_goals[k].goal;
+            var indices = variable_struct_get(table.goals, goal.name);
+            var expected = variable_struct_get(table.goal_signatures, goal.name);
+            if (is_array(indices) && predicates_match(goal.desired_effects, expected)) {
+                var subset = [];
+                var count = array_length(indices);
+                for (var j = 0; j < count; ++j) {
+                    array_push(subset, actions[indices[j]]);
+                }
+                variable_struct_set(relevance_subsets, goal.name, subset);
+            }
+        }
+    };
+
+    var goal_actions = function(goal, actions) {
+        // the actions to search `goal` over: its bound relevance subset, else all of them
+        if (!is_struct(relevance_subsets)) {
+            return actions;
+        }
+        var subset = variable_struct_get(relevance_subsets, goal.name);
+        return is_undefined(subset) ? actions : subset;
+    };
+
     var should_reuse_plan = function(plan, memory) {
         if (!reuse_policy.allow_reuse) {
             return false;
@@ -195,6 +591,7 @@ function Animus_Planner() constructor {
         var referenced_keys = request.referenced_keys;
         var start_time = request.start_time;
         var memory = request.memory;
+        var segments = request.segments;
 
         var open = ds_priority_create();
         var open_best = ds_map_create();
@@ -217,7 +614,7 @@ function Animus_Planner() constructor {
         };
         start_node.f = start_node.g + start_node.h;
         ds_priority_add(open, start_node, start_node.f);
-        ds_map_add(open_best, state_hash(start_node.state), start_node.g);
+        ds_map_add(open_best, state_hash(start_node.state, segments), start_node.g);
         nodes_generated += 1;
 
         while (!ds_priority_empty(open)) {
@@ -242,7 +639,7 @@ function Animus_Planner() constructor {
                 break;
             }
 
-            var hash = state_hash(current.state);
+            var hash = state_hash(current.state, segments);
             if (ds_map_exists(closed, hash)) {
                 ds_map_replace(closed, hash, true);
             } else {
@@ -267,7 +664,7 @@ function Animus_Planner() constructor {
                 add_keys_from_action(action, referenced_keys);
                 var next_state = clone_state(current.state);
                 apply_action_effects(next_state, action);
-                var next_hash = state_hash(next_state);
+                var next_hash = state_hash(next_state, segments);
                 if (ds_map_exists(closed, next_hash)) {
                     continue;
                 }
@@ -407,6 +804,19 @@ function Animus_Planner() constructor {
             return (a.priority > b.priority) ? -1 : 1;
         });
 
+        var search_state = initial_state;
+        var segments = undefined;
+        if (is_struct(key_registry)) {
+            var interned = intern_state(key_registry, normalized_actions, prioritized_goals, initial_state);
+            if (is_struct(interned)) {
+                search_state = interned.state;
+                segments = interned.segments;
+            }
+        }
+        bind_compiled(normalized_actions, prioritized_goals, is_array(search_state));
+        bind_heuristic(normalized_actions, prioritized_goals, is_array(search_state));
+        bind_relevance(normalized_actions, prioritized_goals);
+
         var best_plan = undefined;
         var start_time = current_time;
 
@@ -437,8 +847,9 @@ function Animus_Planner() constructor {
 
             var request = {
                 goal: goal,
-                actions: normalized_actions,
-                state: initial_state,
+                actions: goal_actions(goal, normalized_actions),
+                state: search_state,
+                segments: segments,
                 referenced_keys: referenced_keys,
                 start_time: start_time,
                 memory: memory
@@ -152,6 +152,42 @@ function Animus_Predicate() constructor {
         }
     };
 
+    /// @desc Marks a slot of a flat (key-interned) state whose key the state does not hold.
+    static absent = { animus_absent: true };
+
+    static _flat_has = function(values, predicate) {
+        var lhs = values[predicate.slot];
+        return !(is_struct(lhs) && lhs == absent);
+    };
+
+    /// @desc Evaluates a predicate against a flat state array (see Animus_Planner.key_registry).
+    /// @param {Array} values
+    /// @param {Struct} predicate  // with `slot`, its key's registry index
+    /// @returns {Bool}
+    static evaluate_flat = function(values, predicate) {
+        var present = _flat_has(values, predicate);
+        var lhs = present ? values[predicate.slot] : undefined;
+        switch (predicate.op) {
+            case "eq": return lhs == predicate.value;
+            case "ne": return lhs != predicate.value;
+            case "gt": return is_real(lhs) && lhs > predicate.value;
+            case "ge": return is_real(lhs) && lhs >= predicate.value;
+            case "lt": return is_real(lhs) && lhs < predicate.value;
+            case "le": return is_real(lhs) && lhs <= predicate.value;
+            case "unset": return !present;
+            case "has": return present;
+            default: return lhs == predicate.value;
+        }
+    };
+
+    /// @desc Applies a predicate effect to a flat state array.
+    /// @param {Array} values
+    /// @param {Struct} predicate  // with `slot`
+    /// @returns {Void}
+    static apply_effect_flat = function(values, predicate) {
+        values[@ predicate.slot] = (predicate.op == "unset") ? absent : predicate.value;
+    };
+
     /// @desc Extracts unique predicate keys referenced by an action.
     /// @param {Animus_Action} action
     /// @returns {Array}
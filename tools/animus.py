@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+animus.py — one entry point for the Animus checks
+
+Builds a single in-memory project model (tools/animus_project.py): the file
+list, file contents, the .yyp/.yy JSON and the resource order are read once.
+It then runs every rule family against it. The standalone scripts
+(gml_linter.py, yy_integrity.py, strategy_template_enforcer.py, gml_sanity.py)
+run the same code on a project of their own.
+
+Usage:
+  # CI: linter, .yy/.yyp integrity and strategy templates in one pass
+  python tools/animus.py check --advisory strategy
+  # pick families; scope to a diff like the individual tools
+  python tools/animus.py check --only lint,yy --staged
+  python tools/animus.py check --changed-since origin/main --jobs 0
+  # accept the current lint findings; later runs report only new (and fixed) ones
+  python tools/animus.py baseline
+
+Families: lint (gml_linter), yy (yy_integrity), strategy
+(strategy_template_enforcer), sanity (gml_sanity, not run by default).
+Exit code: the highest code of the non-advisory families (1 findings, 2 config/usage errors).
+"""
+import argparse, os, pathlib, sys, time
+
+TOOLS = pathlib.Path(__file__).resolve().parent
+ROOT = TOOLS.parent
+
+FAMILIES = ["lint", "yy", "strategy", "sanity"]
+DEFAULT_FAMILIES = ["lint", "yy", "strategy"]
+
+
+def family_list(value):
+    names = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [n for n in names if n not in FAMILIES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown family: {', '.join(unknown)} (choose from {', '.join(FAMILIES)})")
+    return names
+
+
+def run_lint(project, args):
+    import gml_linter
+    forwarded = ["--jobs", str(args.jobs)] + (["--no-cache"] if args.no_cache else [])
+    forwarded += ["--no-baseline"] if args.no_baseline else []
+    return gml_linter.run(project, gml_linter.build_parser().parse_args(forwarded))
+
+
+def run_yy(project, args):
+    import yy_integrity
+    try:
+        report = yy_integrity.run(yy_integrity.load_cfg(), project, use_index=not args.no_cache,
+                                    jobs=args.jobs)
+    except SystemExit as e:
+        # die(): fatal config problem, already printed
+        return e.code if isinstance(e.code, int) else 1
+    if report.issues:
+        return 1
+    yy_integrity.info("YY/YYP integrity OK.")
+    return 0
+
+
+def run_strategy(project, args):
+    import strategy_template_enforcer
+    forwarded = (["--verbose"] if args.verbose else []) + (["--delta"] if args.strategy_delta else [])
+    return strategy_template_enforcer.run(project, strategy_template_enforcer.build_parser().parse_args(forwarded))
+
+
+def run_sanity(project, args):
+    import gml_sanity
+    return gml_sanity.run(project)
+
+
+RUNNERS = {"lint": run_lint, "yy": run_yy, "strategy": run_strategy, "sanity": run_sanity}
+
+
+def cmd_check(args):
+    from animus_project import Project
+    from git_scope import GitError, scope_from_args
+
+    try:
+        scope = scope_from_args(args, ROOT)
+    except GitError as e:
+        print(f"[animus] {e}", file=sys.stderr)
+        return 2
+    project = Project(ROOT, scope)
+    if scope is not None:
+        print(f"[animus] checking {scope.describe()}")
+
+    results = []
+    for name in args.only:
+        print(f"[animus] == {name} ==")
+        sys.stdout.flush()
+        t0 = time.perf_counter()
+        code = RUNNERS[name](project, args)
+        sys.stdout.flush()
+        results.append((name, code, time.perf_counter() - t0))
+
+    worst = 0
+    for name, code, secs in results:
+        advisory = name in args.advisory
+        state = "ok" if code == 0 else ("advisory" if advisory else "FAIL") + f" (exit {code})"
+        timing = f"  {secs * 1000:.0f} ms" if args.timings else ""
+        print(f"[animus] {name:<9} {state}{timing}")
+        if not advisory:
+            worst = max(worst, code)
+    if args.timings:
+        io = project.io_stats()
+        print(f"[animus] project: {io['listed']} files listed, {io['read']} read, {io['json']} JSON documents parsed")
+    return worst
+
+
+def cmd_baseline(args):
+    """Lint the whole tree and record every finding as the linter baseline."""
+    import gml_linter
+    from animus_project import Project
+    forwarded = ["--jobs", str(args.jobs), "--write-baseline"] + ([args.path] if args.path else [])
+    return gml_linter.run(Project(ROOT, None), gml_linter.build_parser().parse_args(forwarded))
+
+
+def main():
+    # the tools resolve configs and report paths relative to the repository root
+    os.chdir(ROOT)
+    from git_scope import add_scope_args
+
+    ap = argparse.ArgumentParser(description="Animus checks over one shared project model.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    chk = sub.add_parser("check", help="run rule families against the project")
+    chk.add_argument("--only", type=family_list, default=DEFAULT_FAMILIES,
+                     help=f"comma-separated families to run (default: {','.join(DEFAULT_FAMILIES)}; also: sanity)")
+    chk.add_argument("--advisory", type=family_list, default=[],
+                     help="families whose failures are reported but do not affect the exit code")
+    chk.add_argument("--jobs", "-j", type=int, default=1, help="lint worker processes and yy parser threads (0 = one per CPU)")
+    chk.add_argument("--no-cache", action="store_true", help="ignore the .animus_cache/ lint results and yy index")
+    chk.add_argument("--no-baseline", action="store_true", help="report every lint finding, ignoring the baseline")
+    chk.add_argument("--verbose", action="store_true", help="verbose strategy report")
+    chk.add_argument("--strategy-delta", action="store_true",
+                     help="also write the strategy suggestions delta against the previous report (enforcer --delta)")
+    chk.add_argument("--timings", action="store_true", help="print per-family wall time and project I/O counts")
+    add_scope_args(chk)
+    base = sub.add_parser("baseline", help="record the current lint findings as known (gml_linter baseline)")
+    base.add_argument("--path", help="baseline file (default: baseline_path in tools/animus_rules.yaml)")
+    base.add_argument("--jobs", "-j", type=int, default=1, help="lint worker processes (0 = one per CPU)")
+    args = ap.parse_args()
+
+    if args.cmd == "check":
+        sys.exit(cmd_check(args))
+    if args.cmd == "baseline":
+        sys.exit(cmd_baseline(args))
+
+
+if __name__ == "__main__":
+    main()
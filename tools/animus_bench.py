@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+animus_bench.py — micro-benchmarks for the Animus tooling
+
+Usage:
+  # Line-number lookup: text.count per finding vs. the shared LineIndex
+  python tools/animus_bench.py line-index --findings 50000
+  # Code-view bans: one finditer per rule vs. the prefiltered master-regex pass
+  python tools/animus_bench.py master-scan --mb 100 [--config tools/animus_rules.yaml]
+  # Single-file gml_linter startup: time to first finding (cold/warm config cache) + -X importtime
+  python tools/animus_bench.py startup [--file GOAP/scripts/.../X.gml] [--budget-ms 250]
+  # Whole tools on synthetic projects (tools/synth_project.py): throughput and peak RSS per scale,
+  # compared against a stored baseline; exit 1 on a regression beyond --tolerance
+  python tools/animus_bench.py suite [--scales 100,10000,100000] [--tools gml_linter,yy_integrity,yy_integrity_cold]
+  python tools/animus_bench.py suite --save-baseline     # record the current numbers
+  # One very large generated table: text mode vs mapped (bounded-memory) scanning; identical output required
+  python tools/animus_bench.py bigfile --mb 64
+"""
+import argparse, json, os, pathlib, random, re, statistics, subprocess, sys, time
+
+from line_index import LineIndex
+from multi_scan import MultiScanner
+
+TOOLS = pathlib.Path(__file__).resolve().parent
+ROOT = TOOLS.parent
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def gen_findings_text(findings):
+    # one trailing-whitespace finding per line, padded with ordinary code lines
+    lines = []
+    for i in range(findings):
+        lines.append(f"    var value_{i} = Animus_Core.is_callable(fn_{i}) ? fn_{i}() : {i};  ")
+        lines.append(f"    total += value_{i};")
+    return "\n".join(lines) + "\n"
+
+
+def bench_line_index(args):
+    rx_tws = re.compile(r'[ \t]+$', re.M)
+    steps = [max(1, args.findings // 4), max(1, args.findings // 2), args.findings]
+    print(f"{'findings':>10} {'count() s':>12} {'LineIndex s':>12} {'speedup':>9}")
+    for n in steps:
+        text = gen_findings_text(n)
+        starts = [m.start() for m in rx_tws.finditer(text)]
+
+        def by_count():
+            return [text.count('\n', 0, p) + 1 for p in starts]
+
+        def by_index():
+            index = LineIndex(text)
+            return [index.line_of(p) for p in starts]
+
+        t_count, lines_count = _timed(by_count)
+        t_index, lines_index = _timed(by_index)
+        if lines_count != lines_index:
+            print("[FAIL] LineIndex disagrees with text.count", file=sys.stderr)
+            return 1
+        print(f"{len(starts):>10} {t_count:>12.3f} {t_index:>12.3f} {t_count / max(t_index, 1e-9):>8.1f}x")
+    return 0
+
+
+CLEAN_LINES = [
+    "    var _count = array_length(candidates);",
+    "    for (var i = 0; i < _count; i++) {",
+    "        var action = candidates[i];",
+    "        if (!Animus_Core.is_callable(action.is_valid)) continue;",
+    "        cost += action.get_cost(agent, memory) * weight;",
+    "    }",
+    "    memory.write(\"last_goal\", goal.name);",
+    "    plan = Animus_Plan.create(goal, steps, cost);",
+]
+DIRTY_LINES = [
+    "    var roll = random(1);",
+    "    var idx = irandom_range(0, 3);",
+    "    var stamp = current_time;",
+    "    global.score += 1;",
+    "    var node = new GOAP_Node();",
+    "    if (!ok) return;",
+]
+
+
+def gen_corpus(total_bytes, dirty_ratio=0.1, file_bytes=24000, seed=7):
+    """Synthetic GML files: mostly clean code, `dirty_ratio` of them with a few violations."""
+    rnd = random.Random(seed)
+    files = []
+    size = 0
+    while size < total_bytes:
+        lines = ["function Synthetic_%d(agent, memory) {" % len(files)]
+        n = 0
+        while n < file_bytes:
+            ln = rnd.choice(CLEAN_LINES)
+            lines.append(ln)
+            n += len(ln) + 1
+        if rnd.random() < dirty_ratio:
+            for _ in range(3):
+                lines.insert(rnd.randrange(1, len(lines)), rnd.choice(DIRTY_LINES))
+        lines.append("}")
+        text = "\n".join(lines) + "\n"
+        files.append(text)
+        size += len(text)
+    return files, size
+
+
+def generic_rules(cfg):
+    """The code-view ban rules as gml_linter builds them: (key, pattern, flags)."""
+    rules = []
+    for key, flags in (("ban_silent_return", re.M), ("ban_globals", 0)):
+        if cfg.get(key):
+            rules.append((key, cfg[key], flags))
+    for key in ("ban_legacy", "ban_random", "ban_wallclock"):
+        if cfg.get(key):
+            rules.append((key, "|".join(cfg[key]), 0))
+    return rules
+
+
+def bench_master_scan(args):
+    import yaml
+    cfg = yaml.safe_load(pathlib.Path(args.config).read_text())
+    rules = generic_rules(cfg)
+    compiled = [(key, re.compile(p, f)) for key, p, f in rules]
+    scanner = MultiScanner(rules)
+    files, size = gen_corpus(int(args.mb * 1024 * 1024))
+    print(f"[bench] {len(files)} files, {size / 1e6:.1f} MB, {len(rules)} rules from {args.config}")
+    for r in scanner.rules:
+        print(f"  {r.name}: prefilter {sorted(r.literals) if r.literals else 'none'}")
+
+    def per_rule():
+        out = []
+        for text in files:
+            found = {}
+            for key, rxp in compiled:
+                spans = [m.span() for m in rxp.finditer(text)]
+                if spans:
+                    found[key] = spans
+            out.append(found)
+        return out
+
+    def master_only():
+        every = list(range(len(scanner.rules)))
+        return [scanner.scan(text, every) for text in files]
+
+    def master_prefiltered():
+        return [scanner.scan(text) for text in files]
+
+    t_base, base = _timed(per_rule)
+    print(f"{'variant':<28} {'s':>8} {'MB/s':>8} {'speedup':>8}")
+    print(f"{'finditer per rule':<28} {t_base:>8.2f} {size / 1e6 / t_base:>8.1f} {1.0:>7.1f}x")
+    for name, fn in (("master regex", master_only), ("prefilter + master regex", master_prefiltered)):
+        t, got = _timed(fn)
+        if got != base:
+            print(f"[FAIL] {name} disagrees with per-rule finditer", file=sys.stderr)
+            return 1
+        print(f"{name:<28} {t:>8.2f} {size / 1e6 / t:>8.1f} {t_base / t:>7.1f}x")
+    return 0
+
+
+def first_finding_ms(cmd):
+    """Spawn `cmd`; ms until its first stdout line (or exit, if it prints nothing) and until exit."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=str(ROOT), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    proc.stdout.readline()
+    t_first = time.perf_counter() - t0
+    proc.stdout.read()
+    proc.wait()
+    return t_first * 1000, (time.perf_counter() - t0) * 1000
+
+
+def import_profile(cmd, top):
+    """Top `top` imports by cumulative time (us) from one `python -X importtime` run."""
+    res = subprocess.run([cmd[0], "-X", "importtime"] + cmd[1:], cwd=str(ROOT),
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for ln in res.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not ln.startswith("import time:") or "cumulative" in ln:
+            continue
+        self_us, cum_us, name = ln.split(":", 1)[1].split("|", 2)
+        rows.append((int(cum_us), int(self_us), name.rstrip()))
+    # only top-level imports (no leading indentation) add up to the total
+    total = sum(cum for cum, _, name in rows if not name.startswith("  "))
+    return [(cum, own, name.strip()) for cum, own, name in sorted(rows, reverse=True)[:top]], total
+
+
+def bench_startup(args):
+    target = args.file or "GOAP/scripts/Animus_Planner/Animus_Planner.gml"
+    cmd = [sys.executable, str(TOOLS / "gml_linter.py"), "--no-cache", target]
+    cfg_cache = ROOT / ".animus_cache" / "config-animus_rules.json"
+
+    def runs(cold):
+        firsts, totals = [], []
+        for _ in range(args.runs):
+            if cold and cfg_cache.exists():
+                cfg_cache.unlink()   # a cache; the run rebuilds it
+            first, total = first_finding_ms(cmd)
+            firsts.append(first)
+            totals.append(total)
+        return statistics.median(firsts), statistics.median(totals)
+
+    cold_first, cold_total = runs(cold=True)
+    warm_first, warm_total = runs(cold=False)
+    print(f"[bench] gml_linter on {target}, median of {args.runs} runs")
+    print(f"{'config cache':<14} {'first finding ms':>17} {'exit ms':>9}")
+    print(f"{'cold':<14} {cold_first:>17.1f} {cold_total:>9.1f}")
+    print(f"{'warm':<14} {warm_first:>17.1f} {warm_total:>9.1f}")
+
+    rows, total = import_profile(cmd, args.top)
+    print(f"[bench] -X importtime: {total / 1000:.1f} ms in top-level imports; slowest (cumulative):")
+    for cum, own, name in rows:
+        print(f"  {cum / 1000:8.1f} ms  {own / 1000:7.1f} ms self  {name}")
+
+    if warm_first > args.budget_ms:
+        print(f"[FAIL] warm time to first finding {warm_first:.1f} ms exceeds the {args.budget_ms} ms budget", file=sys.stderr)
+        return 1
+    print(f"[ok] warm time to first finding within the {args.budget_ms} ms budget")
+    return 0
+
+
+# suite: tool -> argv (run from the synthetic project's root); {probe} is one of its scripts
+SUITE_TOOLS = {
+    "gml_linter": ["tools/gml_linter.py", "--no-cache"],
+    "gml_sanity": ["tools/gml_sanity.py"],
+    "yy_integrity": ["tools/yy_integrity.py"],
+    "yy_integrity_cold": ["tools/yy_integrity.py", "--no-cache"],
+    "yy_fixit": ["tools/yy_fixit.py", "repair", "--script", "{probe}"],
+    "find_references": ["tools/yy_fixit.py", "find-references", "Animus_Action"],
+    "strategy_template_enforcer": ["tools/strategy_template_enforcer.py"],
+}
+# run once untimed first, so the timed runs measure the warm (indexed) path
+SUITE_WARMUP = {"yy_integrity", "find_references"}
+DEFAULT_BASELINE = ROOT / ".animus_cache" / "bench_baseline.json"
+
+
+def tool_list(value):
+    names = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [n for n in names if n not in SUITE_TOOLS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown tool: {', '.join(unknown)} (choose from {', '.join(SUITE_TOOLS)})")
+    return names
+
+
+def run_measured(cmd, cwd, timeout):
+    """(seconds, peak RSS in KiB or None, exit code or None on timeout) for one child process."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=str(cwd), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not hasattr(os, "wait4"):
+        # no per-child rusage (Windows): time only
+        try:
+            code = proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            code = None
+        return time.perf_counter() - t0, None, code
+    deadline = t0 + timeout
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            break
+        if time.perf_counter() > deadline:
+            proc.kill()
+            _pid, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = -9
+            return time.perf_counter() - t0, usage.ru_maxrss, None
+        time.sleep(0.005)
+    secs = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return secs, rss, proc.returncode
+
+
+def bench_suite(args):
+    import synth_project
+
+    baseline_path = pathlib.Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+
+    results = {}
+    for scale in args.scales:
+        out = pathlib.Path(args.workdir) / f"p{scale}-s{args.seed}"
+        t0 = time.perf_counter()
+        stamp = synth_project.generate(out, scale, args.seed)
+        print(f"[bench] project {out}: {stamp['files']} files, {stamp['bytes'] / 1e6:.1f} MB "
+              f"(ready in {time.perf_counter() - t0:.1f} s)")
+        # byte-compile the copied tools up front so the first timed run does not pay for it
+        subprocess.run([sys.executable, "-m", "compileall", "-q", str(out / "tools")], stdout=subprocess.DEVNULL)
+        print(f"{'tool':<27} {'files':>7} {'secs':>8} {'files/s':>9} {'MB/s':>7} {'peak MB':>8}  exit")
+        for tool in args.tools:
+            cmd = [sys.executable] + [a.format(probe=stamp["probe_script"]) for a in SUITE_TOOLS[tool]]
+            if tool in SUITE_WARMUP:
+                run_measured(cmd, out, args.timeout)
+            runs = [run_measured(cmd, out, args.timeout) for _ in range(args.repeat)]
+            secs = statistics.median(r[0] for r in runs)
+            rss = max((r[1] for r in runs if r[1] is not None), default=None)
+            codes = {r[2] for r in runs}
+            # 0 = clean, 1 = findings; anything else (or a timeout) is a broken run
+            ok = codes <= {0, 1}
+            key = f"{tool}@{scale}"
+            results[key] = {"secs": round(secs, 4), "rss_kb": rss, "files": stamp["files"],
+                            "bytes": stamp["bytes"], "ok": ok}
+            code_txt = ",".join("timeout" if c is None else str(c) for c in sorted(codes, key=str))
+            rss_txt = f"{rss / 1024:8.1f}" if rss is not None else f"{'-':>8}"
+            rate = (f"{stamp['files'] / secs:>9.0f} {stamp['bytes'] / 1e6 / secs:>7.1f}" if ok
+                    else f"{'-':>9} {'-':>7}")
+            print(f"{tool:<27} {stamp['files']:>7} {secs:>8.2f} {rate} {rss_txt}  {code_txt}")
+
+    if args.json:
+        pathlib.Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    broken = [k for k, r in results.items() if not r["ok"]]
+    if args.save_baseline:
+        if broken:
+            print(f"[FAIL] not saving a baseline with broken runs: {', '.join(broken)}", file=sys.stderr)
+            return 1
+        merged = dict(baseline, **results)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        doc = {"python": sys.version.split()[0], "platform": sys.platform, "results": merged}
+        baseline_path.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"[bench] baseline saved to {baseline_path} ({len(results)} entries)")
+        return 0
+
+    regressions = []
+    for key, r in results.items():
+        base = baseline.get(key)
+        if base is None or not r["ok"]:
+            continue
+        # small absolute slack so sub-second runs do not flap on noise
+        if r["secs"] > base["secs"] * (1 + args.tolerance) + args.slack_ms / 1000:
+            regressions.append(f"{key}: {base['secs']:.2f} s -> {r['secs']:.2f} s")
+        if r["rss_kb"] and base.get("rss_kb") and r["rss_kb"] > base["rss_kb"] * (1 + args.tolerance):
+            regressions.append(f"{key}: peak RSS {base['rss_kb'] / 1024:.1f} MB -> {r['rss_kb'] / 1024:.1f} MB")
+    compared = sum(1 for k in results if k in baseline)
+    for k in broken:
+        print(f"[FAIL] {k}: tool crashed or timed out", file=sys.stderr)
+    for msg in regressions:
+        print(f"[FAIL] regression beyond {args.tolerance:.0%}: {msg}", file=sys.stderr)
+    if broken or regressions:
+        return 1
+    if compared:
+        print(f"[ok] {compared} measurements within {args.tolerance:.0%} of {baseline_path}")
+    else:
+        print(f"[bench] no baseline entries in {baseline_path}; record one with --save-baseline")
+    return 0
+
+
+BIGFILE_TOOLS = {
+    "gml_linter": ["tools/gml_linter.py", "--no-cache", "--rule-budget-ms", "0", "{table}"],
+    "gml_sanity": ["tools/gml_sanity.py"],
+    "strategy_template_enforcer": ["tools/strategy_template_enforcer.py", "--rule-budget-ms", "0"],
+}
+
+
+def run_sampled(cmd, cwd, out_path):
+    """(seconds, {RssAnon/RssFile: peak MiB}, exit code); memory is sampled from /proc
+    (empty where there is none), output goes to `out_path`."""
+    t0 = time.perf_counter()
+    with open(out_path, "wb") as out:
+        proc = subprocess.Popen(cmd, cwd=str(cwd), stdout=out, stderr=subprocess.STDOUT)
+        status = pathlib.Path(f"/proc/{proc.pid}/status")
+        peaks = {}
+        while proc.poll() is None:
+            try:
+                for ln in status.read_text().splitlines():
+                    key, _, val = ln.partition(":")
+                    if key in ("RssAnon", "RssFile"):
+                        peaks[key] = max(peaks.get(key, 0), int(val.split()[0]) / 1024)
+            except (OSError, ValueError):
+                pass
+            time.sleep(0.02)
+    return time.perf_counter() - t0, peaks, proc.returncode
+
+
+def bench_bigfile(args):
+    import synth_project
+
+    out = pathlib.Path(args.workdir) / "bigfile"
+    synth_project.generate(out, 20, args.seed)
+    table = out / "GOAP" / "scripts" / "Animus_NavTable" / "Animus_NavTable.gml"
+    synth_project.baked_table(table, int(args.mb * 1024 * 1024), args.seed)
+    subprocess.run([sys.executable, "-m", "compileall", "-q", str(out / "tools")], stdout=subprocess.DEVNULL)
+    size_mb = table.stat().st_size / (1024 * 1024)
+    print(f"[bench] {table} ({size_mb:.0f} MiB) in a 20-file project")
+    print(f"{'tool':<27} {'mode':<7} {'secs':>7} {'anon MiB':>9} {'file MiB':>9} {'lines':>6}")
+    failed = []
+    for tool in args.tools:
+        outputs = {}
+        for mode, threshold in (("text", "0"), ("mapped", str(max(size_mb / 2, 1e-6)))):
+            cmd = [sys.executable] + [a.format(table=table.relative_to(out).as_posix()) for a in BIGFILE_TOOLS[tool]]
+            log = out / f".{tool}.{mode}.out"
+            secs, peaks, code = run_sampled(cmd + ["--mmap-threshold-mb", threshold], out, log)
+            outputs[mode] = (code, log.read_bytes())
+            anon, filemb = peaks.get("RssAnon"), peaks.get("RssFile")
+            fmt = lambda v: f"{v:>9.0f}" if v is not None else f"{'-':>9}"
+            lines = outputs[mode][1].count(b"\n")
+            print(f"{tool:<27} {mode:<7} {secs:>7.1f} {fmt(anon)} {fmt(filemb)} {lines:>6}")
+            if mode == "mapped" and args.max_anon_mb and anon is not None and anon > args.max_anon_mb:
+                failed.append(f"{tool}: mapped run used {anon:.0f} MiB of anonymous memory (limit {args.max_anon_mb:.0f})")
+        if outputs["text"] != outputs["mapped"]:
+            failed.append(f"{tool}: mapped output differs from text mode (see {out}/.{tool}.*.out)")
+    for msg in failed:
+        print(f"[FAIL] {msg}", file=sys.stderr)
+    if failed:
+        return 1
+    print("[ok] mapped scanning matches text mode")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    li = sub.add_parser("line-index", help="line-number lookup cost vs. number of findings")
+    li.add_argument("--findings", type=int, default=50000)
+
+    ms = sub.add_parser("master-scan", help="code-view ban rules: per-rule finditer vs. one prefiltered pass")
+    ms.add_argument("--mb", type=float, default=100)
+    ms.add_argument("--config", default=str(pathlib.Path(__file__).resolve().parent / "animus_rules.yaml"))
+
+    st = sub.add_parser("startup", help="single-file gml_linter startup: time to first finding and import profile")
+    st.add_argument("--file", default=None, help="repo-relative .gml to lint (default: Animus_Planner.gml)")
+    st.add_argument("--runs", type=int, default=7)
+    st.add_argument("--top", type=int, default=10, help="imports to list")
+    st.add_argument("--budget-ms", type=float, default=250, help="fail if the warm time to first finding exceeds this")
+
+    su = sub.add_parser("suite", help="time the tools on synthetic projects; compare against a stored baseline")
+    su.add_argument("--scales", type=lambda v: [int(x) for x in v.split(",") if x.strip()],
+                    default=[100, 10000, 100000], help="comma-separated project sizes in files (default: 100,10000,100000)")
+    su.add_argument("--tools", type=tool_list, default=list(SUITE_TOOLS), help="comma-separated tools (default: all)")
+    su.add_argument("--repeat", type=int, default=1, help="runs per measurement (median time, max RSS)")
+    su.add_argument("--seed", type=int, default=1)
+    su.add_argument("--timeout", type=float, default=900, help="seconds before a tool run counts as broken")
+    su.add_argument("--workdir", default=str(ROOT / ".animus_cache" / "bench"), help="where generated projects live (reused)")
+    su.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    su.add_argument("--save-baseline", action="store_true", help="store these results as the baseline instead of comparing")
+    su.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown / RSS growth as a fraction (default 0.25)")
+    su.add_argument("--slack-ms", type=float, default=50, help="absolute time slack added to the tolerance")
+    su.add_argument("--json", default=None, help="also write the results to this file")
+
+    bf = sub.add_parser("bigfile", help="text vs mapped scanning of one huge generated .gml: output and memory")
+    bf.add_argument("--mb", type=float, default=64, help="size of the generated table file")
+    bf.add_argument("--tools", type=lambda v: [t for t in v.split(",") if t in BIGFILE_TOOLS] or list(BIGFILE_TOOLS),
+                    default=list(BIGFILE_TOOLS), help=f"comma-separated subset of {','.join(BIGFILE_TOOLS)}")
+    bf.add_argument("--seed", type=int, default=1)
+    bf.add_argument("--workdir", default=str(ROOT / ".animus_cache" / "bench"))
+    bf.add_argument("--max-anon-mb", type=float, default=None, help="fail if a mapped run's anonymous memory peaks above this")
+
+    args = ap.parse_args()
+    if args.cmd == "bigfile":
+        sys.exit(bench_bigfile(args))
+    if args.cmd == "suite":
+        sys.exit(bench_suite(args))
+    if args.cmd == "startup":
+        sys.exit(bench_startup(args))
+    if args.cmd == "line-index":
+        sys.exit(bench_line_index(args))
+    if args.cmd == "master-scan":
+        sys.exit(bench_master_scan(args))
+
+
+if __name__ == "__main__":
+    main()
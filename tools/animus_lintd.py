@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+animus_lintd.py — long-running Animus lint server (Language Server Protocol)
+
+Loads tools/animus_rules.yaml, tools/animus_strategy_rules.yaml and
+tools/yy_rules.yaml once, keeps every .gml file's findings in memory and only
+re-checks files reported as changed: by mtime polling and/or by the editor's
+didOpen/didChange/didSave notifications (open buffers are linted from memory).
+
+Findings are published as LSP `textDocument/publishDiagnostics`. The custom
+request `animus/check` ({"paths": [...]} optional) returns the current findings
+as JSON; `--query` uses it so hooks and scripts can ask a warm server instead of
+cold-starting gml_linter, yy_integrity and the strategy enforcer.
+
+Findings recorded in the lint baseline (baseline_path in animus_rules.yaml) are
+left out, matched by the same fingerprints as gml_linter; the baseline is
+re-read when it changes. `--no-baseline` reports them (on a server: for every
+client; with --query: for that query).
+
+Buffers outside the project root are not linted (they are published with no
+diagnostics). A message that fails is answered with a JSON-RPC error (requests)
+or logged to stderr (notifications); the session carries on.
+
+Usage:
+  # editors: LSP over stdio
+  python tools/animus_lintd.py --stdio
+  # shared server on localhost
+  python tools/animus_lintd.py --tcp 7957
+  # ask a running server; gml_linter-style output, exit 1 on findings, 2 if unreachable
+  python tools/animus_lintd.py --query --port 7957 [--no-baseline] [paths...]
+
+Run from the repository root (the tools resolve their configs from there).
+"""
+import argparse, contextlib, io, json, os, pathlib, socket, socketserver, sys, threading, time
+from urllib.parse import urlparse, unquote
+from urllib.request import url2pathname
+from line_index import LineIndex
+
+TOOLS = pathlib.Path(__file__).resolve().parent
+ROOT = TOOLS.parent
+SKIP_DIRS = {".git", ".animus_cache", "__pycache__"}
+
+SEV_ERROR, SEV_WARNING, SEV_INFO = 1, 2, 3
+
+
+def path_to_uri(path):
+    return pathlib.Path(path).resolve().as_uri()
+
+
+def uri_to_path(uri):
+    parsed = urlparse(uri)
+    return pathlib.Path(url2pathname(unquote(parsed.path))).resolve()
+
+
+class Workspace:
+    """In-memory findings for one project, refreshed incrementally."""
+
+    def __init__(self, root, use_baseline=True):
+        self.root = pathlib.Path(root).resolve()
+        os.chdir(self.root)
+        # the tools load their configs at import/first use; this is the only time we pay for it
+        import gml_linter, strategy_template_enforcer, yy_integrity
+        self.linter = gml_linter
+        self.enforcer = strategy_template_enforcer
+        self.yy = yy_integrity
+        self.yy_cfg = yy_integrity.load_cfg()
+        from git_scope import glob_match
+        self.glob_match = glob_match
+        from lint_baseline import Baseline, file_lines, fingerprints
+        self.Baseline, self.file_lines, self.fingerprints = Baseline, file_lines, fingerprints
+        self.use_baseline = use_baseline
+        self.baseline_path = gml_linter.baseline_path(None)
+        self.baseline_stat = None
+        self.baseline = set()  # fingerprints of the accepted findings
+
+        self.lock = threading.RLock()
+        self.stats = {}       # path -> (mtime_ns, size) for .gml/.yy/.yyp
+        self.results = {}     # .gml path -> list of (Finding, severity)
+        self.overlays = {}    # path -> text of an open editor buffer
+        self.integrity = {}   # path -> list of (Finding, severity)
+        self.known = {}       # .gml path -> findings in the baseline, left out of `results`
+
+    # ---- file discovery ----
+    def _walk(self):
+        out = {}
+        stack = [str(self.root)]
+        while stack:
+            d = stack.pop()
+            try:
+                entries = list(os.scandir(d))
+            except OSError:
+                continue
+            for e in entries:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name not in SKIP_DIRS:
+                        stack.append(e.path)
+                elif e.name.endswith((".gml", ".yy", ".yyp")):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    out[pathlib.Path(e.path)] = (st.st_mtime_ns, st.st_size)
+        return out
+
+    def rel(self, path):
+        return pathlib.Path(path).relative_to(self.root).as_posix()
+
+    def inside(self, path):
+        return pathlib.Path(path).is_relative_to(self.root)
+
+    # ---- checks ----
+    def _load_baseline(self):
+        """Re-read the baseline if its file changed. True if it did."""
+        try:
+            st = self.baseline_path.stat()
+            stat = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stat = None
+        if stat == self.baseline_stat:
+            return False
+        self.baseline_stat = stat
+        try:
+            baseline = self.Baseline.load(self.baseline_path)
+        except ValueError as e:
+            sys.stderr.write(f"[animus-lintd] unreadable baseline {self.baseline_path}: {e}\n")
+            baseline = None
+        self.baseline = baseline.entries if baseline else set()
+        return True
+
+    def _check_gml(self, path):
+        text = self.overlays.get(path)
+        if text is None:
+            try:
+                text = path.read_text(encoding="utf-8", errors="ignore")
+            except OSError:
+                self.results.pop(path, None)
+                self.known.pop(path, None)
+                return
+        scans, contracts, _ = self.linter.lint_file(path, text)
+        rel = self.rel(path)
+        found, known = [], []
+        fps = self.fingerprints(rel, scans + contracts, self.file_lines(path, text)) if self.baseline else []
+        for i, f in enumerate(scans + contracts):
+            (known if fps and fps[i] in self.baseline else found).append((f, SEV_WARNING))
+        if any(self.glob_match(rel, g) for g in self.enforcer.settings().globs):
+            sug = self.enforcer.analyze_file(pathlib.Path(rel), text)
+            if sug is not None:
+                lines = LineIndex(text)
+                # one finding per non-templated struct; a file without one is reported at its anchor
+                for one in sug.get("strategies") or [sug]:
+                    idx = one["anchor_index"]
+                    line = lines.line_of(idx) if idx is not None else 1
+                    found.append((self.linter.Finding(str(path), line, "strategy.non_templated",
+                                                      f"Strategy is not templated; suggest `{one['suggested_kind']}` template",
+                                                      "See Animus_StrategyTemplates.gml"), SEV_INFO))
+        self.results[path] = found
+        self.known[path] = known
+
+    def _check_integrity(self):
+        buf = io.StringIO()
+        entries = []
+        with contextlib.redirect_stdout(buf):
+            try:
+                report = self.yy.run(self.yy_cfg)
+                entries = report.entries
+            except SystemExit:
+                # die(): fatal parse/config problem, reported against the project file
+                fatal = [ln[len("[FATAL] "):] for ln in buf.getvalue().splitlines() if ln.startswith("[FATAL] ")]
+                entries = [(pathlib.Path(self.yy_cfg["yyp_path"]), msg) for msg in fatal]
+        out = {}
+        for subject, msg in entries:
+            p = (self.root / (subject or self.yy_cfg["yyp_path"])).resolve()
+            out.setdefault(p, []).append((self.linter.Finding(str(p), 1, "yy.integrity", msg), SEV_ERROR))
+        changed = set(out) | set(self.integrity)
+        self.integrity = out
+        return changed
+
+    def refresh(self, force=()):
+        """Re-check whatever changed on disk (plus `force` paths). Returns the paths whose diagnostics may differ."""
+        with self.lock:
+            now = self._walk()
+            before = self.stats
+            changed = {p for p, st in now.items() if before.get(p) != st}
+            changed |= {pathlib.Path(p).resolve() for p in force}
+            removed = set(before) - set(now)
+            self.stats = now
+            if self._load_baseline():
+                # the accepted findings changed: every file is filtered anew
+                changed |= {p for p in now if p.suffix == ".gml"}
+            touched = set()
+            for p in sorted(changed | removed):
+                if p.suffix != ".gml" or not self.inside(p):
+                    continue
+                if p in now or p in self.overlays:
+                    self._check_gml(p)
+                else:
+                    self.results.pop(p, None)
+                    self.known.pop(p, None)
+                touched.add(p)
+            # project structure changed: a .yy/.yyp edited, or a script added/removed
+            structural = any(p.suffix in (".yy", ".yyp") for p in changed | removed) or \
+                any(p not in before for p in changed) or bool(removed)
+            if structural:
+                touched |= self._check_integrity()
+            return touched
+
+    def set_overlay(self, path, text):
+        """Paths to republish. A file outside the project is not tracked: it is published with
+        no diagnostics (clearing any an editor kept)."""
+        if not self.inside(path):
+            return {path}
+        with self.lock:
+            if text is None:
+                self.overlays.pop(path, None)
+            else:
+                self.overlays[path] = text
+            if path.suffix == ".gml":
+                self._check_gml(path)
+            return {path}
+
+    def findings(self, path, use_baseline=None):
+        """(Finding, severity) of one file; the baselined ones too unless `use_baseline`
+        (default: the server's setting)."""
+        if use_baseline is None:
+            use_baseline = self.use_baseline
+        with self.lock:
+            known = [] if use_baseline else list(self.known.get(path, []))
+            return list(self.results.get(path, [])) + known + list(self.integrity.get(path, []))
+
+    def all_paths(self):
+        with self.lock:
+            return sorted(set(self.results) | set(self.integrity))
+
+    def diagnostics(self, path):
+        diags = []
+        for f, sev in self.findings(path):
+            message = f.msg + (f" ({f.hint})" if f.hint else "")
+            line = max(0, f.line - 1)
+            diags.append({
+                "range": {"start": {"line": line, "character": 0}, "end": {"line": line + 1, "character": 0}},
+                "severity": sev,
+                "source": "animus",
+                "code": f.kind,
+                "message": message,
+            })
+        return diags
+
+
+class Transport:
+    """JSON-RPC 2.0 with LSP Content-Length framing over a pair of binary streams."""
+
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+        self.lock = threading.Lock()
+
+    def read(self):
+        length = None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii", "replace").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        if length is None:
+            return None
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def send(self, msg):
+        body = json.dumps(msg, separators=(",", ":")).encode("utf-8")
+        with self.lock:
+            self.wfile.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+            self.wfile.flush()
+
+
+class Session:
+    def __init__(self, ws, transport):
+        self.ws = ws
+        self.transport = transport
+        self.initialized = False
+
+    def publish(self, paths):
+        if not self.initialized:
+            return
+        for p in sorted(paths):
+            self.transport.send({"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics",
+                                 "params": {"uri": path_to_uri(p), "diagnostics": self.ws.diagnostics(p)}})
+
+    def handle(self, msg):
+        method = msg.get("method")
+        params = msg.get("params") or {}
+        rid = msg.get("id")
+        result = None
+
+        if method == "initialize":
+            result = {"capabilities": {"textDocumentSync": {"openClose": True, "change": 1, "save": {"includeText": True}}},
+                      "serverInfo": {"name": "animus-lintd"}}
+        elif method == "initialized":
+            self.initialized = True
+            self.publish(self.ws.all_paths())
+        elif method in ("textDocument/didOpen", "textDocument/didChange", "textDocument/didSave"):
+            doc = params.get("textDocument", {})
+            path = uri_to_path(doc.get("uri", ""))
+            if method == "textDocument/didOpen":
+                text = doc.get("text")
+            elif method == "textDocument/didChange":
+                changes = params.get("contentChanges") or []
+                text = changes[-1].get("text") if changes else None
+            else:
+                text = params.get("text", self.ws.overlays.get(path))
+            self.publish(self.ws.set_overlay(path, text))
+        elif method == "textDocument/didClose":
+            path = uri_to_path(params.get("textDocument", {}).get("uri", ""))
+            self.publish(self.ws.set_overlay(path, None))
+        elif method == "animus/check":
+            self.publish(self.ws.refresh())
+            wanted = params.get("paths")
+            paths = [pathlib.Path(p).resolve() for p in wanted] if wanted else self.ws.all_paths()
+            result = {"findings": [
+                {"path": f.path, "line": f.line, "kind": f.kind, "message": f.msg, "hint": f.hint, "severity": sev}
+                for p in paths for f, sev in self.ws.findings(p, params.get("baseline"))]}
+        elif method == "shutdown":
+            result = None
+        elif method == "exit":
+            return False
+        elif rid is not None:
+            self.transport.send({"jsonrpc": "2.0", "id": rid,
+                                 "error": {"code": -32601, "message": f"method not found: {method}"}})
+            return True
+
+        if rid is not None:
+            self.transport.send({"jsonrpc": "2.0", "id": rid, "result": result})
+        return True
+
+    def serve(self):
+        while True:
+            try:
+                msg = self.transport.read()
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                # the whole frame was read, so the stream is still in step
+                sys.stderr.write(f"[animus-lintd] dropped a malformed message: {e}\n")
+                continue
+            if msg is None:
+                return
+            try:
+                if not self.handle(msg):
+                    return
+            except Exception as e:
+                # one bad message must not cost the editor its server
+                rid = msg.get("id") if isinstance(msg, dict) else None
+                if rid is None:
+                    method = msg.get("method") if isinstance(msg, dict) else None
+                    sys.stderr.write(f"[animus-lintd] {method or 'message'} failed: {type(e).__name__}: {e}\n")
+                else:
+                    self.transport.send({"jsonrpc": "2.0", "id": rid,
+                                         "error": {"code": -32603, "message": f"{type(e).__name__}: {e}"}})
+
+
+class Server:
+    def __init__(self, ws, poll):
+        self.ws = ws
+        self.poll = poll
+        self.sessions = []
+        self.lock = threading.Lock()
+
+    def start_polling(self):
+        if self.poll <= 0:
+            return
+
+        def loop():
+            while True:
+                time.sleep(self.poll)
+                touched = self.ws.refresh()
+                if touched:
+                    with self.lock:
+                        sessions = list(self.sessions)
+                    for s in sessions:
+                        try:
+                            s.publish(touched)
+                        except OSError:
+                            pass
+
+        threading.Thread(target=loop, name="animus-lintd-poll", daemon=True).start()
+
+    def run_session(self, transport):
+        session = Session(self.ws, transport)
+        with self.lock:
+            self.sessions.append(session)
+        try:
+            session.serve()
+        finally:
+            with self.lock:
+                self.sessions.remove(session)
+
+
+def serve_tcp(server, port):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            server.run_session(Transport(self.rfile, self.wfile))
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler) as tcp:
+        sys.stderr.write(f"[animus-lintd] listening on 127.0.0.1:{port}\n")
+        tcp.serve_forever()
+
+
+def query(port, paths, use_baseline=True):
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=60)
+    except OSError as e:
+        sys.stderr.write(f"[animus-lintd] no server on port {port}: {e}\n")
+        return 2
+    with sock:
+        transport = Transport(sock.makefile("rb"), sock.makefile("wb"))
+        params = {"paths": [str(pathlib.Path(p).resolve()) for p in paths]} if paths else {}
+        if not use_baseline:
+            params["baseline"] = False
+        transport.send({"jsonrpc": "2.0", "id": 1, "method": "animus/check", "params": params})
+        while True:
+            msg = transport.read()
+            if msg is None:
+                sys.stderr.write("[animus-lintd] connection closed before a reply\n")
+                return 2
+            if msg.get("id") == 1:
+                break
+        transport.send({"jsonrpc": "2.0", "method": "exit"})
+    findings = msg.get("result", {}).get("findings", [])
+    for f in findings:
+        print(f"{f['path']}:{f['line']}: [{f['kind']}] {f['message']}")
+        if f.get("hint"):
+            print(f"  -> {f['hint']}")
+    return 1 if findings else 0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    mode = ap.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--stdio", action="store_true", help="Serve LSP over stdin/stdout (editors).")
+    mode.add_argument("--tcp", type=int, metavar="PORT", help="Serve LSP on 127.0.0.1:PORT.")
+    mode.add_argument("--query", action="store_true", help="Ask a running --tcp server for findings and exit.")
+    ap.add_argument("--port", type=int, default=7957, help="Port for --query (default 7957).")
+    ap.add_argument("--poll", type=float, default=2.0, help="Seconds between mtime polls (0 disables polling).")
+    ap.add_argument("--no-baseline", action="store_true",
+                    help="Report findings recorded in the lint baseline too.")
+    ap.add_argument("paths", nargs="*", help="With --query: only report these files.")
+    args = ap.parse_args()
+
+    if args.query:
+        sys.exit(query(args.port, args.paths, not args.no_baseline))
+
+    ws = Workspace(ROOT, not args.no_baseline)
+    ws.refresh()
+    server = Server(ws, args.poll)
+    server.start_polling()
+    if args.stdio:
+        server.run_session(Transport(sys.stdin.buffer, sys.stdout.buffer))
+    else:
+        serve_tcp(server, args.tcp)
+
+
+if __name__ == "__main__":
+    main()
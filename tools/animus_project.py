@@ -0,0 +1,183 @@
+"""In-memory model of an Animus/GameMaker project, shared by the check tools.
+
+One Project walks the tree once and reads each file at most once. Every tool
+run against it (gml_linter, yy_integrity, strategy_template_enforcer,
+gml_sanity) shares the same file list, contents and parsed JSON (.yyp, .yy),
+so `tools/animus.py check` pays for the I/O once instead of once per tool.
+
+Paths passed in may be absolute or relative to the project root, which is
+also the working directory the tools expect. Listing methods return
+root-relative posix strings; each tool turns them back into paths with its
+own base, so its output looks the same as before.
+
+With a GitScope (`--staged` / `--changed-since`) the same API answers from
+the scope: staged runs read the index, not the working tree.
+"""
+import json
+import os
+import pathlib
+import time
+
+from git_scope import glob_match
+
+SKIP_DIRS = {".git", ".animus_cache", "__pycache__"}
+# mtimes this recent may still change within the same tick; never trust them for caching
+RACY_NS = 2 * 10**9
+
+
+class Project:
+    def __init__(self, root=".", scope=None):
+        self.root = pathlib.Path(root).resolve()
+        self._root = str(self.root)
+        self.scope = scope
+        self._files = None    # root-relative posix path -> None (ordered set of every file)
+        self._dirs = None
+        self._bytes = {}
+        self._text = {}
+        self._json = {}
+        self._rels = {}
+        self.listings = None    # dir -> [mtime_ns, file names, subdir names], see use_listings()
+
+    @property
+    def staged(self):
+        return self.scope is not None and self.scope.staged
+
+    # ---- file list ----
+    def use_listings(self, listings):
+        """Walk with directory listings from an earlier run: a directory whose mtime is unchanged
+        (adding, removing or renaming an entry always bumps it) is not read again. After the
+        walk, `listings` holds the current ones for the caller to persist."""
+        if self._files is None:
+            self.listings = listings
+
+    def _walk(self):
+        files, dirs = {}, {""}
+        known = self.listings
+        if known is not None:
+            self.listings = {}
+            now = time.time_ns()
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            path = f"{self._root}/{rel}" if rel else self._root
+            names = None
+            if known is not None:
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                cached = known.get(rel)
+                if cached is not None and cached[0] == mtime:
+                    _mtime, names, subdirs = cached
+            if names is None:
+                try:
+                    entries = list(os.scandir(path))
+                except OSError:
+                    continue
+                names, subdirs = [], []
+                for e in entries:
+                    if e.is_dir(follow_symlinks=False):
+                        if e.name not in SKIP_DIRS:
+                            subdirs.append(e.name)
+                    elif e.is_file():
+                        names.append(e.name)
+            if known is not None and now - mtime > RACY_NS:
+                self.listings[rel] = [mtime, names, subdirs]
+            prefix = f"{rel}/" if rel else ""
+            for name in names:
+                files[prefix + name] = None
+            for name in subdirs:
+                dirs.add(prefix + name)
+                stack.append(prefix + name)
+        self._files = dict.fromkeys(sorted(files))
+        self._dirs = dirs
+
+    def files(self, suffix=None):
+        """Every file under the root (optionally by suffix), root-relative and sorted."""
+        if self._files is None:
+            self._walk()
+        if suffix is None:
+            return list(self._files)
+        suffix = suffix.lower()
+        return [r for r in self._files if r.lower().endswith(suffix)]
+
+    def glob(self, pattern):
+        """Files matching a repo glob (`**/` spans directories), root-relative and sorted."""
+        return [r for r in self.files() if glob_match(r, pattern)]
+
+    def rel(self, path):
+        rel = self._rels.get(path)
+        if rel is None:
+            if isinstance(path, str) and not os.path.isabs(path):
+                # the common case: a relative string needs no Path object
+                rel = os.path.normpath(path).replace(os.sep, "/")
+            else:
+                p = pathlib.Path(path)
+                if p.is_absolute():
+                    rel = p.relative_to(self.root).as_posix()
+                else:
+                    rel = os.path.normpath(p.as_posix()).replace(os.sep, "/")
+            rel = "" if rel == "." else rel
+            self._rels[path] = rel
+        return rel
+
+    def exists(self, path):
+        if self.staged:
+            return self.scope.exists(self.root / self.rel(path))
+        if self._files is None:
+            self._walk()
+        if path in self._files:
+            # already a root-relative posix string
+            return True
+        rel = self.rel(path)
+        return rel in self._files or rel in self._dirs
+
+    def stat(self, path):
+        """os.stat_result of a working-tree file; None for staged runs or a missing file."""
+        if self.staged:
+            return None
+        try:
+            return os.stat(f"{self._root}/{self.rel(path)}")
+        except OSError:
+            return None
+
+    # ---- contents ----
+    def prefetch(self, paths):
+        """Batch-read staged blobs (one `git cat-file --batch`); a no-op for the working tree."""
+        if self.staged:
+            self.scope.prefetch([self.root / self.rel(p) for p in paths])
+
+    def read_bytes(self, path):
+        rel = self.rel(path)
+        data = self._bytes.get(rel)
+        if data is None:
+            if self.staged:
+                data = self.scope.read_bytes(self.root / rel)
+            else:
+                data = (self.root / rel).read_bytes()
+            self._bytes[rel] = data
+        return data
+
+    def read_text(self, path, errors="ignore"):
+        """Decoded UTF-8 with universal newlines, like pathlib.Path.read_text."""
+        key = (self.rel(path), errors)
+        text = self._text.get(key)
+        if text is None:
+            text = self.read_bytes(path).decode("utf-8", errors)
+            text = self._text[key] = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def json(self, path):
+        """Parsed JSON document (.yyp, .yy), cached; raises like json.loads on bad input."""
+        rel = self.rel(path)
+        if rel not in self._json:
+            self._json[rel] = json.loads(self.read_text(rel, errors="strict"))
+        return self._json[rel]
+
+    def lines(self, path):
+        """Non-blank stripped lines, e.g. the .resource_order listing."""
+        return [ln.strip() for ln in self.read_text(path, errors="strict").splitlines() if ln.strip()]
+
+    def io_stats(self):
+        """How much of the tree this project has touched so far."""
+        return {"listed": len(self._files or ()), "read": len(self._bytes), "json": len(self._json)}
@@ -0,0 +1,52 @@
+"""Lazy, disk-cached loading of the tools' YAML configs.
+
+Importing PyYAML and parsing a rules file cost more than the rest of a
+single-file lint. `load_config()` keeps the parsed config in
+`.animus_cache/config-<name>.json`, keyed by a digest of the YAML bytes and a
+caller-supplied version string. It also stores whatever the caller derives
+from the config (rule metadata such as prefilter literals). A warm start then
+skips `import yaml` and the derivation and costs one small JSON read. An edited
+YAML file, or a new version, rebuilds the entry. A caller that derives should
+pass a digest of the code doing the derivation as (part of) its version, so the
+stored metadata never outlives that code (gml_linter.config_version).
+
+Configs that do not survive a JSON round trip (non-string keys, dates, ...)
+are simply not cached.
+"""
+import json
+import pathlib
+
+from lint_cache import atomic_write_text, digest_bytes
+
+CACHE_DIR = pathlib.Path(__file__).resolve().parents[1] / ".animus_cache"
+
+
+def _parse_yaml(data):
+    import yaml
+    return yaml.safe_load(data.decode("utf-8"))
+
+
+def load_config(path, version="", derive=None, cache_dir=CACHE_DIR):
+    """Return (config, derived) for the YAML file at `path`; `derived` is derive(config),
+    or None without a `derive` callback. Raises OSError if the file cannot be read."""
+    path = pathlib.Path(path)
+    data = path.read_bytes()
+    key = digest_bytes(version.encode("utf-8"), b"\0", data)
+    cache_file = pathlib.Path(cache_dir) / f"config-{path.stem}.json"
+    try:
+        doc = json.loads(cache_file.read_text(encoding="utf-8"))
+        if doc.get("key") == key:
+            return doc["config"], doc.get("derived")
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+
+    cfg = _parse_yaml(data)
+    derived = derive(cfg) if derive is not None else None
+    try:
+        text = json.dumps({"key": key, "config": cfg, "derived": derived})
+        if json.loads(text) == {"key": key, "config": cfg, "derived": derived}:
+            atomic_write_text(cache_file, text)
+    except (TypeError, ValueError, OSError):
+        # not JSON-representable, or a read-only checkout: parse again next time
+        pass
+    return cfg, derived
@@ -0,0 +1,176 @@
+"""Git-aware scoping for the Animus tools (`--changed-since REF` / `--staged`).
+
+A GitScope lists the files touched by a diff and reads their contents from the
+right place: the working tree for `--changed-since`, the index for `--staged`
+(so a pre-commit run checks exactly what is about to be committed).
+`--changed-since` also counts untracked files (not ignored) as added: a new
+script is changed since REF even before it is `git add`ed.
+"""
+import pathlib
+import re
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _git(root, *args, stdin=None):
+    import subprocess   # deferred: plain (unscoped) runs never spawn git
+    try:
+        res = subprocess.run(["git", *args], cwd=str(root), input=stdin,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    except OSError as e:
+        raise GitError(f"cannot run git: {e}")
+    if res.returncode != 0:
+        raise GitError(res.stderr.decode("utf-8", "replace").strip() or f"git {' '.join(args)} failed")
+    return res.stdout
+
+
+def add_scope_args(ap):
+    g = ap.add_mutually_exclusive_group()
+    g.add_argument("--changed-since", metavar="REF", default=None,
+                   help="Only check files changed between REF and the working tree (untracked files included).")
+    g.add_argument("--staged", action="store_true",
+                   help="Only check staged files, reading their contents from the index.")
+
+
+def scope_from_args(args, root="."):
+    if getattr(args, "staged", False):
+        return GitScope(root, staged=True)
+    if getattr(args, "changed_since", None):
+        return GitScope(root, ref=args.changed_since)
+    return None
+
+
+class GitScope:
+    def __init__(self, root=".", ref=None, staged=False):
+        self.root = pathlib.Path(root).resolve()
+        self.ref = ref
+        self.staged = staged
+        self.top = pathlib.Path(_git(self.root, "rev-parse", "--show-toplevel").decode().strip()).resolve()
+        self.changed = {}    # top-relative posix path -> status letter (A/M/D/T)
+        self._blobs = {}
+        self._index_paths = None
+        self._load_changes()
+
+    def describe(self):
+        return "staged changes" if self.staged else f"changes since {self.ref}"
+
+    def _load_changes(self):
+        args = ["diff", "--name-status", "-z", "--no-renames"]
+        args += ["--cached"] if self.staged else [self.ref, "--"]
+        out = _git(self.top, *args).decode("utf-8", "surrogateescape").split("\0")
+        for status, path in zip(out[0::2], out[1::2]):
+            if path:
+                self.changed[path] = status[:1]
+        if not self.staged:
+            # git diff only knows tracked files
+            out = _git(self.top, "ls-files", "-z", "--others", "--exclude-standard")
+            for path in out.decode("utf-8", "surrogateescape").split("\0"):
+                if path:
+                    self.changed.setdefault(path, "A")
+
+    # ---- path helpers ----
+    def rel(self, path):
+        """Top-relative posix path for `path` (absolute or relative to the cwd)."""
+        p = pathlib.Path(path)
+        if not p.is_absolute():
+            p = pathlib.Path.cwd() / p
+        return p.resolve().relative_to(self.top).as_posix()
+
+    def is_changed(self, path):
+        return self.rel(path) in self.changed
+
+    def changed_paths(self, suffixes=None, include_deleted=False):
+        """Changed files as absolute paths, optionally filtered by suffix."""
+        out = []
+        for rel, status in sorted(self.changed.items()):
+            if status == "D" and not include_deleted:
+                continue
+            if suffixes and pathlib.PurePosixPath(rel).suffix.lower() not in suffixes:
+                continue
+            out.append(self.top / rel)
+        return out
+
+    def filter(self, paths):
+        """Keep only the paths touched by the diff (deleted files excluded)."""
+        return [p for p in paths if self.changed.get(self.rel(p), "D") != "D"]
+
+    # ---- content ----
+    def exists(self, path):
+        if not self.staged:
+            return pathlib.Path(path).exists()
+        if self._index_paths is None:
+            listing = _git(self.top, "ls-files", "-z").decode("utf-8", "surrogateescape")
+            self._index_paths = set(p for p in listing.split("\0") if p)
+        rel = self.rel(path)
+        if rel in self._index_paths:
+            return True
+        prefix = rel.rstrip("/") + "/"
+        return any(p.startswith(prefix) for p in self._index_paths)
+
+    def prefetch(self, paths):
+        """Read the staged blobs for `paths` with one `git cat-file --batch` call."""
+        if not self.staged:
+            return
+        rels = [self.rel(p) for p in paths]
+        rels = [r for r in rels if r not in self._blobs]
+        if not rels:
+            return
+        out = _git(self.top, "cat-file", "--batch", stdin="".join(f":{r}\n" for r in rels).encode("utf-8"))
+        pos = 0
+        for r in rels:
+            nl = out.index(b"\n", pos)
+            header = out[pos:nl].split()
+            pos = nl + 1
+            if len(header) < 3 or header[1] == b"missing":
+                self._blobs[r] = None
+                continue
+            size = int(header[2])
+            self._blobs[r] = out[pos:pos + size]
+            pos += size + 1
+
+    def read_bytes(self, path):
+        if not self.staged:
+            return pathlib.Path(path).read_bytes()
+        rel = self.rel(path)
+        if rel not in self._blobs:
+            self.prefetch([path])
+        data = self._blobs.get(rel)
+        if data is None:
+            raise FileNotFoundError(f"{rel} is not in the index")
+        return data
+
+    def read_text(self, path, errors="strict"):
+        """Decoded contents with universal newlines, like pathlib.Path.read_text."""
+        text = self.read_bytes(path).decode("utf-8", errors)
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def glob_match(rel, pattern):
+    """Match a posix relative path against a repo glob where `**/` spans any number of directories."""
+    rx = _GLOB_CACHE.get(pattern)
+    if rx is None:
+        out = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+            elif pattern[i] == "*":
+                out.append("[^/]*")
+                i += 1
+            elif pattern[i] == "?":
+                out.append("[^/]")
+                i += 1
+            else:
+                out.append(re.escape(pattern[i]))
+                i += 1
+        rx = _GLOB_CACHE[pattern] = re.compile("".join(out) + r"\Z")
+    return rx.match(rel) is not None
+
+
+_GLOB_CACHE = {}
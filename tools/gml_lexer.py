@@ -0,0 +1,300 @@
+"""GML lexer shared by the Animus lint passes.
+
+One pass over a file produces:
+- a token stream of (kind, start, end) offsets into the original text,
+- a bracket-pair index mapping each opening ( [ { offset to its closing offset,
+- a "code view": the original text with comments and the contents of string
+  literals blanked to spaces (newlines and string quotes kept), so regex rules can
+  run on it with unchanged offsets and line numbers while never matching inside
+  comments or strings.
+
+code_view() is that code view alone, for passes that need nothing else, and
+lex_braces() adds only the `{ }` pair index to it.
+lex_mapped() builds the same code view for a very large file without holding it
+in memory (mapped_text.MappedSource). MappedLexedFile offers the API the lint
+passes use (pattern, finditer, code_str, iter_lines, line_of, block) over the
+mapping, with no token list and brackets paired on demand.
+"""
+import re
+from bisect import bisect_right
+from typing import NamedTuple
+
+from line_index import LineIndex
+from mapped_text import MappedSource, bytes_regex
+
+IDENT = 'ident'
+NUMBER = 'number'
+STRING = 'string'
+COMMENT = 'comment'
+PUNCT = 'punct'
+
+_TOKEN_RX = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>@"[^"]*"?|@'[^']*'?|"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?)
+  | (?P<number>0[xX][0-9A-Fa-f_]+|\$[0-9A-Fa-f]+|\d[\d_]*(?:\.\d*)?|\.\d+)
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<punct>.)
+''', re.S | re.X)
+
+_MASK_RX = re.compile(r'[^\r\n]')
+
+_OPEN = {'(': ')', '[': ']', '{': '}'}
+_CLOSE = {')': '(', ']': '[', '}': '{'}
+
+
+class Token(NamedTuple):
+    kind: str
+    start: int
+    end: int
+
+
+class LexedFile:
+    """Lexed view of one GML source file."""
+
+    def __init__(self, text, tokens, pairs, code, masked, path=None):
+        self.path = path
+        self.text = text
+        self.tokens = tokens
+        self.pairs = pairs
+        self.code = code
+        self.masked = masked
+        self._lines = None
+        self._line_index = None
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    def line_of(self, pos):
+        """1-based line number of offset `pos`."""
+        if self._line_index is None:
+            self._line_index = LineIndex(self.text)
+        return self._line_index.line_of(pos)
+
+    def close_of(self, open_index):
+        """Offset of the bracket closing the one at `open_index`, or None if unbalanced."""
+        return self.pairs.get(open_index)
+
+    def block(self, open_index):
+        """(start, end) of the contents between the bracket at `open_index` and its pair.
+        An unclosed bracket extends to the end of the file."""
+        close = self.pairs.get(open_index)
+        if close is None:
+            close = len(self.text)
+        return open_index + 1, close
+
+    # ---- API shared with MappedLexedFile ----
+    binary = False
+
+    def pattern(self, rx):
+        return rx
+
+    def finditer(self, rx):
+        return rx.finditer(self.code)
+
+    def code_str(self, start, end):
+        return self.code[start:end]
+
+    def text_str(self, start, end):
+        return self.text[start:end]
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def close(self):
+        pass
+
+    def in_code(self, pos):
+        """True if `pos` is not inside a comment or string literal."""
+        i = bisect_right(self.masked, (pos, len(self.text))) - 1
+        return i < 0 or pos >= self.masked[i][1]
+
+
+def lex(text, path=None):
+    tokens = []
+    pairs = {}
+    stacks = {'(': [], '[': [], '{': []}
+    pieces = []
+    masked = []
+    last = 0
+    for m in _TOKEN_RX.finditer(text):
+        kind = m.lastgroup
+        if kind == 'ws':
+            continue
+        start, end = m.span()
+        tokens.append(Token(kind, start, end))
+        if kind == PUNCT:
+            ch = text[start]
+            if ch in _OPEN:
+                stacks[ch].append(start)
+            elif ch in _CLOSE:
+                stack = stacks[_CLOSE[ch]]
+                if stack:
+                    pairs[stack.pop()] = start
+        elif kind == COMMENT:
+            pieces.append(text[last:start])
+            pieces.append(_MASK_RX.sub(' ', text[start:end]))
+            masked.append((start, end))
+            last = end
+        elif kind == STRING:
+            # keep the delimiters so `return "";` still reads as a valued return
+            lo = start + (2 if text[start] == '@' else 1)
+            hi = end - 1 if end - lo >= 1 and text[end - 1] == text[lo - 1] else end
+            pieces.append(text[last:lo])
+            pieces.append(_MASK_RX.sub(' ', text[lo:hi]))
+            masked.append((start, end))
+            last = hi
+    if pieces:
+        pieces.append(text[last:])
+        code = ''.join(pieces)
+    else:
+        code = text
+    return LexedFile(text, tokens, pairs, code, masked, path)
+
+
+def lex_path(path):
+    return lex(path.read_text(encoding='utf-8', errors='ignore'), path)
+
+
+# Only comments and strings change the code view. None of their opening characters
+# (/ " ' @) can occur inside an identifier, number or whitespace token, so the
+# leftmost match of this pattern is exactly the next comment/string token lex() finds.
+_MASKED_RX_B = re.compile(rb'''
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>@"[^"]*"?|@'[^']*'?|"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?)
+''', re.S | re.X)
+_MASK_RX_B = re.compile(rb'[^\r\n]')
+_MASKED_RX = re.compile(_MASKED_RX_B.pattern.decode('ascii'), re.S | re.X)
+_PAIR_RX_B = {ord('('): re.compile(rb'[()]'), ord('['): re.compile(rb'[\[\]]'), ord('{'): re.compile(rb'[{}]')}
+_CHUNK = 1 << 20
+
+
+def code_view(text):
+    """lex(text).code alone (no token list, no bracket pairs): for passes that only need
+    to know which offsets are code, such as the symbol index."""
+    pieces = []
+    last = 0
+    for m in _MASKED_RX.finditer(text):
+        start, end = m.span()
+        if m.lastgroup == 'comment':
+            lo, hi = start, end
+        else:
+            lo = start + (2 if text[start] == '@' else 1)
+            hi = end - 1 if end - lo >= 1 and text[end - 1] == text[lo - 1] else end
+        pieces.append(text[last:lo])
+        piece = text[lo:hi]
+        # most comments and strings are one line: blank them without a regex
+        pieces.append(_MASK_RX.sub(' ', piece) if '\n' in piece or '\r' in piece else ' ' * (hi - lo))
+        last = hi
+    if not pieces:
+        return text
+    pieces.append(text[last:])
+    return ''.join(pieces)
+
+
+_BRACE_RX = re.compile(r'[{}]')
+
+
+def lex_braces(text, path=None):
+    """A LexedFile with the code view and the `{`/`}` pairs only: no token list, no other
+    bracket kinds, and no in_code(). Enough for finditer(), code_str(), text_str() and block()
+    at a fraction of lex()'s cost."""
+    code = code_view(text)
+    pairs = {}
+    stack = []
+    for m in _BRACE_RX.finditer(code):
+        if code[m.start()] == '{':
+            stack.append(m.start())
+        elif stack:
+            pairs[stack.pop()] = m.start()
+    return LexedFile(text, [], pairs, code, None, path)
+
+
+def _copy(out, data, start, end, mask=False):
+    for lo in range(start, end, _CHUNK):
+        piece = data[lo:min(end, lo + _CHUNK)]
+        out.write(_MASK_RX_B.sub(b' ', piece) if mask else piece)
+
+
+class MappedLexedFile:
+    """Lexed view of a mapped (text-safe) source: `text` and `code` are mmaps of the
+    file and of its code view (a temporary file). Close it when done."""
+
+    binary = True
+
+    def __init__(self, src, code_src, path=None):
+        self.path = path
+        self.src = src
+        self.code_src = code_src
+        self.text = src.data
+        self.code = code_src.data
+        self._line_index = None
+
+    def pattern(self, rx):
+        """The bytes twin of a str regex (see mapped_text.bytes_regex)."""
+        return bytes_regex(rx)
+
+    def finditer(self, rx):
+        return self.code_src.finditer(rx)
+
+    def code_str(self, start, end):
+        return self.code_src.slice_str(start, end)
+
+    def text_str(self, start, end):
+        return self.src.slice_str(start, end)
+
+    def iter_lines(self):
+        return self.src.iter_lines()
+
+    def line_of(self, pos):
+        if self._line_index is None:
+            self._line_index = self.src.line_index()
+        return self._line_index.line_of(pos)
+
+    def block(self, open_index):
+        """Same as LexedFile.block: brackets are paired by counting forward in the code view,
+        where only punctuation brackets survive."""
+        close = len(self.code)
+        rx = _PAIR_RX_B.get(self.code[open_index]) if open_index < len(self.code) else None
+        if rx is not None:
+            opener, depth = self.code[open_index], 0
+            for m in rx.finditer(self.code, open_index):
+                depth += 1 if self.code[m.start()] == opener else -1
+                if depth == 0:
+                    close = m.start()
+                    break
+        return open_index + 1, close
+
+    def close(self):
+        self._line_index = None
+        self.text = self.code = None
+        self.code_src.close()
+        self.src.close()
+
+
+def lex_mapped(src, path=None):
+    """Code view of text-safe MappedSource `src`, streamed into a temporary file and mapped.
+    Takes ownership of `src` (closed with the result)."""
+    import tempfile   # deferred: only mapped runs pay for it
+    data = src.data
+    out = tempfile.TemporaryFile()
+    last = 0
+    for m in _MASKED_RX_B.finditer(data):
+        start, end = m.span()
+        if m.lastgroup == 'comment':
+            lo, hi = start, end
+        else:
+            lo = start + (2 if data[start] == ord('@') else 1)
+            hi = end - 1 if end - lo >= 1 and data[end - 1] == data[lo - 1] else end
+        _copy(out, data, last, lo)
+        _copy(out, data, lo, hi, mask=True)
+        last = hi
+        src.release(end)
+    _copy(out, data, last, len(data))
+    src.rewind()
+    out.flush()
+    code_src = MappedSource(None, out)
+    return MappedLexedFile(src, code_src, path)
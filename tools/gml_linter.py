@@ -1,31 +1,41 @@
 #!/usr/bin/env python3
 """Animus / GML linter: repo-aware, deterministic-safety, planner-contract, legacy ban"""
+import os
 import re
 import sys
 import pathlib
-import yaml
 import argparse
-
+from typing import NamedTuple, Optional
+from gml_lexer import lex, lex_mapped, lex_path
+from git_scope import GitError, add_scope_args, scope_from_args
+from animus_project import Project
+from config_cache import load_config
+from lint_baseline import Baseline, file_lines, fingerprints
+from lint_cache import ResultCache, digest_bytes, digest_files
+from mapped_text import MappedSource, bytes_regex, large, open_mapped
+from multi_scan import MultiScanner, Rule
+from rule_profile import RuleProfile, RuleTimer, budget_seconds
+
+# Importing this module does no I/O: the config is loaded, validated and compiled
+# on first use by rules() (once per process, parsed YAML cached in .animus_cache/).
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 cfg_path = ROOT / "tools" / "animus_rules.yaml"
-if not cfg_path.exists():
-    print("Missing tools/animus_rules.yaml", file=sys.stderr)
-    sys.exit(2)
-
-CFG = yaml.safe_load(cfg_path.read_text())
 
-REGEX_ERRORS = []
+# Bump when rule semantics change in a way the source digests below would not catch
+LINTER_VERSION = "2"
+CACHE_DIR = ROOT / ".animus_cache"
 
-def compile_regex_or_report(key, pattern, flags=0):
+def compile_regex_or_report(key, pattern, flags=0, errors=None):
     """Safely compile a regex pattern from config.
-    On error, report to stderr and return None (caller must handle skipping).
+    On error, report to stderr, record it in `errors` and return None (caller must handle skipping).
     """
     if not pattern:
         return None
     try:
         return re.compile(pattern, flags)
     except re.error as e:
-        REGEX_ERRORS.append((key, pattern, str(e)))
+        if errors is not None:
+            errors.append((key, pattern, str(e)))
         sys.stderr.write(f"[gml_linter] Invalid regex in config key '{key}': {e}\n")
         sys.stderr.write(f"[gml_linter] Pattern: {pattern!r}\n")
         return None
@@ -51,42 +61,18 @@ def validate_regex_keys(cfg: dict):
                 errors.append(f"{k}: {e}  (pattern={v!r})")
     return errors
 
-REGEX_VALIDATION_ERRORS = validate_regex_keys(CFG)
-if REGEX_VALIDATION_ERRORS:
-    for line in REGEX_VALIDATION_ERRORS:
-        sys.stderr.write(f"[gml_linter] {line}\n")
+class Finding(NamedTuple):
+    path: str
+    line: int
+    kind: str
+    msg: str
+    hint: Optional[str] = None
 
-# CLI
-ap = argparse.ArgumentParser()
-ap.add_argument('--validate-only', action='store_true', dest='validate_only', help='Validate regex config and exit.')
-args = ap.parse_args()
-
-# If requested, validate regex config and exit early (do not run scans)
-if args.validate_only:
-    if REGEX_VALIDATION_ERRORS or REGEX_ERRORS:
-        sys.stderr.write('[gml_linter] Configuration regex issues detected.\n')
-        for k, pat, err in REGEX_ERRORS:
-            sys.stderr.write(f"[gml_linter] key={k} pattern={pat!r} error={err}\n")
-        for line in REGEX_VALIDATION_ERRORS:
-            sys.stderr.write(f"[gml_linter] {line}\n")
-        sys.exit(2)
-    print('[gml_linter] regex config OK')
-    sys.exit(0)
-
-GML_FILES = [p for p in ROOT.rglob("**/*.gml") if ".git" not in str(p)]
-ISSUES = 0
-
-def emit(path, line_no, kind, msg, hint=None):
-    global ISSUES
-    ISSUES += 1
-    print(f"{path}:{line_no}: [{kind}] {msg}")
-    if hint:
+def emit(finding):
+    print(f"{finding.path}:{finding.line}: [{finding.kind}] {finding.msg}")
+    if finding.hint:
         # Use ASCII arrow to avoid console encoding issues on some terminals
-        print(f"  -> {hint}")
-
-def iter_lines(path):
-    text = path.read_text(encoding="utf-8", errors="ignore")
-    return text, text.splitlines()
+        print(f"  -> {finding.hint}")
 
 def rx(pattern, flags=0):
     try:
@@ -94,28 +80,91 @@ def rx(pattern, flags=0):
     except re.error:
         return None
 
-# ---------- Generic scans ----------
-RX_TAB     = compile_regex_or_report('ban_tabs', CFG.get('ban_tabs'))
-RX_TWS     = compile_regex_or_report('ban_trailing_ws', CFG.get('ban_trailing_ws'))
-RX_SILENT  = compile_regex_or_report('ban_silent_return', CFG.get('ban_silent_return'), re.M)
-RX_GLOBAL  = compile_regex_or_report('ban_globals', CFG.get('ban_globals'))
-RX_PLANNER = compile_regex_or_report('planner_call_regex', CFG.get('planner_call_regex'), re.S)
-
-# compile joined ban lists into a single alternation for scanning
-RX_BANS = []
-if CFG.get('ban_legacy'):
-    RX_BANS.append(('legacy', compile_regex_or_report('ban_legacy', '|'.join(CFG.get('ban_legacy', [])))))
-RX_RANDOM = []
-if CFG.get('ban_random'):
-    RX_RANDOM.append(('nondeterminism.random', compile_regex_or_report('ban_random', '|'.join(CFG.get('ban_random', [])))))
-RX_WALL = []
-if CFG.get('ban_wallclock'):
-    RX_WALL.append(('nondeterminism.wallclock', compile_regex_or_report('ban_wallclock', '|'.join(CFG.get('ban_wallclock', [])))))
-
-# optional old-signature detector
-RX_PLANNER_OLD = compile_regex_or_report('planner_old_sig_regex', CFG.get('planner_old_sig_regex'), re.S)
-
-STRAT_METHODS = CFG.get("strategy_required_methods", [])
+# Code-view bans scanned in one pass: (config key, finding kind, flags).
+# Kind None marks the rules with their own finding text (silent return, globals).
+GENERIC_KEYS = [('ban_silent_return', None, re.M), ('ban_globals', None, 0),
+                ('ban_legacy', 'legacy', 0), ('ban_random', 'nondeterminism.random', 0),
+                ('ban_wallclock', 'nondeterminism.wallclock', 0)]
+
+def generic_pattern(cfg, key):
+    # ban lists are joined into a single alternation
+    v = cfg.get(key)
+    if isinstance(v, list):
+        return '|'.join(v) if v else None
+    return v
+
+def analyze_config(cfg):
+    """Config-derived data worth caching next to the parsed YAML (JSON-ready)."""
+    meta = {}
+    for key, _, flags in GENERIC_KEYS + [('ban_tabs', None, 0)]:
+        pattern = generic_pattern(cfg, key)
+        if pattern and rx(pattern, flags) is not None:
+            meta[key] = Rule(key, pattern, flags).meta()
+    return {"validation_errors": validate_regex_keys(cfg), "rules": meta}
+
+class RuleSet:
+    """animus_rules.yaml, validated and compiled."""
+
+    def __init__(self, cfg, derived):
+        self.cfg = cfg
+        self.regex_errors = []
+        self.validation_errors = derived["validation_errors"]
+        for line in self.validation_errors:
+            sys.stderr.write(f"[gml_linter] {line}\n")
+        meta = derived["rules"]
+        compile_ = lambda key, flags=0: compile_regex_or_report(key, cfg.get(key), flags, self.regex_errors)
+
+        # ---------- Generic scans ----------
+        self.tab = compile_('ban_tabs')
+        self.tws = compile_('ban_trailing_ws')
+        self.planner = compile_('planner_call_regex', re.S)
+        # optional old-signature detector
+        self.planner_old = compile_('planner_old_sig_regex', re.S)
+        self.strat_methods = cfg.get("strategy_required_methods", [])
+        self.allowed_globals = cfg.get("allowed_globals", [])
+
+        self.generic_rules = []   # (config key, compiled, finding kind)
+        scan_rules = []
+        for key, kind, flags in GENERIC_KEYS:
+            rxp = compile_regex_or_report(key, generic_pattern(cfg, key), flags, self.regex_errors)
+            if rxp is not None:
+                self.generic_rules.append((key, rxp, kind))
+                scan_rules.append(Rule(key, rxp.pattern, flags, meta.get(key)))
+        self.generic_scan = MultiScanner(scan_rules)
+        self.tab_rule = Rule('ban_tabs', self.tab.pattern, 0, meta.get('ban_tabs')) if self.tab else None
+        self.legacy_any = rx("|".join(cfg.get("ban_legacy", []))) if cfg.get("ban_legacy") else None
+        self.legacy_rule = next((r for r in scan_rules if r.name == 'ban_legacy'), None)
+        self._binary_ok = None
+
+    @property
+    def binary_ok(self):
+        """True if every regex run on the code view has a bytes twin, so mapped files can be
+        scanned as bytes; otherwise they are linted in text mode."""
+        if self._binary_ok is None:
+            used = [rxp for _, rxp, _ in self.generic_rules] + [RX_STRAT_FIELD, RX_AGENT_TICK]
+            used += [r for r in (self.planner, self.planner_old, self.legacy_any) if r is not None]
+            pref = self.cfg.get("prefer_snapshot_false", {})
+            if pref.get("enabled", False):
+                used.append(rx(pref.get("pattern", "")))
+            self._binary_ok = all(r is not None and bytes_regex(r) is not None for r in used)
+        return self._binary_ok
+
+_RULES = None
+
+def rules():
+    """The process-wide RuleSet, loaded on first use."""
+    global _RULES
+    if _RULES is None:
+        try:
+            cfg, derived = load_config(cfg_path, config_version(), analyze_config, CACHE_DIR)
+        except FileNotFoundError:
+            print("Missing tools/animus_rules.yaml", file=sys.stderr)
+            sys.exit(2)
+        _RULES = RuleSet(cfg, derived)
+    return _RULES
+
+RX_STRAT_FIELD = re.compile(r'\b(?:build_strategy|create_strategy|strategy_factory|make_strategy|strategy_builder)\b\s*=\s*{')
+RX_AGENT_TICK = re.compile(r'\bagent(?:\.|)?tick\s*\([^)]*\)\s*{')
 
 def count_args(arg_str):
     # count top-level commas not inside () [] {}
@@ -127,172 +176,461 @@ def count_args(arg_str):
         elif ch == "," and depth == 0: cnt += 1
     return cnt
 
-def scan_generic(path):
-    text, lines = iter_lines(path)
-    # tabs & trailing whitespace
-    for i, ln in enumerate(lines, 1):
-        if RX_TAB and RX_TAB.search(ln): emit(path, i, "style.tabs", "Tab character")
-        if RX_TWS and RX_TWS.search(ln): emit(path, i, "style.trailing_ws", "Trailing whitespace")
-    # silent returns
-    if RX_SILENT:
-        for m in RX_SILENT.finditer(text):
-            line_no = text.count('\n', 0, m.start()) + 1
-            emit(path, line_no, "logic.silent_return", "Use explicit outcome instead of bare `return;`")
-    # globals
-    if RX_GLOBAL:
-        for m in RX_GLOBAL.finditer(text):
-            token = m.group(0)
-            if token not in CFG.get("allowed_globals", []):
-                line_no = text.count('\n', 0, m.start()) + 1
-                emit(path, line_no, "arch.global_state", f"Global usage `{token}` not allowed", "Refactor to pass state/context")
-    # legacy bans and nondeterminism / wallclock
-    for kind, rxp in RX_BANS + RX_RANDOM + RX_WALL:
-        if rxp is None: continue
-        for m in rxp.finditer(text):
-            line_no = text.count('\n', 0, m.start()) + 1
-            emit(path, line_no, kind, f"Forbidden pattern: `{m.group(0)}`")
-
-def scan_planner_calls(path):
-    if not RX_PLANNER:
+def scan_generic(lf, out, timer):
+    rs = rules()
+    path, code = lf.path, lf.code
+    # tabs & trailing whitespace (raw lines: a tab inside a string is still a tab)
+    if rs.tab and rs.tab_rule.possible(lf.text):
+        with timer.rule("ban_tabs", len(lf.text), out) as probe:
+            for i, ln in enumerate(lf.iter_lines(), 1):
+                if rs.tab.search(ln):
+                    probe.matches += 1
+                    out.append(Finding(str(path), i, "style.tabs", "Tab character"))
+    if rs.tws:
+        with timer.rule("ban_trailing_ws", len(lf.text), out) as probe:
+            for i, ln in enumerate(lf.iter_lines(), 1):
+                if rs.tws.search(ln):
+                    probe.matches += 1
+                    out.append(Finding(str(path), i, "style.trailing_ws", "Trailing whitespace"))
+
+    # the remaining rules run on the code view so comments and strings never match;
+    # rules whose literals are absent are skipped, the rest share one master-regex pass
+    possible = rs.generic_scan.possible(code)
+    if not possible:
         return
-    text, _ = iter_lines(path)
-    for m in RX_PLANNER.finditer(text):
-        # prefer explicit (?P<args>) capture if provided in regex
-        args = None
-        try:
-            if 'args' in m.re.groupindex:
-                args = m.group('args')
-        except Exception:
+    hits = None
+    if not timer.profile:
+        with timer.rule("generic bans (one pass)", len(code)) as probe:
+            hits = rs.generic_scan.scan(code, possible, lf.finditer)
+            probe.matches = sum(map(len, hits.values()))
+    if hits is None:
+        # profiling, or the combined pass blew the budget: rule by rule, so each is timed
+        # (and a runaway one skipped) on its own
+        if not timer.profile:
+            timer.rows.pop()   # the combined pass's timeout; the culprit is reported below
+        hits = {}
+        for i in possible:
+            rule = rs.generic_scan.rules[i]
+            spans = []
+            with timer.rule(rule.name, len(code), spans) as probe:
+                for m in probe.count(lf.finditer(rule.brx if lf.binary else rule.rx)):
+                    spans.append(m.span())
+            if spans:
+                hits[rule.name] = spans
+
+    for key, _, kind in rs.generic_rules:
+        for start, end in hits.get(key, ()):
+            line_no = lf.line_of(start)
+            token = lf.code_str(start, end)
+            if key == 'ban_silent_return':
+                out.append(Finding(str(path), line_no, "logic.silent_return", "Use explicit outcome instead of bare `return;`"))
+            elif key == 'ban_globals':
+                if token not in rs.allowed_globals:
+                    out.append(Finding(str(path), line_no, "arch.global_state", f"Global usage `{token}` not allowed", "Refactor to pass state/context"))
+            else:
+                out.append(Finding(str(path), line_no, kind, f"Forbidden pattern: `{token}`"))
+
+def scan_planner_calls(lf, out, timer):
+    rs = rules()
+    if not rs.planner:
+        return
+    path, code = lf.path, lf.code
+    calls = []   # (match span, arg-count finding, plan-shape finding)
+    with timer.rule("planner_call_regex", len(code), calls) as probe:
+        for m in probe.count(lf.finditer(lf.pattern(rs.planner))):
+            # prefer explicit (?P<args>) capture if provided in regex
             args = None
-
-        if args is None:
-            # fallback: naive capture of (...) region following the match
-            start = m.end()
-            depth = 1
-            i = start
-            while i < len(text) and depth > 0:
-                if text[i] == "(":
-                    depth += 1
-                elif text[i] == ")":
-                    depth -= 1
-                i += 1
-            args = text[start:i-1]
-            tail = text[i:i+200]
-        else:
-            # compute tail for plan_shape assertion from end of match
-            tail = text[m.end():m.end()+200]
-
-        argc = count_args(args)
-        req = CFG.get('required_arg_count', 0)
-        if req and argc != req:
-            line_no = text.count('\n', 0, m.start()) + 1
-            emit(path, line_no, 'contract.planner_args',
-                 f"`planner.plan(...)` expects {req} args, found {argc}",
-                 'Use: plan(agent, goals_to_check, last_goal, memory)')
-
-        # additionally detect known old 3-arg signature if configured
-        if RX_PLANNER_OLD:
             try:
-                # check old signature in the matched span
-                span = m.group(0)
-                if RX_PLANNER_OLD.search(span):
-                    line_no = text.count('\n', 0, m.start()) + 1
-                    emit(path, line_no, 'contract.planner_old_sig',
-                         'Found legacy planner.plan(...) signature with 3 args; consider adding memory argument',
-                         'Upgrade to planner.plan(agent, goals, last_goal, memory)')
+                if 'args' in m.re.groupindex and m.start('args') >= 0:
+                    args = lf.code_str(*m.span('args'))
             except Exception:
-                pass
-
-        # encourage plan shape assertion nearby
-        if 'assert_plan_shape' not in tail:
-            line_no = text.count('\n', 0, m.start()) + 1
-            emit(path, line_no, 'contract.plan_shape.assertion',
-                 'Missing `Animus_Core.assert_plan_shape(plan)` after planner call')
-
-def scan_strategy_structs(path):
-    text, _ = iter_lines(path)
+                args = None
+
+            if args is None:
+                # fallback: the (...) region following the match, from the bracket index
+                start, close = lf.block(m.end() - 1)
+                args = lf.code_str(start, close)
+                tail = lf.code_str(close + 1, close + 201)
+            else:
+                # compute tail for plan_shape assertion from end of match
+                tail = lf.code_str(m.end(), m.end() + 200)
+
+            line_no = lf.line_of(m.start())
+            argc = count_args(args)
+            req = rs.cfg.get('required_arg_count', 0)
+            arg_finding = None
+            if req and argc != req:
+                arg_finding = Finding(str(path), line_no, 'contract.planner_args',
+                                      f"`planner.plan(...)` expects {req} args, found {argc}",
+                                      'Use: plan(agent, goals_to_check, last_goal, memory)')
+
+            # encourage plan shape assertion nearby
+            shape_finding = None
+            if 'assert_plan_shape' not in tail:
+                shape_finding = Finding(str(path), line_no, 'contract.plan_shape.assertion',
+                                        'Missing `Animus_Core.assert_plan_shape(plan)` after planner call')
+            calls.append((m.span(), arg_finding, shape_finding))
+
+    # additionally detect known old 3-arg signature if configured (timed as its own rule)
+    old_sig = []
+    if rs.planner_old and calls:
+        with timer.rule("planner_old_sig_regex", sum(end - start for (start, end), _, _ in calls), old_sig) as probe:
+            for i, (span, _, _) in enumerate(calls):
+                try:
+                    # check old signature in the matched span
+                    if rs.planner_old.search(lf.code_str(*span)):
+                        probe.matches += 1
+                        old_sig.append(i)
+                except Exception:
+                    pass
+    old_sig = set(old_sig)
+
+    for i, (span, arg_finding, shape_finding) in enumerate(calls):
+        if arg_finding:
+            out.append(arg_finding)
+        if i in old_sig:
+            out.append(Finding(str(path), lf.line_of(span[0]), 'contract.planner_old_sig',
+                               'Found legacy planner.plan(...) signature with 3 args; consider adding memory argument',
+                               'Upgrade to planner.plan(agent, goals, last_goal, memory)'))
+        if shape_finding:
+            out.append(shape_finding)
+
+def scan_strategy_structs(lf, out, timer):
+    rs = rules()
+    path, code = lf.path, lf.code
     # Look for common strategy-factory fields assigned a struct literal, e.g. `build_strategy = { ... }`
     # Use a stricter pattern to avoid matching occurrences inside lists or comments.
-    for m in re.finditer(r'\b(?:build_strategy|create_strategy|strategy_factory|make_strategy|strategy_builder)\b\s*=\s*{', text):
-        struct_start = m.end()-1
-        depth = 1
-        i = struct_start
-        while i < len(text) and depth > 0:
-            if text[i] == "{": depth += 1
-            elif text[i] == "}": depth -= 1
-            i += 1
-        block = text[struct_start:i]
-        missing = []
-        for name in STRAT_METHODS:
-            if re.search(rf'\b{name}\s*=\s*function\s*\(', block) is None:
-                missing.append(name)
-        if missing:
-            line_no = text.count('\n', 0, m.start()) + 1
-            emit(path, line_no, "contract.strategy_iface",
-                 f"Strategy missing methods: {', '.join(missing)}",
-                 "Use templates in Animus_StrategyTemplates.gml or implement required methods.")
-
-def scan_snapshot_usage(path):
-    pref = CFG.get("prefer_snapshot_false", {})
+    with timer.rule("strategy_required_methods", len(code), out) as probe:
+        for m in probe.count(lf.finditer(lf.pattern(RX_STRAT_FIELD))):
+            start, close = lf.block(m.end() - 1)
+            block = lf.code_str(start, close)
+            missing = []
+            for name in rs.strat_methods:
+                if re.search(rf'\b{name}\s*=\s*function\s*\(', block) is None:
+                    missing.append(name)
+            if missing:
+                line_no = lf.line_of(m.start())
+                out.append(Finding(str(path), line_no, "contract.strategy_iface",
+                                   f"Strategy missing methods: {', '.join(missing)}",
+                                   "Use templates in Animus_StrategyTemplates.gml or implement required methods."))
+
+def scan_snapshot_usage(lf, out, timer):
+    pref = rules().cfg.get("prefer_snapshot_false", {})
     if not pref.get("enabled", False):
         return
-    text, _ = iter_lines(path)
-    for m in re.finditer(pref.get("pattern", ""), text):
-        arg = m.group(1).strip()
-        line_no = text.count('\n', 0, m.start()) + 1
-        if arg == "" or arg.lower() == "true":
-            emit(path, line_no, "perf.snapshot",
-                 "Prefer `memory.snapshot(false)` before planning",
-                 "Pass false to avoid deep clone when stable input suffices")
+    path = lf.path
+    with timer.rule("prefer_snapshot_false", len(lf.code), out) as probe:
+        for m in probe.count(lf.finditer(lf.pattern(re.compile(pref.get("pattern", ""))))):
+            # read the argument from the original text; the code view blanks string literals
+            arg = lf.text_str(m.start(1), m.end(1)).strip()
+            line_no = lf.line_of(m.start())
+            if arg == "" or arg.lower() == "true":
+                out.append(Finding(str(path), line_no, "perf.snapshot",
+                                   "Prefer `memory.snapshot(false)` before planning",
+                                   "Pass false to avoid deep clone when stable input suffices"))
+
+def scan_core_contracts(lf, out, timer):
+    """Planner/agent/executor contracts, enforced more strictly in core files."""
+    rs = rules()
+    path, code = lf.path, lf.code
+    core = rs.cfg.get("core_files", {})
+    # Planner must not reference legacy nodes
+    if rs.legacy_any and any(path.match(glob) for glob in core.get("planner", [])) \
+            and (rs.legacy_rule is None or rs.legacy_rule.possible(code)):
+        with timer.rule("core_files.planner", len(code), out) as probe:
+            if lf.pattern(rs.legacy_any).search(code):
+                probe.matches += 1
+                out.append(Finding(str(path), 1, "arch.legacy_in_planner", "Planner references legacy plan containers"))
+
+    # Agent should orchestrate only: flag long function bodies in tick
+    if any(path.match(glob) for glob in core.get("agent", [])):
+        with timer.rule("core_files.agent", len(code), out) as probe:
+            for m in probe.count(lf.finditer(lf.pattern(RX_AGENT_TICK))):
+                start, close = lf.block(m.end() - 1)
+                body = lf.code_str(start, close)
+                # heuristic: too many assignments/branches inside tick
+                if len(re.findall(r'=', body)) > 40 or len(re.findall(r'\bif\b|\bswitch\b', body)) > 12:
+                    line_no = lf.line_of(m.start())
+                    out.append(Finding(str(path), line_no, "arch.agent_too_heavy",
+                                       "Agent.tick seems to contain heavy logic (heuristic)",
+                                       "Delegate logic to planner/executor; keep tick orchestration-only."))
 
 def file_matches(path, globs):
     return any(path.match(glob) for glob in globs)
 
-def main():
-    for f in GML_FILES:
-        scan_generic(f)
-        scan_planner_calls(f)
-        scan_strategy_structs(f)
-        scan_snapshot_usage(f)
-
-    # Enforce planner/agent/executor contracts more strictly in core files
-    for f in GML_FILES:
-        # Planner must not reference legacy nodes
-        if any(f.match(glob) for glob in CFG.get("core_files", {}).get("planner", [])):
-            text, _ = iter_lines(f)
-            if re.search("|".join(CFG.get("ban_legacy", [])), text):
-                emit(f, 1, "arch.legacy_in_planner", "Planner references legacy plan containers")
-
-        # Agent should orchestrate only: flag long function bodies in tick
-        if any(f.match(glob) for glob in CFG.get("core_files", {}).get("agent", [])):
-            text, _ = iter_lines(f)
-            for m in re.finditer(r'\bagent(?:\.|)?tick\s*\([^)]*\)\s*{', text):
-                start = m.end()
-                depth = 1; i = start
-                while i < len(text) and depth > 0:
-                    if text[i] == "{": depth += 1
-                    elif text[i] == "}": depth -= 1
-                    i += 1
-                body = text[start:i-1]
-                # heuristic: too many assignments/branches inside tick
-                if len(re.findall(r'=', body)) > 40 or len(re.findall(r'\bif\b|\bswitch\b', body)) > 12:
-                    line_no = text.count('\n', 0, m.start()) + 1
-                    emit(f, line_no, "arch.agent_too_heavy",
-                         "Agent.tick seems to contain heavy logic (heuristic)",
-                         "Delegate logic to planner/executor; keep tick orchestration-only.")
+def lint_file(path, text=None, budget=None, profile=False, mapped=False):
+    """Lint one file (or `text` standing in for its contents). Returns (scan findings,
+    core-contract findings, rule rows); workers send these back to the parent, which
+    reports them in a fixed order. Rule rows are [rule, seconds, matches, bytes,
+    timed_out]: every rule when profiling, otherwise only rules that blew `budget`.
+    With `mapped` the file is scanned as mapped bytes when that gives the same findings
+    (see mapped_text), so memory does not grow with its size."""
+    lf = None
+    if mapped and text is None and rules().binary_ok:
+        src = open_mapped(path)
+        if src is not None:
+            lf = lex_mapped(src, path)
+    if lf is None:
+        lf = lex_path(path) if text is None else lex(text, path)
+    timer = RuleTimer(budget, profile)
+    scans, contracts = [], []
+    try:
+        scan_generic(lf, scans, timer)
+        scan_planner_calls(lf, scans, timer)
+        scan_strategy_structs(lf, scans, timer)
+        scan_snapshot_usage(lf, scans, timer)
+        scan_core_contracts(lf, contracts, timer)
+    finally:
+        lf.close()
+    return scans, contracts, timer.rows
+
+def cache_fingerprint():
+    here = pathlib.Path(__file__).resolve().parent
+    sources = [here / "gml_linter.py", here / "gml_lexer.py", here / "line_index.py", here / "rule_profile.py",
+               here / "multi_scan.py", here / "mapped_text.py"]
+    return digest_bytes(LINTER_VERSION.encode(), digest_files([cfg_path] + sources).encode())
+
+def config_version():
+    """Key of the cached analyze_config output (prefilter literals, validation errors): the
+    sources that compute it, so editing Rule.meta() or the validation invalidates it."""
+    here = pathlib.Path(__file__).resolve().parent
+    return LINTER_VERSION + ":" + digest_files([here / "gml_linter.py", here / "multi_scan.py"])
+
+def cache_key(path, data):
+    rel = path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else str(path)
+    return digest_bytes(rel.encode("utf-8"), b"\0", data)
+
+def pack(findings):
+    return [[f.line, f.kind, f.msg, f.hint] for f in findings]
+
+def unpack(path, rows):
+    return [Finding(str(path), *row) for row in rows]
+
+def gather_files(project, paths=None):
+    if paths:
+        # explicit files, in the order given (a diff scope still filters them)
+        files = [pathlib.Path(p).resolve() for p in paths]
+        return project.scope.filter(files) if project.scope is not None else files
+    if project.scope is not None:
+        # only the touched files; never walk the tree
+        return [p for p in project.scope.changed_paths({".gml"})
+                if p.is_relative_to(ROOT) and ".git" not in str(p)]
+    return sorted(p for p in (ROOT / rel for rel in project.files(".gml")) if ".git" not in str(p))
+
+def report_regex_errors():
+    sys.stderr.write("[gml_linter] Configuration regex issues detected.\n")
+    rs = rules()
+    for k, pat, err in rs.regex_errors:
+        sys.stderr.write(f"[gml_linter] key={k} pattern={pat!r} error={err}\n")
+    for line in rs.validation_errors:
+        sys.stderr.write(f"[gml_linter] {line}\n")
+
+def config_errors():
+    rs = rules()
+    return bool(rs.regex_errors or rs.validation_errors)
+
+def build_parser():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--validate-only', action='store_true', dest='validate_only', help='Validate regex config and exit.')
+    ap.add_argument('--jobs', '-j', type=int, default=1,
+                    help='Lint files in N worker processes (0 = one per CPU). Output matches a serial run.')
+    ap.add_argument('--no-cache', action='store_true', help='Ignore and do not update .animus_cache/lint.json.')
+    ap.add_argument('--cache-max-mb', type=float, default=64, help='Size bound for the lint cache (default 64).')
+    ap.add_argument('--profile', nargs='?', type=int, const=10, default=None, metavar='N',
+                    help='Report time, matches and bytes per rule and per file (top N, default 10) on stderr. Bypasses the cache.')
+    ap.add_argument('--profile-json', metavar='PATH', help='Write the full rule/file profile as JSON (implies --profile).')
+    ap.add_argument('--rule-budget-ms', type=int, default=None,
+                    help='Skip a rule that runs longer than this on one file (default: rule_time_budget_ms in the config; 0 = off).')
+    ap.add_argument('--mmap-threshold-mb', type=float, default=16,
+                    help='Scan files of at least this size as mapped bytes in bounded memory (default 16; 0 = never).')
+    ap.add_argument('--baseline', metavar='PATH',
+                    help='Report only findings not in this baseline, and the baseline entries fixed since '
+                         '(default: baseline_path in the config, when that file exists).')
+    ap.add_argument('--no-baseline', action='store_true', help='Report every finding, ignoring the baseline.')
+    ap.add_argument('--write-baseline', nargs='?', const='', default=None, metavar='PATH',
+                    help='Record the current findings as the baseline (default path: baseline_path in the config) '
+                         'instead of reporting them. A run over some files replaces only their entries.')
+    ap.add_argument('paths', nargs='*', help='Lint only these .gml files (default: every .gml under the repo).')
+    add_scope_args(ap)
+    return ap
+
+def baseline_path(value):
+    return ROOT / (value or rules().cfg.get('baseline_path', 'tools/gml_lint_baseline.json'))
+
+def apply_baseline(files, results, mapped, project, args, whole_tree):
+    """Write the baseline (--write-baseline), or drop the findings it knows from `results`.
+    Returns (exit code to stop with or None, function printing the fixed entries or None)."""
+    writing = getattr(args, 'write_baseline', None) is not None
+    if not writing and getattr(args, 'no_baseline', False):
+        return None, None
+    path = baseline_path(args.write_baseline if writing else getattr(args, 'baseline', None))
+    try:
+        baseline = Baseline.load(path)
+    except ValueError as e:
+        sys.stderr.write(f"[gml_linter] unreadable baseline {path}: {e}\n")
+        return 2, None
+    if baseline is None and not writing:
+        if getattr(args, 'baseline', None):
+            sys.stderr.write(f"[gml_linter] baseline not found: {path}\n")
+            return 2, None
+        return None, None
+
+    seen = set()
+    linted = set()
+    suppressed = 0
+    for i, f in enumerate(files):
+        rel = f.relative_to(ROOT).as_posix()
+        linted.add(rel)
+        scans, contracts, rows = results[i]
+        if not (scans or contracts):
+            continue
+        line_of = file_lines(f, None if mapped[i] else project.read_text(f, errors="ignore"))
+        fps = fingerprints(rel, scans + contracts, line_of)
+        seen.update(fps)
+        if writing:
+            continue
+        new = [fp not in baseline.entries for fp in fps]
+        suppressed += new.count(False)
+        results[i] = ([x for x, n in zip(scans, new) if n], [x for x, n in zip(contracts, new[len(scans):]) if n], rows)
+
+    if writing:
+        # entries of files this run did not lint are kept (all of them are linted over the whole tree)
+        kept = set() if baseline is None or whole_tree else {e for e in baseline.entries if e[0] not in linted}
+        try:
+            Baseline(kept | seen).save(path)
+        except OSError as e:
+            sys.stderr.write(f"[gml_linter] cannot write {path}: {e}\n")
+            return 2, None
+        print(f"[gml_linter] baseline: {len(seen)} findings in {len(linted)} files recorded -> {path}")
+        return (2 if config_errors() else 0), None
+
+    # over the whole tree, entries of files that are gone are fixed too
+    fixed = baseline.fixed(seen, None if whole_tree else linted)
+
+    def report():
+        for rel, kind, content, _occurrence in fixed:
+            print(f"{ROOT / rel}: [{kind}] fixed since the baseline: {content}")
+        sys.stderr.write(f"[gml_linter] baseline {path.name}: {suppressed} known findings suppressed, {len(fixed)} fixed"
+                         + (" (regenerate with `python tools/animus.py baseline`)" if fixed else "") + "\n")
+    return None, report
+
+def run(project, args):
+    """Lint the project's .gml files; prints findings and returns the exit code."""
+    if args.profile_json and args.profile is None:
+        args.profile = 10
+    profiling = args.profile is not None
+    budget = budget_seconds(args.rule_budget_ms, rules().cfg)
+
+    files = gather_files(project, getattr(args, 'paths', None))
+    outside = [f for f in files if not f.is_relative_to(ROOT)]
+    if outside:
+        sys.stderr.write(f"[gml_linter] not inside the repository: {outside[0]}\n")
+        return 2
+    project.prefetch(files)
+    read_bytes = project.read_bytes
+    results = [None] * len(files)
+    # very large working-tree files are mapped instead of read (staged blobs are in memory anyway)
+    min_bytes = 0 if project.staged else int(getattr(args, 'mmap_threshold_mb', 0) * 1024 * 1024)
+    mapped = [large(f, min_bytes) for f in files]
+
+    # Replay findings for files whose bytes (and the rules config) are unchanged
+    cache = None
+    keys = [None] * len(files)
+    if not args.no_cache and not profiling:
+        cache = ResultCache(CACHE_DIR / "lint.json", cache_fingerprint(),
+                            int(args.cache_max_mb * 1024 * 1024)).load()
+        for i, f in enumerate(files):
+            if mapped[i]:
+                with MappedSource(f) as src:
+                    keys[i] = cache_key(f, src.data)
+            else:
+                keys[i] = cache_key(f, read_bytes(f))
+            hit = cache.get(keys[i])
+            if hit is not None:
+                results[i] = (unpack(f, hit[0]), unpack(f, hit[1]), [])
+    todo = [i for i in range(len(files)) if results[i] is None]
+
+    # contents come from the project (the index for staged runs), read once
+    texts = [None if mapped[i] else project.read_text(files[i], errors="ignore") for i in todo]
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if jobs > 1 and len(todo) > 1:
+        from concurrent.futures import ProcessPoolExecutor   # only parallel runs pay for the import
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # map() yields in submission order, i.e. sorted path order
+            fresh = pool.map(lint_file, [files[i] for i in todo], texts,
+                             [budget] * len(todo), [profiling] * len(todo), [mapped[i] for i in todo],
+                             chunksize=max(1, len(todo) // (jobs * 8)))
+            for i, res in zip(todo, fresh):
+                results[i] = res
+    else:
+        for i, text in zip(todo, texts):
+            results[i] = lint_file(files[i], text, budget, profiling, mapped[i])
+
+    if cache is not None:
+        for i in todo:
+            # a file where a rule was cut short is re-linted next time
+            if not any(row[4] for row in results[i][2]):
+                cache.put(keys[i], [pack(results[i][0]), pack(results[i][1])])
+        cache.save()
+
+    prof = RuleProfile()
+    for f, (_, _, rows) in zip(files, results):
+        prof.add(f, rows)
+        for rule, secs, _, _, timed_out in rows:
+            if timed_out:
+                sys.stderr.write(f"[gml_linter] rule '{rule}' exceeded the {budget * 1000:.0f} ms budget on {f} "
+                                 f"({secs * 1000:.0f} ms); its findings for this file were skipped\n")
+
+    whole_tree = project.scope is None and not getattr(args, 'paths', None)
+    code, report_fixed = apply_baseline(files, results, mapped, project, args, whole_tree)
+    if code is not None:
+        return code
+
+    issues = 0
+    for scans, _, _ in results:
+        for finding in scans:
+            emit(finding)
+        issues += len(scans)
+
+    # Core-file contracts are reported after the generic scans of every file
+    for _, contracts, _ in results:
+        for finding in contracts:
+            emit(finding)
+        issues += len(contracts)
+    if report_fixed is not None:
+        report_fixed()
+
+    if profiling:
+        prof.report(args.profile, write=lambda line: sys.stderr.write(line + "\n"))
+        if args.profile_json:
+            prof.write_json(args.profile_json)
+            sys.stderr.write(f"[profile] wrote {args.profile_json}\n")
 
     # If there were regex validation errors, print a concise summary and fail
-    if REGEX_ERRORS or REGEX_VALIDATION_ERRORS:
-        sys.stderr.write("[gml_linter] Configuration regex issues detected.\n")
-        for k, pat, err in REGEX_ERRORS:
-            sys.stderr.write(f"[gml_linter] key={k} pattern={pat!r} error={err}\n")
-        for line in REGEX_VALIDATION_ERRORS:
-            sys.stderr.write(f"[gml_linter] {line}\n")
+    if config_errors():
+        report_regex_errors()
         # Exit with distinct code so CI can detect config problems
-        sys.exit(2)
+        return 2
+
+    return 1 if issues else 0
+
+def main():
+    args = build_parser().parse_args()
+
+    # If requested, validate regex config and exit early (do not run scans)
+    if args.validate_only:
+        if config_errors():
+            report_regex_errors()
+            sys.exit(2)
+        print('[gml_linter] regex config OK')
+        sys.exit(0)
 
-    if ISSUES:
-        sys.exit(1)
+    try:
+        scope = scope_from_args(args, ROOT)
+    except GitError as e:
+        sys.stderr.write(f"[gml_linter] {e}\n")
+        sys.exit(2)
+    sys.exit(run(Project(ROOT, scope), args))
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
-import re, sys, pathlib
+import argparse, re, sys, pathlib
+from animus_project import Project
+from mapped_text import as_source, large, open_mapped
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
-GML = list(ROOT.rglob("**/*.gml"))
-bad = 0
+# files at least this big are scanned as mapped bytes (bounded memory, same findings)
+MMAP_MIN_BYTES = 16 * 1024 * 1024
 
 rules = [
   ("Silent return (no value)", re.compile(r'^\s*return\s*;\s*$', re.M)),
@@ -12,24 +14,45 @@ rules = [
   ("Global usage", re.compile(r'\bglobal\.\w+')),
   ("Legacy GOAP_Node/Plan creation", re.compile(r'\bGOAP_Node\b|\bGOAP_ActionPlan\b')),
 ]
+need = ["start", "update", "stop", "invariant_check"]
+need_rx = {n: re.compile(rf'\b{n}\s*=\s*function') for n in need}
 
-for f in GML:
-    try:
-        text = f.read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        continue
+def check(f, src):
+    bad = 0
+    index = src.line_index()
     for name, rx in rules:
         if rx:
-            for m in rx.finditer(text):
-                lineno = text.count('\n', 0, m.start()) + 1
+            for m in src.finditer(rx):
+                lineno = index.line_of(m.start())
                 print(f"{f}:{lineno}: {name}")
                 bad += 1
     # crude strategy interface check
-    if "build_strategy" in text and "function" in text:
-        need = ["start", "update", "stop", "invariant_check"]
-        missing = [n for n in need if re.search(rf'\b{n}\s*=\s*function', text) is None]
+    if src.find("build_strategy") != -1 and src.find("function") != -1:
+        missing = [n for n in need if src.search(need_rx[n]) is None]
         if missing:
             print(f"{f}:1: Strategy missing methods: {', '.join(missing)}")
             bad += 1
+    return bad
 
-sys.exit(1 if bad else 0)
+def run(project, min_bytes=MMAP_MIN_BYTES):
+    bad = 0
+    for rel in project.files(".gml"):
+        f = ROOT / rel
+        src = open_mapped(f) if not project.staged and large(f, min_bytes) else None
+        if src is None:
+            try:
+                src = as_source(project.read_text(rel, errors="ignore"))
+            except Exception:
+                continue
+        try:
+            bad += check(f, src)
+        finally:
+            src.close()
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mmap-threshold-mb", type=float, default=MMAP_MIN_BYTES / (1024 * 1024),
+                    help="scan files of at least this size as mapped bytes in bounded memory (0 = never)")
+    args = ap.parse_args()
+    sys.exit(run(Project(ROOT), int(args.mmap_threshold_mb * 1024 * 1024)))
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""Memory-key registry for the planner's flat (key-interned) states.
+
+Cloning a state struct walks variable_struct_get_names, and state_hash sorts the
+key names for every node. Given a registry, Animus_Planner keeps search states
+as arrays indexed by key instead. A clone is then one array copy, and the hash
+walks a precomputed key order, producing the same string as state_hash. This
+applies whenever every predicate key of the plan() call is registered; otherwise
+the planner keeps structs for that call. Memory keys that no predicate references
+stay out of the array, because no action can change them: they hash as constant
+text.
+
+Keys are collected as Animus_Predicate.extract_keys_from_action sees them:
+  - literal `new Animus_Action(name, [...], [...])` / `new Animus_Goal(name, [...])`
+    calls in the project's .gml (and the GOAP_* aliases): "key" / "!key" strings,
+    [key, value, op] arrays, {key:}/{name:} structs;
+  - the memory_key of literal `new Animus_Belief(name, "key" | {memory_key: "key"})`;
+  - the actions, goals and `beliefs` of planner_sim fixtures (--fixture).
+Predicates built at run time cannot be seen and are counted as dynamic. If one of
+them uses an unregistered key, that plan() falls back to struct states. So does
+a plan() over an action whose cost is callable: cost(state) reads the struct by
+key (Animus_Action.cost_reads_state; in fixtures, a {base, key, per} cost).
+
+Indices are dense and stable: a regenerated registry keeps the order of the keys
+it already had and appends new ones (sorted). Removed keys close their gaps.
+
+--verify runs each fixture through planner_sim twice, with struct states and with
+flat states, and fails unless every hash computed and every plan match. A fixture
+with a state-dependent cost must keep struct states (tools/planner_fixtures/hauler.yaml).
+"""
+import argparse
+import json
+import pathlib
+import re
+import sys
+
+from animus_project import Project
+from gml_lexer import IDENT, NUMBER, PUNCT, STRING, lex
+from planner_sim import (agents, domain, fixture_config, gml_string, intern, load_fixture, plan, prioritized,
+                         search_plan)
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+ACTION_CTORS = {"Animus_Action", "GOAP_Action"}
+GOAL_CTORS = {"Animus_Goal", "GOAP_Goal"}
+BELIEF_CTORS = {"Animus_Belief", "GOAP_Belief"}
+CTOR_RX = re.compile(r"\b(?:Animus|GOAP)_(?:Action|Goal|Belief)\b")
+ENTRY_RX = re.compile(r'variable_struct_set\(index, ("(?:[^"\\]|\\.)*"), (\d+)\);')
+
+
+def _literal(text):
+    if text.startswith("@"):
+        return text[2:-1]
+    return re.sub(r"\\(.)", r"\1", text[1:-1])
+
+
+class _Source:
+    """Tokens of one file with the helpers the scan needs."""
+    def __init__(self, text):
+        self.lexed = lex(text)
+        self.text = text
+        self.tokens = [t for t in self.lexed.tokens if t.kind != "comment"]
+        self.at = {t.start: i for i, t in enumerate(self.tokens)}
+
+    def word(self, i):
+        t = self.tokens[i]
+        return self.text[t.start:t.end]
+
+    def items(self, open_i):
+        """Token index ranges [lo, hi) of the comma-separated items inside the bracket at open_i."""
+        close = self.lexed.pairs.get(self.tokens[open_i].start)
+        if close is None:
+            return []
+        end = self.at[close]
+        out, lo, i = [], open_i + 1, open_i + 1
+        while i < end:
+            t = self.tokens[i]
+            if t.kind == PUNCT and self.text[t.start] in "([{" and t.start in self.lexed.pairs:
+                i = self.at[self.lexed.pairs[t.start]] + 1
+                continue
+            if t.kind == PUNCT and self.text[t.start] == ",":
+                out.append((lo, i))
+                lo = i + 1
+            i += 1
+        if lo < end:
+            out.append((lo, end))
+        return out
+
+    def literal(self, lo, hi):
+        """The value of a lone string/number token in [lo, hi), or None."""
+        if hi - lo != 1:
+            return None
+        t = self.tokens[lo]
+        if t.kind == STRING:
+            return _literal(self.text[t.start:t.end])
+        if t.kind == NUMBER:
+            try:
+                return gml_string(float(self.word(lo)))
+            except ValueError:
+                return None
+        return None
+
+    def opens(self, lo, hi, ch):
+        """True if [lo, hi) is exactly one bracketed literal opened by `ch`."""
+        if hi <= lo or self.word(lo) != ch:
+            return False
+        close = self.lexed.pairs.get(self.tokens[lo].start)
+        return close is not None and self.at[close] == hi - 1
+
+    def field(self, lo, names):
+        """The literal value of the first of `names` set in the struct literal at lo."""
+        found = {}
+        for a, b in self.items(lo):
+            if b - a >= 3 and self.tokens[a].kind in (IDENT, STRING) and self.word(a + 1) == ":":
+                name = self.word(a) if self.tokens[a].kind == IDENT else _literal(self.word(a))
+                found.setdefault(name, self.literal(a + 2, b))
+        for name in names:
+            if name in found:
+                return found[name]
+        return None
+
+
+def _predicate_keys(src, lo, hi):
+    """(keys, dynamic count) of a predicate-list argument."""
+    if not src.opens(lo, hi, "["):
+        return [], 1
+    keys, dynamic = [], 0
+    for a, b in src.items(lo):
+        key = None
+        value = src.literal(a, b)
+        if value is not None:
+            key = value[1:] if value.startswith("!") else value
+        elif src.opens(a, b, "["):
+            first = src.items(a)
+            key = src.literal(*first[0]) if first else None
+        elif src.opens(a, b, "{"):
+            key = src.field(a, ("key", "name"))
+        if key:
+            keys.append(key)
+        else:
+            dynamic += 1
+    return keys, dynamic
+
+
+def scan_gml(text):
+    """(keys, dynamic predicate count) referenced by literal constructor calls in `text`."""
+    if not CTOR_RX.search(text):
+        return [], 0
+    src = _Source(text)
+    keys, dynamic = [], 0
+    toks = src.tokens
+    for i in range(1, len(toks) - 1):
+        if toks[i].kind != IDENT or src.word(i - 1) != "new" or src.word(i + 1) != "(":
+            continue
+        ctor = src.word(i)
+        if ctor not in ACTION_CTORS | GOAL_CTORS | BELIEF_CTORS:
+            continue
+        args = src.items(i + 1)
+        if ctor in BELIEF_CTORS:
+            if len(args) >= 2:
+                key = src.literal(*args[1])
+                if key is None and src.opens(*args[1], "{"):
+                    key = src.field(args[1][0], ("memory_key",))
+                if key is not None:
+                    keys.append(key)
+            continue
+        lists = args[1:3] if ctor in ACTION_CTORS else args[1:2]
+        for lo, hi in lists:
+            found, n = _predicate_keys(src, lo, hi)
+            keys.extend(found)
+            dynamic += n
+    return keys, dynamic
+
+
+def fixture_keys(doc):
+    actions, goals = domain(doc)
+    keys = [p["key"] for a in actions for p in a.preconditions + a.effects]
+    keys += [p["key"] for g in goals for p in g.desired_effects]
+    for belief in doc.get("beliefs") or []:
+        key = belief.get("memory_key") if isinstance(belief, dict) else belief
+        if key is not None:
+            keys.append(gml_string(key))
+    return keys
+
+
+def previous_keys(path):
+    """Keys of an existing generated registry in index order, or []."""
+    try:
+        text = pathlib.Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return []
+    entries = sorted((int(i), json.loads(k)) for k, i in ENTRY_RX.findall(text))
+    return [k for _i, k in entries]
+
+
+def assign(found, previous):
+    """Dense index order: the previous keys still found, then the new ones sorted."""
+    found = set(found)
+    kept = [k for k in previous if k in found]
+    return kept + sorted(found - set(kept))
+
+
+def render_gml(keys, name, sources):
+    q = json.dumps
+    order = sorted(range(len(keys)), key=lambda i: keys[i])
+    lines = [
+        f"// Generated by tools/key_registry.py from {sources}; do not edit.",
+        f"/// @desc Memory-key registry for flat planner states (assign to planner.key_registry).",
+        f"/// @returns {{Struct}}",
+        f"function {name}() {{",
+        "    var index = {};",
+    ]
+    lines += [f"    variable_struct_set(index, {q(k)}, {i});" for i, k in enumerate(keys)]
+    lines += [
+        "    return {",
+        "        keys: [" + ", ".join(q(k) for k in keys) + "],",
+        "        hash_order: [" + ", ".join(str(i) for i in order) + "],",
+        "        index: index",
+        "    };",
+        "}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def verify(doc, keys):
+    """Mismatch descriptions between struct and flat planning of a fixture ([] if none)."""
+    config = fixture_config(doc)
+    actions, goals = domain(doc)
+    problems = []
+    # cost(state) expects a struct: such domains must keep struct states
+    reads_state = any(a.cost_key is not None for a in actions)
+    for name, state in agents(doc):
+        interned = intern(keys, actions, prioritized(goals), state)
+        if reads_state:
+            if interned is not None:
+                return ["flat states used although an action's cost reads the state"]
+        elif interned is None:
+            return ["a predicate key is missing from the registry"]
+        flat_actions, flat_goals, values, segments = interned or ([], [], None, None)
+        for goal, flat_goal in zip(prioritized(goals), flat_goals):
+            plain_trace, flat_trace = [], []
+            a = search_plan(goal, actions, state, config, trace=plain_trace).as_dict()
+            b = search_plan(flat_goal, flat_actions, values, config, segments=segments, trace=flat_trace).as_dict()
+            if plain_trace != flat_trace:
+                at = next((i for i, (x, y) in enumerate(zip(plain_trace, flat_trace)) if x != y),
+                          min(len(plain_trace), len(flat_trace)))
+                problems.append(f"{name}/{goal.name}: hash #{at} differs")
+            elif a != b:
+                problems.append(f"{name}/{goal.name}: search results differ")
+        plain, flat = (plan(actions, goals, state, config, registry=r)[0] for r in (None, keys))
+        if (plain and plain.as_dict()) != (flat and flat.as_dict()):
+            problems.append(f"{name}: plan() results differ")
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    ap.add_argument("--out", help="GML file to write (default: print); an existing one keeps its key order")
+    ap.add_argument("--name", default="Animus_KeyRegistry", help="GML function name")
+    ap.add_argument("--fixture", action="append", default=[], help="planner_sim fixture to take keys from (repeatable)")
+    ap.add_argument("--no-gml", action="store_true", help="do not scan the project's .gml files")
+    ap.add_argument("--check", action="store_true", help="exit 1 if --out is missing or out of date; write nothing")
+    ap.add_argument("--verify", action="store_true",
+                    help="plan every --fixture with struct and flat states and compare hashes and plans")
+    args = ap.parse_args(argv)
+
+    found, dynamic, sources = [], 0, []
+    if not args.no_gml:
+        project = Project(ROOT)
+        # an --out outside the repo (e.g. /tmp) is not one of the scanned files
+        out_path = pathlib.Path(args.out).resolve() if args.out else None
+        out_rel = project.rel(out_path) if out_path and out_path.is_relative_to(project.root) else None
+        for rel in project.files(".gml"):
+            if rel == out_rel:
+                continue
+            keys, n = scan_gml(project.read_text(rel))
+            found += keys
+            dynamic += n
+        sources.append("the project's .gml")
+    docs = []
+    for path in args.fixture:
+        try:
+            doc = load_fixture(path)
+        except (OSError, ValueError) as e:
+            print(f"[FAIL] {e}")
+            return 2
+        docs.append((path, doc))
+        found += fixture_keys(doc)
+        sources.append(pathlib.Path(path).resolve().relative_to(ROOT).as_posix()
+                       if pathlib.Path(path).resolve().is_relative_to(ROOT) else path)
+
+    previous = previous_keys(args.out) if args.out else []
+    keys = assign(found, previous)
+    text = render_gml(keys, args.name, ", ".join(sources) or "nothing")
+    log = sys.stdout if args.out or args.verify else sys.stderr
+    added = len(set(keys) - set(previous))
+    dropped = len(set(previous) - set(keys))
+    print(f"[INFO] {len(keys)} key(s) ({added} new, {dropped} removed); "
+          f"{dynamic} predicate(s) built at run time not seen", file=log)
+
+    code = 0
+    if args.verify:
+        if not docs:
+            print("[FAIL] --verify needs at least one --fixture", file=log)
+            return 2
+        for path, doc in docs:
+            problems = verify(doc, keys)
+            for p in problems:
+                print(f"[FAIL] {path}: {p}", file=log)
+            if problems:
+                code = 1
+            elif any(a.cost_key is not None for a in domain(doc)[0]):
+                print(f"[ok] {path}: struct states kept (a cost reads the state), plans identical", file=log)
+            else:
+                print(f"[ok] {path}: hashes and plans identical with flat states", file=log)
+
+    if args.check:
+        if not args.out:
+            print("[FAIL] --check needs --out")
+            return 2
+        try:
+            current = pathlib.Path(args.out).read_text(encoding="utf-8")
+        except OSError:
+            current = None
+        if current != text:
+            print(f"[FAIL] {args.out} is out of date; rerun without --check")
+            return 1
+        print(f"[ok] {args.out} is up to date")
+        return code
+    if args.out:
+        out = pathlib.Path(args.out)
+        out.write_text(text, encoding="utf-8")
+        print(f"[INFO] wrote {out}")
+        if out.suffix == ".gml" and out.resolve().is_relative_to(ROOT) and not out.with_suffix(".yy").exists():
+            print(f"[WARN] {out.with_suffix('.yy')} does not exist: add the script to the project once in GameMaker")
+    elif not args.verify:
+        sys.stdout.write(text)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+"""Offset -> line number lookup shared by the Animus tools.
+
+Build once per file, then each lookup is a bisect over the newline offsets
+instead of `text.count('\\n', 0, pos)` rescanning the file for every finding.
+"""
+import re
+from bisect import bisect_left
+
+_NL = re.compile('\n')
+
+
+class LineIndex:
+    def __init__(self, text):
+        self.newlines = [m.start() for m in _NL.finditer(text)]
+
+    def line_of(self, pos):
+        """1-based line number of offset `pos` (same as text.count('\\n', 0, pos) + 1)."""
+        return bisect_left(self.newlines, pos) + 1
+
+    def line_count(self):
+        return len(self.newlines) + 1
@@ -0,0 +1,97 @@
+"""Known-findings baseline for gml_linter (`baseline_path` in animus_rules.yaml).
+
+A legacy tree can carry thousands of findings. Failing CI on all of them, or
+turning the rules off, hides the new ones either way. The baseline lists the
+findings accepted at one point, each by a fingerprint without a line number:
+  [path, rule, normalized line content, occurrence]
+path is repo-relative. The content is the finding's source line with runs of
+whitespace collapsed. occurrence counts the earlier findings (by line) of the
+same rule on identical content in the same file, so two equal lines stay two
+entries. Moving code up or down keeps every fingerprint; editing a line makes
+its findings new. The entries are loaded into a set, so filtering costs one
+lookup per finding.
+
+The file is JSON with one entry per line, sorted, so a regenerated baseline
+diffs as the findings that came and went.
+"""
+import json
+import os
+import pathlib
+
+from lint_cache import atomic_write_text
+
+BASELINE_VERSION = 1
+
+
+def normalize(line):
+    return " ".join(line.split())
+
+
+def fingerprints(rel, findings, line_of):
+    """Fingerprint tuple of each of one file's `findings`, in the order given;
+    line_of(n) is the text of line n."""
+    out = [None] * len(findings)
+    seen = {}
+    for i in sorted(range(len(findings)), key=lambda i: (findings[i].line, findings[i].kind, findings[i].msg)):
+        f = findings[i]
+        key = (rel, f.kind, normalize(line_of(f.line)))
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        out[i] = key + (occurrence,)
+    return out
+
+
+def file_lines(path, text=None):
+    """line_of(n) for a file: over `text` if given, else streamed from disk once up to the
+    highest line asked for so far (very large files are never held whole)."""
+    if text is not None:
+        lines = text.split("\n")
+        return lambda n: lines[n - 1] if 0 < n <= len(lines) else ""
+    got = []
+
+    def line_of(n):
+        if n > len(got):
+            with open(path, "rb") as fh:
+                got.clear()
+                for raw in fh:
+                    got.append(raw.rstrip(b"\r\n").decode("utf-8", "ignore"))
+                    if len(got) >= n:
+                        break
+        return got[n - 1] if 0 < n <= len(got) else ""
+    return line_of
+
+
+class Baseline:
+    def __init__(self, entries=()):
+        self.entries = set(entries)
+
+    @classmethod
+    def load(cls, path):
+        """The baseline at `path`, or None if there is none; ValueError if it is malformed."""
+        try:
+            doc = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise ValueError(str(e)) from None
+        if not isinstance(doc, dict) or doc.get("version") != BASELINE_VERSION or not isinstance(doc.get("findings"), list):
+            raise ValueError(f"not a version {BASELINE_VERSION} baseline")
+        try:
+            return cls((str(p), str(k), str(c), int(o)) for p, k, c, o in doc["findings"])
+        except (TypeError, ValueError):
+            raise ValueError("malformed entry") from None
+
+    def save(self, path):
+        rows = ",\n".join("    " + json.dumps(list(e), ensure_ascii=False) for e in sorted(self.entries))
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        atomic_write_text(path, f'{{\n  "version": {BASELINE_VERSION},\n  "findings": [\n{rows}\n  ]\n}}\n')
+        os.chmod(path, mode)    # the file is committed: not the temp file's 0600
+
+    def fixed(self, seen, paths=None):
+        """Entries not in `seen`, limited to files in `paths` (None: all), sorted."""
+        return sorted(e for e in self.entries if e not in seen and (paths is None or e[0] in paths))
@@ -0,0 +1,112 @@
+"""On-disk result cache for the Animus tools (`.animus_cache/`).
+
+A cache file holds one JSON document:
+  { "fingerprint": <config/tool hash>, "clock": <run counter>, "entries": { key: {"used": n, "data": ...} } }
+
+Any change to the fingerprint (rules config edited, tool upgraded) drops every
+entry. Saving keeps the most recently used entries that fit in `max_bytes`.
+"""
+import hashlib
+import json
+import os
+import pathlib
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def digest_bytes(*chunks):
+    h = hashlib.blake2b(digest_size=20)
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def digest_files(paths):
+    """Digest of several files' bytes (missing files hash as empty)."""
+    h = hashlib.blake2b(digest_size=20)
+    for p in paths:
+        p = pathlib.Path(p)
+        h.update(p.name.encode('utf-8') + b'\0')
+        if p.exists():
+            h.update(p.read_bytes())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def atomic_write_text(path, text, encoding='utf-8', errors='strict'):
+    """Write via a temp file in the same directory + os.replace, so readers never see a torn file."""
+    import tempfile   # deferred: only writers pay for it (tempfile pulls in shutil/random)
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + '.', suffix='.tmp', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, errors=errors, newline='') as fh:
+            fh.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class ResultCache:
+    def __init__(self, path, fingerprint, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = pathlib.Path(path)
+        self.fingerprint = fingerprint
+        self.max_bytes = max_bytes
+        self.entries = {}
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def load(self):
+        try:
+            doc = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            doc = None
+        if isinstance(doc, dict) and doc.get('fingerprint') == self.fingerprint:
+            self.entries = doc.get('entries', {}) or {}
+            self.clock = int(doc.get('clock', 0))
+        else:
+            # missing, unreadable or built against another config/tool version
+            self.dirty = self.path.exists()
+        self.clock += 1
+        return self
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if entry.get('used') != self.clock:
+            entry['used'] = self.clock
+            self.dirty = True
+        return entry.get('data')
+
+    def put(self, key, data):
+        self.entries[key] = {'used': self.clock, 'data': data}
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        kept = {}
+        total = 0
+        for key, entry in sorted(self.entries.items(), key=lambda kv: kv[1].get('used', 0), reverse=True):
+            size = len(key) + len(json.dumps(entry, separators=(',', ':')))
+            if total + size > self.max_bytes:
+                break
+            kept[key] = entry
+            total += size
+        self.entries = kept
+        doc = {'fingerprint': self.fingerprint, 'clock': self.clock, 'entries': kept}
+        try:
+            atomic_write_text(self.path, json.dumps(doc, separators=(',', ':')))
+            self.dirty = False
+        except OSError:
+            # a read-only checkout must not fail the run
+            pass
@@ -0,0 +1,238 @@
+"""Bounded-memory access to very large sources (generated .gml tables).
+
+Text mode reads a file into a str. The linter's lexer then adds a code-view
+copy, a token list and a line list, so memory grows several times over with
+file size. A MappedSource instead maps the file read-only. The tools run
+bytes regexes directly on the mapping, stream line-level checks one line at a
+time, and release the pages they have passed. The heap then holds only the
+findings and one line at a time.
+
+Findings must equal text mode's, so mapping only applies to files where bytes
+and text semantics provably agree:
+  * ASCII only, so byte offsets are character offsets and `\\w`, `\\s`, `\\b`
+    and case folding behave the same for bytes and str patterns;
+  * LF line ends only, with none of the extra separators `str.splitlines()`
+    honours (\\r, \\v, \\f, \\x1c-\\x1e). Universal newlines and splitlines
+    then split exactly where the mapping's b"\\n" do. \\x1f is excluded as
+    well, because str `\\s` matches it and bytes `\\s` does not.
+Any other file (and every staged blob, which lives in memory anyway) is
+scanned in text mode.
+
+TextSource wraps a str in the same small API (pattern, search, finditer, find,
+slice_str, iter_lines, line_index), so a check is written once for both modes.
+"""
+import mmap
+import os
+import re
+
+from line_index import LineIndex
+
+# one byte that text mode would treat differently (see module docstring)
+_TEXT_ONLY = re.compile(rb'[\x80-\xff\r\x0b\x0c\x1c-\x1f]')
+
+# pages behind the scan position are released in steps of this size
+RELEASE_STEP = 64 * 1024 * 1024
+
+_BYTES_RX = {}
+
+
+def bytes_regex(rx):
+    """The bytes-pattern twin of compiled str regex `rx` (cached), or None if it has
+    no ASCII spelling (non-ASCII literals, \\u escapes, inline (?u))."""
+    key = (rx.pattern, rx.flags)
+    if key not in _BYTES_RX:
+        try:
+            _BYTES_RX[key] = re.compile(rx.pattern.encode('ascii'), rx.flags & ~re.UNICODE)
+        except (UnicodeEncodeError, re.error, ValueError):
+            _BYTES_RX[key] = None
+    return _BYTES_RX[key]
+
+
+def large(path, min_bytes):
+    """True if `path` is at least `min_bytes` long (min_bytes <= 0: never)."""
+    if min_bytes <= 0:
+        return False
+    try:
+        return os.path.getsize(path) >= min_bytes
+    except OSError:
+        return False
+
+
+class MappedSource:
+    """Read-only mapping of one file. Use as a context manager; `data` is the mmap."""
+
+    def __init__(self, path, fh=None):
+        """Map `path`, or the already open binary file `fh` (which the source then owns)."""
+        self.path = path
+        self._fh = fh if fh is not None else open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file: nothing to map
+            self._fh.close()
+            raise
+        if hasattr(self.data, 'madvise'):
+            self.data.madvise(mmap.MADV_SEQUENTIAL)
+        self._released = 0
+        self._text_safe = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        try:
+            self.data.close()
+        except BufferError:
+            # a match object still points into the mapping; it goes with the last reference
+            pass
+        self._fh.close()
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def text_safe(self):
+        """True if scanning the bytes gives exactly the text-mode results."""
+        if self._text_safe is None:
+            # a one-byte class, so scanning in windows is exact; pages are released as it goes
+            n = len(self.data)
+            self._text_safe = True
+            for pos in range(0, n, RELEASE_STEP):
+                if _TEXT_ONLY.search(self.data, pos, min(n, pos + RELEASE_STEP)):
+                    self._text_safe = False
+                    break
+                self.release(pos + RELEASE_STEP)
+            self.rewind()
+        return self._text_safe
+
+    def release(self, pos):
+        """Drop resident pages before `pos` once a step's worth has been passed. They stay in the
+        page cache and fault back in if touched again, so this is only a memory hint."""
+        if pos - self._released < RELEASE_STEP or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        end = pos - pos % mmap.PAGESIZE
+        self.data.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+        self._released = end
+
+    def rewind(self):
+        """Release every page (call after a full pass) so the next pass starts lean."""
+        if hasattr(mmap, 'MADV_DONTNEED') and len(self.data):
+            self.data.madvise(mmap.MADV_DONTNEED, 0, len(self.data))
+        self._released = 0
+
+    def pattern(self, rx):
+        return bytes_regex(rx)
+
+    def search(self, rx, pos=0):
+        """First match of str regex `rx` (run as its bytes twin)."""
+        return bytes_regex(rx).search(self.data, pos)
+
+    def finditer(self, rx, pos=0):
+        """rx.finditer over the mapping (a str regex runs as its bytes twin), releasing pages
+        behind the scan."""
+        if isinstance(rx.pattern, str):
+            rx = bytes_regex(rx)
+        for m in rx.finditer(self.data, pos):
+            self.release(m.start())
+            yield m
+        self.rewind()
+
+    def find(self, literal, start=0):
+        return self.data.find(literal.encode('ascii'), start)
+
+    def iter_lines(self):
+        """Lines as str without their terminator, like str.splitlines() on a text-safe file."""
+        data, pos, n = self.data, 0, len(self.data)
+        while pos < n:
+            nl = data.find(b'\n', pos)
+            if nl == -1:
+                nl = n
+            yield data[pos:nl].decode('ascii')
+            self.release(pos)
+            pos = nl + 1
+        self.rewind()
+
+    def slice_str(self, start, end):
+        return self.data[start:end].decode('ascii')
+
+    def line_index(self):
+        index = MappedLineIndex(self.data)
+        self.rewind()
+        return index
+
+
+class TextSource:
+    """A str behind the MappedSource API."""
+
+    def __init__(self, text):
+        self.data = text
+
+    def __len__(self):
+        return len(self.data)
+
+    def close(self):
+        pass
+
+    def pattern(self, rx):
+        return rx
+
+    def search(self, rx, pos=0):
+        return rx.search(self.data, pos)
+
+    def finditer(self, rx, pos=0):
+        return rx.finditer(self.data, pos)
+
+    def find(self, literal, start=0):
+        return self.data.find(literal, start)
+
+    def slice_str(self, start, end):
+        return self.data[start:end]
+
+    def iter_lines(self):
+        return iter(self.data.splitlines())
+
+    def line_index(self):
+        return LineIndex(self.data)
+
+
+def as_source(text):
+    """TextSource for a str; a MappedSource (or TextSource) is returned as is."""
+    return TextSource(text) if isinstance(text, str) else text
+
+
+def open_mapped(path):
+    """A MappedSource for `path` if it can stand in for the text, else None (empty or not text-safe)."""
+    try:
+        src = MappedSource(path)
+    except (OSError, ValueError):
+        return None
+    if not src.text_safe:
+        src.close()
+        return None
+    return src
+
+
+class MappedLineIndex:
+    """LineIndex over a mapping without a per-line table: newline counts are kept per block
+    and a lookup counts within one block."""
+
+    BLOCK = 64 * 1024
+
+    def __init__(self, data):
+        self.data = data
+        self.before = [0]    # newlines before each block
+        total = 0
+        for start in range(0, len(data), self.BLOCK):
+            total += data[start:start + self.BLOCK].count(b'\n')
+            self.before.append(total)
+
+    def line_of(self, pos):
+        block = min(pos // self.BLOCK, len(self.before) - 1)
+        start = block * self.BLOCK
+        return self.before[block] + self.data[start:pos].count(b'\n') + 1
+
+    def line_count(self):
+        return self.before[-1] + 1
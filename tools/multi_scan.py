@@ -0,0 +1,246 @@
+"""One-pass multi-pattern scanning for the Animus lint rules.
+
+MultiScanner takes named rules (name, pattern, flags) and scans a text once.
+It returns every rule's matches exactly as a separate `rule.finditer(text)`
+would: non-overlapping within a rule, while different rules may still overlap.
+
+Two layers keep that cheap:
+
+* Literal prefilter: each rule's pattern is parsed once for the literals that
+  any match must contain (`\\brandom\\(` needs "random(", an alternation needs
+  one literal per branch). A rule whose literals are all absent from the text
+  is skipped without running the regex engine.
+* Master regex: the rules that survive are combined into one alternation,
+  `(?=p0|p1|...)(?:(?=(?P<_r0>p0)))?(?:(?=(?P<_r1>p1)))?...`, compiled once
+  per surviving subset. The leading lookahead lets the engine skip positions
+  where nothing can match. The optional named lookaheads then report which
+  rules match at the position, and with what span. Per-rule "next allowed"
+  offsets restore finditer's non-overlap.
+
+Texts may be str or, for mapped sources, bytes-like (bytes, mmap). Rules then
+run as bytes patterns (`Rule.brx`), which must have an ASCII spelling.
+
+Some rules are scanned on their own instead:
+
+* patterns that start with a literal, which the engine already scans with a
+  fast prefix search that it cannot use inside the master;
+* patterns that cannot be embedded safely, such as backreferences (group
+  numbers shift inside the master);
+* any set whose master fails to compile, e.g. duplicate group names.
+"""
+import re
+
+try:
+    from re import _constants as sre_c, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants as sre_c
+    import sre_parse
+
+
+def _literal_sets(items, flags):
+    """Candidate literal sets for a parsed sequence: each set means "a match contains
+    at least one of these strings"."""
+    out = []
+    run = []
+
+    def close_run():
+        if run:
+            out.append(frozenset(["".join(run)]))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_c.LITERAL and not flags & sre_c.SRE_FLAG_IGNORECASE:
+            run.append(chr(av))
+            continue
+        if op is sre_c.AT:
+            # \b, ^, $ consume nothing, so the literal run continues across them
+            continue
+        close_run()
+        if op is sre_c.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            out.extend(_literal_sets(sub, (flags | add_flags) & ~del_flags))
+        elif op in (sre_c.MAX_REPEAT, sre_c.MIN_REPEAT, getattr(sre_c, "POSSESSIVE_REPEAT", None)):
+            lo, _hi, sub = av
+            if lo >= 1:
+                out.extend(_literal_sets(sub, flags))
+        elif op is sre_c.BRANCH:
+            merged = set()
+            for branch in av[1]:
+                best = _best(_literal_sets(branch, flags))
+                if best is None:
+                    merged = None
+                    break
+                merged |= best
+            if merged:
+                out.append(frozenset(merged))
+    close_run()
+    return out
+
+
+def _best(candidates):
+    """The candidate set whose shortest literal is longest (fewest false positives)."""
+    best = None
+    for cand in candidates:
+        if not cand or min(map(len, cand)) == 0:
+            continue
+        if best is None or min(map(len, cand)) > min(map(len, best)):
+            best = cand
+    return best
+
+
+def _has_backref(items):
+    for op, av in items:
+        if op in (sre_c.GROUPREF, sre_c.GROUPREF_EXISTS):
+            return True
+        if op is sre_c.SUBPATTERN and _has_backref(av[3]):
+            return True
+        if op in (sre_c.MAX_REPEAT, sre_c.MIN_REPEAT, getattr(sre_c, "POSSESSIVE_REPEAT", None)) and _has_backref(av[2]):
+            return True
+        if op is sre_c.BRANCH and any(_has_backref(b) for b in av[1]):
+            return True
+        if op in (sre_c.ASSERT, sre_c.ASSERT_NOT) and _has_backref(av[1]):
+            return True
+    return False
+
+
+def _leading_literal(items, flags):
+    """True if the pattern starts with a literal, which the regex engine already
+    turns into a fast substring search."""
+    if flags & sre_c.SRE_FLAG_IGNORECASE or not items:
+        return False
+    op, av = items[0]
+    if op is sre_c.LITERAL:
+        return True
+    if op is sre_c.SUBPATTERN:
+        return _leading_literal(list(av[3]), (flags | av[1]) & ~av[2])
+    return False
+
+
+def required_literals(pattern, flags=0):
+    """Literals one of which must occur in any text the pattern matches, or None if
+    no such set can be derived (the rule then always runs)."""
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, TypeError):
+        return None
+    best = _best(_literal_sets(list(parsed), parsed.state.flags))
+    if best is None:
+        return None
+    # "random(" already covers "irandom(": keep only literals that contain no other
+    return frozenset(lit for lit in best if not any(o != lit and o in lit for o in best))
+
+
+def _scoped(pattern, flags):
+    # carry the rule's own flags into the master, e.g. ^/$ per line for silent returns
+    letters = "".join(ch for bit, ch in ((re.M, "m"), (re.S, "s"), (re.I, "i"), (re.X, "x")) if flags & bit)
+    return f"(?{letters}:{pattern})" if letters else f"(?:{pattern})"
+
+
+class Rule:
+    __slots__ = ("name", "pattern", "flags", "literals", "embeddable", "prefixed", "_rx", "_brx")
+
+    def __init__(self, name, pattern, flags=0, meta=None):
+        """`meta` is a previous rule's `meta()` for the same pattern (e.g. from a
+        config cache); it skips re-parsing the pattern."""
+        self.name = name
+        self.pattern = pattern
+        self.flags = flags
+        self._rx = self._brx = None
+        if meta is not None:
+            lits = meta["literals"]
+            self.literals = frozenset(lits) if lits is not None else None
+            self.embeddable = meta["embeddable"]
+            self.prefixed = meta["prefixed"]
+            return
+        self.literals = required_literals(pattern, flags)
+        try:
+            parsed = sre_parse.parse(pattern, flags)
+            self.embeddable = not _has_backref(list(parsed)) and not parsed.state.flags & re.X
+            self.prefixed = _leading_literal(list(parsed), parsed.state.flags)
+        except re.error:
+            self.embeddable = self.prefixed = False
+
+    @property
+    def rx(self):
+        if self._rx is None:
+            self._rx = re.compile(self.pattern, self.flags)
+        return self._rx
+
+    @property
+    def brx(self):
+        """The pattern compiled for bytes texts (raises UnicodeEncodeError if it is not ASCII)."""
+        if self._brx is None:
+            self._brx = re.compile(self.pattern.encode("ascii"), self.flags)
+        return self._brx
+
+    def meta(self):
+        """JSON-ready analysis of the pattern, for `Rule(..., meta=...)`."""
+        return {"literals": sorted(self.literals) if self.literals is not None else None,
+                "embeddable": self.embeddable, "prefixed": self.prefixed}
+
+    def possible(self, text):
+        # a literal-prefixed pattern is its own fast prefilter; checking literals first only doubles the scan
+        if self.literals is None or self.prefixed:
+            return True
+        if isinstance(text, str):
+            return any(lit in text for lit in self.literals)
+        # bytes-like (mmap has no substring `in`)
+        return any(text.find(lit.encode("ascii")) != -1 for lit in self.literals)
+
+
+class MultiScanner:
+    """Scan text for many rules at once. `scan(text)` returns {rule name: [(start, end), ...]}
+    for the rules that matched, each list in finditer order."""
+
+    def __init__(self, rules):
+        self.rules = [r if isinstance(r, Rule) else Rule(*r) for r in rules]
+        self._masters = {}
+
+    def possible(self, text):
+        """Indices of the rules whose required literals occur in `text`."""
+        return [i for i, r in enumerate(self.rules) if r.possible(text)]
+
+    def _master(self, indices, binary=False):
+        key = (tuple(indices), binary)
+        if key not in self._masters:
+            parts = [_scoped(self.rules[i].pattern, self.rules[i].flags) for i in indices]
+            gate = "(?=" + "|".join(parts) + ")"
+            probes = "".join(f"(?:(?=(?P<_r{i}>{p})))?" for i, p in zip(indices, parts))
+            try:
+                self._masters[key] = re.compile((gate + probes).encode("ascii") if binary else gate + probes)
+            except re.error:
+                self._masters[key] = None
+        return self._masters[key]
+
+    def scan(self, text, indices=None, finditer=None):
+        """`finditer(rx)` replaces rx.finditer(text), e.g. to release mapped pages as the scan moves."""
+        if indices is None:
+            indices = self.possible(text)
+        binary = not isinstance(text, str)
+        if finditer is None:
+            finditer = lambda rx: rx.finditer(text)
+        found = {}
+        # a literal-prefixed rule is faster alone: inside the master the engine loses its prefix search
+        alone = [i for i in indices if not self.rules[i].embeddable or self.rules[i].prefixed]
+        together = [i for i in indices if self.rules[i].embeddable and not self.rules[i].prefixed]
+        master = self._master(together, binary) if len(together) > 1 else None
+        if master is None:
+            alone, together = indices, []
+        for i in alone:
+            rule = self.rules[i]
+            spans = [m.span() for m in finditer(rule.brx if binary else rule.rx)]
+            if spans:
+                found[self.rules[i].name] = spans
+        if together:
+            next_ok = dict.fromkeys(together, 0)
+            groups = [(i, f"_r{i}") for i in together]
+            for m in finditer(master):
+                pos = m.start()
+                for i, g in groups:
+                    end = m.end(g)
+                    if end < 0 or pos < next_ok[i]:
+                        continue
+                    found.setdefault(self.rules[i].name, []).append((pos, end))
+                    # finditer resumes at the match end (one further after an empty match)
+                    next_ok[i] = end if end > pos else pos + 1
+        return found
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""Benchmarks planner heuristics and writes the chosen one as a GML table.
+
+heuristic_to_goal counts a goal's unmet desired effects. That is cheap, but it
+says nothing about how long the chains behind them are, so A* widens into blind
+search on goals that need many steps. This tool runs planner_sim's mirror of
+search_plan with each of
+  goal_count  the current heuristic
+  h_max       relaxed cost of the costliest unmet desired effect (admissible)
+  h_add       sum of the relaxed costs of the unmet desired effects
+  landmarks   predicates every plan must make true (the unmet desired effects, and
+              the preconditions shared by all achievers of an unmet landmark),
+              each counted at its cheapest achiever's cost
+over the fixtures given and over synthetic domains of increasing depth: chains of
+steps with distractor actions at every level and costlier shortcuts. The
+relaxation is per predicate: an action achieves a predicate when one of its
+effects can make it hold (planner_relevance.helps), and preconditions are costed
+one by one.
+
+For every search it reports expansions, plan cost against the optimum (A* with
+h_max and a large budget), and the time per heuristic call. Then it recommends a
+heuristic per domain: the cheapest in total search time among those that
+complete the most searches within --tolerance of optimal cost. goal_count is
+kept unless another is at least --min-gain faster.
+
+--out writes, for one fixture, a GML function returning the chosen heuristic's
+tables:
+  { mode, actions, preds, pre, achieves, costs, needs, min_cost, goals }
+Assign it to `planner.heuristic_table`. The planner uses it only while its action
+names match the agent's, and for flat states only when the key registry has
+every key. A goal's entry also serves as its goal test (h == 0), so it is used
+only while the goal's desired effects are exactly the table's predicates for it;
+other goals keep the interpreted count. The relaxed heuristics never return 0 while a desired effect is
+unmet, because search_plan takes h == 0 as the goal test. Costs come from the
+fixture, so actions whose GML cost is computed at runtime are estimated at their
+fixture cost.
+"""
+import argparse
+import json
+import pathlib
+import random
+import re
+import sys
+import time
+
+from planner_relevance import helps, repo_path
+from planner_sim import (agents, domain, fixture_config, gml_string, holds, load_fixture, percentile,
+                         prioritized, search_plan)
+from predicate_compiler import gml_literal, literal_ok
+
+HEURISTICS = ("goal_count", "h_max", "h_add", "landmarks")
+MODES = {"h_max": "max", "h_add": "add", "landmarks": "landmarks"}
+INF = float("inf")
+DEAD_END = 100000     # h when a desired effect cannot be achieved at all (as in the GML)
+MIN_H = 0.001         # floor while unmet; GML == treats anything under 1e-5 as 0
+
+
+class Relaxed:
+    """Predicate tables of a domain, shared by the relaxed heuristics and the GML they render to."""
+
+    def __init__(self, actions, goals):
+        self.preds = []
+        seen = {}
+
+        def intern(pred):
+            value = pred.get("value")
+            ident = (pred["key"], pred["op"], type(value).__name__, repr(value))
+            if ident not in seen:
+                seen[ident] = len(self.preds)
+                self.preds.append(pred)
+            return seen[ident]
+
+        self.actions = [a.name for a in actions]
+        self.pre = [sorted({intern(p) for p in a.preconditions}) for a in actions]
+        self.goals = {g.name: sorted({intern(p) for p in g.desired_effects}) for g in goals}
+        self.costs = [a.cost for a in actions]
+        self.achieves = [[i for i, p in enumerate(self.preds) if any(helps(e, p) for e in a.effects)]
+                         for a in actions]
+        achievers = [[] for _ in self.preds]
+        for a, out in enumerate(self.achieves):
+            for p in out:
+                achievers[p].append(a)
+        self.needs = []
+        self.min_cost = []
+        for by in achievers:
+            shared = set(self.pre[by[0]]) if by else set()
+            for a in by[1:]:
+                shared &= set(self.pre[a])
+            self.needs.append(sorted(shared))
+            self.min_cost.append(min(self.costs[a] for a in by) if by else None)
+
+    def unmet(self, goal, state):
+        return [t for t in self.goals[goal.name] if not holds(state, self.preds[t])]
+
+    def relaxed(self, goal, state, add):
+        unmet = self.unmet(goal, state)
+        if not unmet:
+            return 0
+        cost = [0 if holds(state, p) else INF for p in self.preds]
+        changed = True
+        while changed:
+            changed = False
+            for a, needs in enumerate(self.pre):
+                base = 0
+                for q in needs:
+                    base = base + cost[q] if add else max(base, cost[q])
+                    if base == INF:
+                        break
+                if base == INF:
+                    continue
+                value = base + self.costs[a]
+                for p in self.achieves[a]:
+                    if value < cost[p]:
+                        cost[p] = value
+                        changed = True
+        h = 0
+        for t in unmet:
+            if cost[t] == INF:
+                return DEAD_END
+            h = h + cost[t] if add else max(h, cost[t])
+        return max(h, MIN_H)
+
+    def landmarks(self, goal, state):
+        unmet = self.unmet(goal, state)
+        if not unmet:
+            return 0
+        seen = set(unmet)
+        stack = list(unmet)
+        h = 0
+        while stack:
+            p = stack.pop()
+            if self.min_cost[p] is None:
+                return DEAD_END
+            h += self.min_cost[p]
+            for q in self.needs[p]:
+                if q not in seen:
+                    seen.add(q)
+                    if not holds(state, self.preds[q]):
+                        stack.append(q)
+        return max(h, MIN_H)
+
+    def heuristic(self, name):
+        if name == "h_max":
+            return lambda goal, state: self.relaxed(goal, state, False)
+        if name == "h_add":
+            return lambda goal, state: self.relaxed(goal, state, True)
+        if name == "landmarks":
+            return self.landmarks
+        return lambda goal, state: goal.unsatisfied(state)
+
+
+class Timed:
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, goal, state):
+        t0 = time.perf_counter()
+        h = self.fn(goal, state)
+        self.seconds += time.perf_counter() - t0
+        self.calls += 1
+        return h
+
+
+def synthetic(depth, width=2, chains=1, seed=0):
+    """A fixture: `chains` independent chains of `depth` steps, every end wanted. Every level also
+    enables `width` distractors writing noise keys, and every third level a shortcut over two
+    steps that costs 2.5 instead of 2."""
+    rng = random.Random(seed)
+    actions = []
+    names = "abcdefgh"[:chains]
+    for chain in names:
+        for i in range(depth):
+            pre = [[f"{chain}{i - 1}", True]] if i else []
+            actions.append({"name": f"{chain}_step{i}", "preconditions": pre, "effects": [[f"{chain}{i}", True]],
+                            "cost": 1})
+            for j in range(width):
+                actions.append({"name": f"{chain}_noise{i}_{j}", "preconditions": pre,
+                                "effects": [[f"noise{j}", rng.randrange(depth + 1)]], "cost": 1})
+            if i % 3 == 0 and i + 2 < depth:
+                actions.append({"name": f"{chain}_shortcut{i}", "preconditions": [[f"{chain}{i}", True]],
+                                "effects": [[f"{chain}{i + 2}", True]], "cost": 2.5})
+    goal = {"name": "reach", "desired_effects": [[f"{chain}{depth - 1}", True] for chain in names]}
+    return {"actions": actions, "goals": [goal], "state": {}}
+
+
+def bench(doc, config, optimal_budget, limit=None):
+    """{heuristic: stats} over every agent of `doc` and every goal it has unmet."""
+    actions, goals = domain(doc)
+    relaxed = Relaxed(actions, goals)
+    optimum_config = dict(config, max_expansions=optimal_budget, time_budget_ms=0)
+    searches = []
+    for _name, state in agents(doc)[:limit]:
+        for goal in prioritized(goals):
+            if goal.unsatisfied(state) == 0:
+                continue
+            best = search_plan(goal, actions, state, optimum_config, heuristic=relaxed.heuristic("h_max"))
+            searches.append((goal, state, best.cost if best.found and not best.is_partial else None))
+
+    stats = {}
+    for name in HEURISTICS:
+        timed = Timed(relaxed.heuristic(name))
+        expanded, ratios = [], []
+        complete = exhausted = optimal = 0
+        t0 = time.perf_counter()
+        for goal, state, best in searches:
+            result = search_plan(goal, actions, state, config, heuristic=timed)
+            expanded.append(result.nodes_expanded)
+            exhausted += result.budget_exhausted
+            if not result.found or result.is_partial:
+                continue
+            complete += 1
+            if best is not None:
+                ratio = result.cost / best if best else (1.0 if result.cost == 0 else INF)
+                ratios.append(ratio)
+                optimal += ratio <= 1 + 1e-9
+        seconds = time.perf_counter() - t0
+        stats[name] = {
+            "searches": len(searches),
+            "complete": complete,
+            "budget_exhausted": exhausted,
+            "expanded_mean": sum(expanded) / len(expanded) if expanded else 0,
+            "expanded_p95": percentile(expanded, 95),
+            "expanded_max": max(expanded, default=0),
+            "optimum_known": sum(best is not None for _g, _s, best in searches),
+            "cost_ratio_mean": sum(ratios) / len(ratios) if ratios else None,
+            "cost_ratio_max": max(ratios) if ratios else None,
+            "optimal": optimal,
+            "us_per_call": timed.seconds * 1e6 / timed.calls if timed.calls else 0,
+            "search_ms": seconds * 1000,
+        }
+    return relaxed, stats
+
+
+def recommend(stats, tolerance, min_gain):
+    """(heuristic, reason) for one domain's stats."""
+    most = max(s["complete"] for s in stats.values())
+    if not most:
+        return "goal_count", "no heuristic completes a search within the budget"
+    pool = [h for h in HEURISTICS if stats[h]["complete"] == most]
+    within = [h for h in pool if (stats[h]["cost_ratio_mean"] or 1) <= 1 + tolerance]
+    if not within:
+        within = [min(pool, key=lambda h: stats[h]["cost_ratio_mean"] or 1)]
+    pick = min(within, key=lambda h: stats[h]["search_ms"])
+    current = stats["goal_count"]
+    if pick != "goal_count" and "goal_count" in within and current["search_ms"] <= stats[pick]["search_ms"] * (1 + min_gain):
+        return "goal_count", f"no heuristic is {min_gain:.0%} faster with the same completions"
+    if pick == "goal_count":
+        return pick, "fastest within tolerance"
+    if stats[pick]["complete"] > current["complete"]:
+        return pick, f"completes {stats[pick]['complete']} search(es) against {current['complete']}"
+    return pick, f"{current['search_ms'] / max(stats[pick]['search_ms'], 1e-9):.1f}x faster than goal_count"
+
+
+def render_gml(relaxed, heuristic, name, source, out):
+    mode = MODES[heuristic]
+    q = json.dumps
+    ints = lambda xs: "[" + ", ".join(str(x) for x in xs) + "]"
+    nested = lambda rows: "[\n" + ",\n".join(f"            {ints(r)}" for r in rows) + "\n        ]"
+    pred = lambda p: f"{{ key: {q(p['key'])}, op: {q(p['op'])}, value: {gml_literal(p.get('value'))} }}"
+    min_cost = [-1 if c is None else c for c in relaxed.min_cost]
+    lines = [
+        f"// Generated by tools/planner_heuristics.py from {source}; do not edit.",
+        f"// Regenerate: python tools/planner_heuristics.py {source} --heuristic {heuristic} --name {name} --out {out}",
+        f"/// @desc Heuristic tables for the planner, mode \"{mode}\" (assign to planner.heuristic_table).",
+        f"/// @returns {{Struct}}",
+        f"function {name}() {{",
+        "    var goals = {};",
+    ]
+    lines += [f"    variable_struct_set(goals, {q(g)}, {ints(xs)});" for g, xs in relaxed.goals.items()]
+    lines += [
+        "    return {",
+        f"        mode: {q(mode)},",
+        "        actions: [",
+        ",\n".join(f"            {q(a)}" for a in relaxed.actions),
+        "        ],",
+        "        preds: [",
+        ",\n".join(f"            {pred(p)}" for p in relaxed.preds),
+        "        ],",
+        f"        pre: {nested(relaxed.pre)},",
+        f"        achieves: {nested(relaxed.achieves)},",
+        f"        costs: [{', '.join(gml_literal(c) for c in relaxed.costs)}],",
+        f"        needs: {nested(relaxed.needs)},",
+        f"        min_cost: [{', '.join(gml_literal(c) for c in min_cost)}],",
+        "        goals: goals",
+        "    };",
+        "}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def table_text(args, label, source, relaxed, heuristic):
+    bad = [p["key"] for p in relaxed.preds if not literal_ok(p.get("value"))]
+    if bad:
+        print(f"[FAIL] array/struct predicate values cannot be written as GML literals: {', '.join(sorted(set(bad)))}")
+        return None
+    name = args.name or "Animus_Heuristic_" + label
+    return render_gml(relaxed, heuristic, name, source, repo_path(args.out))
+
+
+def check(args, label, source, doc):
+    """--check: the tables of --heuristic, else of the mode the file already has (the
+    recommendation depends on timings, so it is not re-run here)."""
+    try:
+        current = pathlib.Path(args.out).read_text(encoding="utf-8")
+    except OSError:
+        current = None
+    heuristic = args.heuristic
+    if heuristic is None and current is not None:
+        found = re.search(r'^\s*mode: "(\w+)",$', current, re.M)
+        heuristic = next((h for h, m in MODES.items() if found and m == found.group(1)), None)
+    if heuristic is None:
+        print(f"[FAIL] {args.out} is missing or has no mode; rerun without --check")
+        return 1
+    text = table_text(args, label, source, Relaxed(*domain(doc)), heuristic)
+    if text is None:
+        return 2
+    if current != text:
+        print(f"[FAIL] {args.out} is out of date; rerun without --check")
+        return 1
+    print(f"[ok] {args.out} is up to date ({heuristic})")
+    return 0
+
+
+def fmt_ratio(v):
+    return "-" if v is None else f"{v:.3f}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    ap.add_argument("fixtures", nargs="*", help="planner_sim fixtures (YAML/JSON)")
+    ap.add_argument("--synthetic", default="4,8,16",
+                    help="depths of the synthetic chain domains (comma list; empty for none)")
+    ap.add_argument("--width", type=int, default=2, help="distractor actions per synthetic level (default 2)")
+    ap.add_argument("--chains", type=int, choices=range(1, 9), default=1, metavar="1-8",
+                    help="independent chains per synthetic goal (default 1)")
+    ap.add_argument("--agents", type=int, default=None, help="bench only the first N agents of each fixture")
+    ap.add_argument("--max-expansions", type=int, default=None, help="override the planner's budget")
+    ap.add_argument("--optimal-budget", type=int, default=50000,
+                    help="expansions for the optimal-cost reference search (default 50000)")
+    ap.add_argument("--tolerance", type=float, default=0.05, help="mean plan cost allowed over optimal (default 0.05)")
+    ap.add_argument("--min-gain", type=float, default=0.1,
+                    help="speedup needed to replace goal_count (default 0.1)")
+    ap.add_argument("--json", metavar="PATH", help="write the stats and recommendations as JSON")
+    ap.add_argument("--out", help="GML file for the (single) fixture's chosen heuristic")
+    ap.add_argument("--name", help="GML function name (default: Animus_Heuristic_<fixture stem>)")
+    ap.add_argument("--heuristic", choices=HEURISTICS[1:], help="render this heuristic instead of the recommendation")
+    ap.add_argument("--check", action="store_true",
+                    help="exit 1 if --out is missing or its tables are out of date; no benchmark, write nothing")
+    args = ap.parse_args(argv)
+
+    if (args.out or args.check) and len(args.fixtures) != 1:
+        print("[FAIL] --out/--check need exactly one fixture")
+        return 2
+    if args.check and not args.out:
+        print("[FAIL] --check needs --out")
+        return 2
+    domains = []
+    for path in args.fixtures:
+        try:
+            doc = load_fixture(path)
+        except (OSError, ValueError) as e:
+            print(f"[FAIL] {e}")
+            return 2
+        names = [g.get("name") for g in doc.get("goals") or [] if isinstance(g, dict)]
+        if len(set(names)) != len(names):
+            print(f"[FAIL] {path}: goal names must be unique (the tables are keyed by name)")
+            return 2
+        domains.append((pathlib.Path(path).stem, repo_path(path), doc))
+    if args.check:
+        return check(args, *domains[0])
+    depths = [int(d) for d in args.synthetic.split(",") if d.strip()]
+    for depth in depths:
+        domains.append((f"chain{depth}", f"synthetic depth {depth} width {args.width} chains {args.chains}",
+                        synthetic(depth, args.width, args.chains)))
+
+    report = {}
+    chosen = {}
+    for label, source, doc in domains:
+        config = fixture_config(doc)
+        if args.max_expansions is not None:
+            config["max_expansions"] = args.max_expansions
+        # wall time stands in for the planner's clock; time_budget_ms would make it machine-dependent
+        config["time_budget_ms"] = 0
+        relaxed, stats = bench(doc, config, args.optimal_budget, args.agents)
+        pick, why = recommend(stats, args.tolerance, args.min_gain)
+        chosen[label] = (relaxed, pick)
+        first = stats["goal_count"]
+        print(f"[INFO] {label} ({source}): {len(relaxed.actions)} action(s), {first['searches']} search(es), "
+              f"optimum known for {first['optimum_known']}, max_expansions={gml_string(config['max_expansions'])}")
+        for h in HEURISTICS:
+            s = stats[h]
+            print(f"  {h:<10} complete {s['complete']}/{s['searches']}, {s['budget_exhausted']} budget-exhausted; "
+                  f"expanded mean={s['expanded_mean']:.1f} p95={s['expanded_p95']} max={s['expanded_max']}; "
+                  f"cost/optimal mean={fmt_ratio(s['cost_ratio_mean'])} max={fmt_ratio(s['cost_ratio_max'])} "
+                  f"({s['optimal']} optimal); {s['us_per_call']:.1f} us/call, {s['search_ms']:.0f} ms")
+        print(f"[bench] {label}: recommend {pick} ({why})")
+        report[label] = {"source": source, "config": config, "stats": stats, "recommend": pick, "reason": why}
+
+    if args.json:
+        pathlib.Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"[INFO] wrote {args.json}")
+    if not args.out:
+        return 0
+
+    label, source, _doc = domains[0]
+    relaxed, pick = chosen[label]
+    pick = args.heuristic or pick
+    if pick == "goal_count":
+        print(f"[INFO] {label}: keeping the built-in heuristic; nothing to write (--heuristic to force one)")
+        return 0
+    text = table_text(args, label, source, relaxed, pick)
+    if text is None:
+        return 2
+    out = pathlib.Path(args.out)
+    out.write_text(text, encoding="utf-8")
+    print(f"[INFO] wrote {out} ({pick})")
+    if out.suffix == ".gml" and not out.with_suffix(".yy").exists():
+        print(f"[WARN] {out.with_suffix('.yy')} does not exist: add the script to the project once in GameMaker")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Static action relevance for a planner domain, baked into a GML table.
+
+search_plan tries every action at every expansion. An action helps toward a goal
+only if one of its effects can make true a desired effect of the goal, or a
+precondition of an action that helps. Others cannot shorten any plan: drop them
+from a valid plan and every remaining precondition, and the goal, sees the same
+value of each key it tests, because the last writer of that key was either kept
+or the initial state. So searching over the relevant actions alone finds plans
+of the same or lower cost (for non-negative costs), with fewer nodes.
+
+"Can make true" is exact per predicate. A set effect k=v helps a predicate on k
+if the predicate holds in {k: v}, and an unset effect helps if it holds in {}.
+Both are decided with planner_sim's mirror of Animus_Predicate (all eight ops).
+
+The analyzer reads a planner_sim fixture and writes a GML function returning
+  { actions: [names in agent order], signatures: [[preconditions, effects] per action],
+    goals: {goal: [action indices]}, goal_signatures: {goal: desired effects},
+    keys: {memory key: [indices of actions testing or writing it]} }
+Assign it to `planner.relevance_table`. On every plan() call the planner checks
+`actions` and the recorded predicates (key, op and value of each, in order)
+against the agent's actions, and each goal's against its desired effects, and
+searches each goal listed over its subset. A stale table would prune actions a goal now needs, so
+goals that are not listed or no longer match, or an action list that does not
+match, use every action.
+
+Also reported: actions that can never apply, and goals that can never be met,
+from the fixture's states. This uses relaxed reachability: each key collects
+every value it can take, and preconditions are checked one by one.
+"""
+import argparse
+import json
+import pathlib
+import sys
+
+from planner_sim import agents, domain, evaluate, fixture_config, load_fixture, simulate
+from predicate_compiler import gml_signature
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+UNSET = object()
+
+
+def helps(effect, pred):
+    """True if applying `effect` can make `pred` hold (they must share the key)."""
+    if effect["key"] != pred["key"]:
+        return False
+    state = {} if effect["op"] == "unset" else {effect["key"]: effect["value"]}
+    return evaluate(state, pred)
+
+
+def relevant(goal, actions):
+    """Indices of the actions that can contribute to `goal`, in action order."""
+    wanted = list(goal.desired_effects)
+    chosen = set()
+    while wanted:
+        pred = wanted.pop()
+        for i, action in enumerate(actions):
+            if i not in chosen and any(helps(e, pred) for e in action.effects):
+                chosen.add(i)
+                wanted.extend(action.preconditions)
+    return sorted(chosen)
+
+
+def key_index(actions):
+    """{key: indices of the actions that test or write it}."""
+    out = {}
+    for i, action in enumerate(actions):
+        for pred in action.preconditions + action.effects:
+            users = out.setdefault(pred["key"], [])
+            if not users or users[-1] != i:
+                users.append(i)
+    return dict(sorted(out.items()))
+
+
+def _holds(values, pred):
+    return any(evaluate({} if v is UNSET else {pred["key"]: v}, pred) for v in values.get(pred["key"], (UNSET,)))
+
+
+def _add(values, key, value):
+    slot = values.setdefault(key, [])
+    for v in slot:
+        if v is value or (v is not UNSET and value is not UNSET and type(v) is type(value) and v == value):
+            return False
+    slot.append(value)
+    return True
+
+
+def reachability(actions, goals, states):
+    """(indices of actions never applicable, names of goals never met) from any of `states`."""
+    values = {}
+    keys = {p["key"] for a in actions for p in a.preconditions + a.effects}
+    for state in states:
+        keys |= set(state)
+    for state in states:
+        for key in keys:
+            _add(values, key, state.get(key, UNSET))
+    live = set()
+    grew = True
+    while grew:
+        grew = False
+        for i, action in enumerate(actions):
+            if i in live or not all(_holds(values, p) for p in action.preconditions):
+                continue
+            live.add(i)
+            grew = True
+            for e in action.effects:
+                _add(values, e["key"], UNSET if e["op"] == "unset" else e["value"])
+    dead = [i for i in range(len(actions)) if i not in live]
+    unmet = [g.name for g in goals if not all(_holds(values, p) for p in g.desired_effects)]
+    return dead, unmet
+
+
+def table(actions, goals):
+    return {
+        "actions": [a.name for a in actions],
+        "goals": {g.name: relevant(g, actions) for g in goals},
+        "keys": key_index(actions),
+        "signatures": [(a.preconditions, a.effects) for a in actions],
+        "goal_signatures": {g.name: g.desired_effects for g in goals},
+    }
+
+
+def repo_path(path):
+    p = pathlib.Path(path).resolve()
+    return p.relative_to(ROOT).as_posix() if p.is_relative_to(ROOT) else p.as_posix()
+
+
+def render_gml(tbl, name, source, out):
+    q = json.dumps
+    ints = lambda xs: "[" + ", ".join(str(x) for x in xs) + "]"
+    lines = [
+        f"// Generated by tools/planner_relevance.py from {source}; do not edit.",
+        f"// Regenerate: python tools/planner_relevance.py {source} --name {name} --out {out}",
+        f"/// @desc Action relevance table for the planner (assign to planner.relevance_table).",
+        f"/// @returns {{Struct}}",
+        f"function {name}() {{",
+        "    var goals = {};",
+    ]
+    lines += [f"    variable_struct_set(goals, {q(g)}, {ints(xs)});" for g, xs in tbl["goals"].items()]
+    lines.append("    var goal_signatures = {};")
+    lines += [f"    variable_struct_set(goal_signatures, {q(g)}, {gml_signature(preds)});"
+              for g, preds in tbl["goal_signatures"].items()]
+    lines.append("    var keys = {};")
+    lines += [f"    variable_struct_set(keys, {q(k)}, {ints(xs)});" for k, xs in tbl["keys"].items()]
+    names = ",\n".join(f"            {q(a)}" for a in tbl["actions"])
+    signatures = ",\n".join(f"            [{gml_signature(pre)}, {gml_signature(fx)}]" for pre, fx in tbl["signatures"])
+    lines += [
+        "    return {",
+        "        actions: [",
+        names,
+        "        ],",
+        "        signatures: [",
+        signatures,
+        "        ],",
+        "        goals: goals,",
+        "        goal_signatures: goal_signatures,",
+        "        keys: keys",
+        "    };",
+        "}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    ap.add_argument("fixture")
+    ap.add_argument("--out", help="GML file to write (default: print)")
+    ap.add_argument("--name", help="GML function name (default: Animus_Relevance_<fixture stem>)")
+    ap.add_argument("--check", action="store_true", help="exit 1 if --out is missing or out of date; write nothing")
+    ap.add_argument("--compare", action="store_true",
+                    help="simulate the fixture with and without the table (planner_sim) and report expansions")
+    args = ap.parse_args(argv)
+
+    try:
+        doc = load_fixture(args.fixture)
+    except (OSError, ValueError) as e:
+        print(f"[FAIL] {e}")
+        return 2
+    actions, goals = domain(doc)
+    names = [g.name for g in goals]
+    if len(set(names)) != len(names):
+        print("[FAIL] goal names must be unique (the table is keyed by name)")
+        return 2
+    name = args.name or "Animus_Relevance_" + pathlib.Path(args.fixture).stem
+    tbl = table(actions, goals)
+    text = render_gml(tbl, name, repo_path(args.fixture), repo_path(args.out) if args.out else "<file>")
+
+    # the table itself may go to stdout
+    log = sys.stdout if args.out or args.compare else sys.stderr
+    for g in goals:
+        print(f"[INFO] goal {g.name}: {len(tbl['goals'][g.name])}/{len(actions)} action(s) relevant", file=log)
+    dead, unmet = reachability(actions, goals, [state for _name, state in agents(doc)])
+    for i in dead:
+        print(f"[WARN] action {actions[i].name} can never apply from the fixture's states", file=log)
+    for g in unmet:
+        print(f"[WARN] goal {g} can never be met from the fixture's states", file=log)
+
+    if args.compare:
+        config = fixture_config(doc)
+        full = simulate(doc, config)
+        pruned = simulate(doc, config, relevance=tbl["goals"])
+        for a, b in zip(full["summary"], pruned["summary"]):
+            print(f"[bench] goal {a['goal']}: expanded max {a['expanded_max']} -> {b['expanded_max']}, "
+                  f"generated max {a['generated_max']} -> {b['generated_max']}, "
+                  f"complete {a['complete']} -> {b['complete']}/{a['runs']}")
+        worse = sum(1 for ra, rb in zip(full["runs"], pruned["runs"])
+                    for ga, gb in zip(ra["goals"], rb["goals"])
+                    if ga["found"] and not ga["is_partial"] and (gb["is_partial"] or gb["cost"] > ga["cost"]))
+        if worse:
+            print(f"[WARN] {worse} search(es) found a costlier plan with the table")
+
+    if args.check:
+        if not args.out:
+            print("[FAIL] --check needs --out")
+            return 2
+        try:
+            current = pathlib.Path(args.out).read_text(encoding="utf-8")
+        except OSError:
+            current = None
+        if current != text:
+            print(f"[FAIL] {args.out} is out of date; rerun without --check")
+            return 1
+        print(f"[ok] {args.out} is up to date")
+        return 0
+    if args.out:
+        out = pathlib.Path(args.out)
+        out.write_text(text, encoding="utf-8")
+        print(f"[INFO] wrote {out}")
+        if out.suffix == ".gml" and not out.with_suffix(".yy").exists():
+            print(f"[WARN] {out.with_suffix('.yy')} does not exist: add the script to the project once in GameMaker")
+    elif not args.compare:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""Offline mirror of Animus_Planner's A* (`search_plan`, `plan`) for budget tuning.
+
+Loads a domain fixture (YAML or JSON) and runs the same search the game runs,
+with the same predicate forms (Animus_Predicate), state hash, heuristic (count of
+unsatisfied desired effects), closed set and `reopen_closed_on_better_g` rule.
+For every goal it reports nodes_expanded, nodes_generated, open_peak, cost and
+whether the budget ran out, and which plan `plan()` would return.
+
+Fixture:
+  config:   {max_expansions: 500}          # optional; overrides Animus_Planner.gml's config
+  state:    {has_axe: false, wood: 0}      # the memory the planner starts from
+  actions:  [{name: chop, preconditions: [has_axe], effects: [[wood, 1]], cost: 2}]
+            # cost: {base: 1, key: load, per: 0.5} stands in for a callable cost(state):
+            # base + per * state[key] when that is a number, else base
+  goals:    [{name: stock, desired_effects: [[wood, 1, ge]], priority: 5, relevant: true}]
+  agents:   [{name: a1, state: {wood: 3}}]  # optional: one run each, over the base state
+            # or {count: 1000, seed: 1, vary: {wood: [0, 1, 2], has_axe: [true, false]}}
+
+Where the game leaves something unspecified, the mirror picks one behaviour:
+  - ties in the open list (ds_priority) pop first-in first-out (`--ties lifo` to compare);
+  - goals of equal priority keep fixture order (array_sort is not documented stable);
+  - current_time is not observable: with --ms-per-expansion X, every expansion advances a
+    simulated clock by X ms (shared by the goals of one plan() call, as start_time is);
+    0 (default) never exhausts the time budget;
+  - string() of a real is an integer when integral and "%.2f" otherwise, bools are
+    true/false, so state_hash groups the same states the game does for such values;
+  - == on reals allows the runner's 0.00001 epsilon, a bool compares as 0/1, mixed
+    types and arrays are unequal; gt/ge/lt/le against a non-number are false (the game
+    would raise).
+"""
+import argparse
+import copy
+import heapq
+import itertools
+import json
+import pathlib
+import random
+import re
+import sys
+
+PLANNER_GML = pathlib.Path(__file__).resolve().parent.parent / "GOAP/scripts/Animus_Planner/Animus_Planner.gml"
+CONFIG_KEYS = ("max_expansions", "max_depth", "time_budget_ms", "reopen_closed_on_better_g")
+OPS = ("eq", "ne", "gt", "ge", "lt", "le", "unset", "has")
+EPSILON = 0.00001
+NO_G = 1e30
+
+
+def planner_defaults(path=PLANNER_GML):
+    """Animus_Planner's `config` as written in the GML (the values the game ships)."""
+    cfg = {"max_expansions": 2000, "max_depth": 64, "time_budget_ms": 8, "reopen_closed_on_better_g": True}
+    try:
+        text = pathlib.Path(path).read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return cfg
+    m = re.search(r"\bconfig\s*=\s*\{(.*?)\}", text, re.S)
+    if m:
+        for key, value in re.findall(r"(\w+)\s*:\s*([-\w.]+)", m.group(1)):
+            if key in cfg:
+                if value in ("true", "false"):
+                    cfg[key] = value == "true"
+                else:
+                    cfg[key] = int(float(value)) if float(value).is_integer() else float(value)
+    return cfg
+
+
+def fixture_config(doc):
+    """The shipped config with a fixture's `config` overrides."""
+    config = planner_defaults()
+    config.update({k: v for k, v in (doc.get("config") or {}).items() if k in CONFIG_KEYS})
+    return config
+
+
+# ---- GML values -------------------------------------------------------------
+
+def is_real(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def gml_string(v):
+    if v is None:
+        return "undefined"
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if is_real(v):
+        if float(v).is_integer():
+            return str(int(v))
+        return "%.2f" % v
+    if isinstance(v, list):
+        return "[ " + ",".join(gml_string(x) for x in v) + " ]"
+    if isinstance(v, dict):
+        return "{ " + ", ".join(f"{k} : {gml_string(x)}" for k, x in v.items()) + " }"
+    return str(v)
+
+
+def gml_eq(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) < EPSILON
+    if isinstance(a, str) and isinstance(b, str):
+        return a == b
+    return False
+
+
+def _compare(lhs, value, op):
+    if not is_real(lhs) or not isinstance(value, (int, float)):
+        return False
+    if op == "gt":
+        return lhs > value
+    if op == "ge":
+        return lhs >= value
+    if op == "lt":
+        return lhs < value
+    return lhs <= value
+
+
+# ---- Animus_Predicate ---------------------------------------------------------
+
+def normalize_entry(entry, mode):
+    out = {"key": "", "op": "eq", "value": True}
+    if isinstance(entry, str):
+        if entry.startswith("!"):
+            out["key"] = entry[1:]
+            if mode == "effect":
+                out["op"], out["value"] = "unset", None
+            else:
+                out["value"] = False
+        else:
+            out["key"] = entry
+        return out
+    if isinstance(entry, list):
+        out["key"] = gml_string(entry[0] if entry else None)
+        out["value"] = entry[1] if len(entry) >= 2 else True
+        out["op"] = gml_string(entry[2] if len(entry) >= 3 else "eq").lower()
+        return out
+    if isinstance(entry, dict):
+        if "key" in entry:
+            out["key"] = gml_string(entry["key"])
+        elif "name" in entry:
+            out["key"] = gml_string(entry["name"])
+        if "value" in entry:
+            out["value"] = entry["value"]
+        elif "expected" in entry:
+            out["value"] = entry["expected"]
+        if "op" in entry:
+            out["op"] = gml_string(entry["op"]).lower()
+        if entry.get("negate"):
+            if mode == "effect":
+                out["op"], out["value"] = "unset", None
+            else:
+                out["op"], out["value"] = "eq", False
+        if entry.get("unset"):
+            out["op"], out["value"] = "unset", None
+        return out
+    if entry is not None:
+        out["value"] = entry
+    return out
+
+
+def normalize_list(predicates, mode):
+    if not isinstance(predicates, list):
+        return []
+    out = []
+    for entry in predicates:
+        pred = normalize_entry(entry, mode)
+        if pred["key"] != "":
+            if pred["op"] not in OPS:
+                pred["op"] = "eq"
+            out.append(pred)
+    return out
+
+
+def _test(present, lhs, pred):
+    op = pred["op"]
+    if op == "unset":
+        return not present
+    if op == "has":
+        return present
+    if op == "ne":
+        return not gml_eq(lhs, pred["value"])
+    if op in ("gt", "ge", "lt", "le"):
+        return _compare(lhs, pred["value"], op)
+    return gml_eq(lhs, pred["value"])
+
+
+def evaluate(state, pred):
+    key = pred["key"]
+    return _test(key in state, state.get(key), pred)
+
+
+def apply_effect(state, pred):
+    if pred["op"] == "unset":
+        state.pop(pred["key"], None)
+    else:
+        state[pred["key"]] = pred["value"]
+
+
+def state_hash(state):
+    return "|".join(k + ":" + gml_string(state[k]) for k in sorted(state))
+
+
+# ---- key-interned (flat) states: Animus_Planner with a key_registry ------------
+
+ABSENT = object()    # a slot whose key the state does not hold (Animus_Predicate.absent)
+
+
+def evaluate_flat(values, pred):
+    lhs = values[pred["slot"]]
+    return _test(lhs is not ABSENT, None if lhs is ABSENT else lhs, pred)
+
+
+def apply_effect_flat(values, pred):
+    values[pred["slot"]] = ABSENT if pred["op"] == "unset" else pred["value"]
+
+
+def flat_hash(values, segments):
+    """state_hash of a flat state: `segments` are (text, slot) in key order, slot -1 for a
+    constant "key:value" of a key outside the registry."""
+    parts = []
+    for text, slot in segments:
+        if slot < 0:
+            parts.append(text)
+        elif values[slot] is not ABSENT:
+            parts.append(text + gml_string(values[slot]))
+    return "|".join(parts)
+
+
+def holds(state, pred):
+    return evaluate_flat(state, pred) if isinstance(state, list) else evaluate(state, pred)
+
+
+def intern(keys, actions, goals, state):
+    """(actions, goals, flat state, hash segments) with every predicate given the slot of its
+    key in the registry `keys` (index -> name), or None if one is not registered; the planner
+    then keeps struct states. Keys of `state` outside the registry are constant during a
+    search (no predicate writes them), so they become fixed segments of the hash. An action
+    whose cost reads the state keeps struct states too, as cost(state) expects a struct."""
+    if any(a.cost_key is not None for a in actions):
+        return None
+    index = {k: i for i, k in enumerate(keys)}
+
+    def slotted(preds):
+        return [dict(p, slot=index[p["key"]]) for p in preds]
+    try:
+        flat_actions = [copy.copy(a) for a in actions]
+        for a in flat_actions:
+            a.preconditions, a.effects = slotted(a.preconditions), slotted(a.effects)
+        flat_goals = [copy.copy(g) for g in goals]
+        for g in flat_goals:
+            g.desired_effects = slotted(g.desired_effects)
+    except KeyError:
+        return None
+    values = [ABSENT] * len(keys)
+    named = [(k, (k + ":", i)) for i, k in enumerate(keys)]
+    for key, value in state.items():
+        if key in index:
+            values[index[key]] = value
+        else:
+            named.append((key, (key + ":" + gml_string(value), -1)))
+    segments = [seg for _name, seg in sorted(named, key=lambda n: n[0])]
+    return flat_actions, flat_goals, values, segments
+
+
+# ---- domain -----------------------------------------------------------------
+
+class Action:
+    def __init__(self, name, preconditions, effects, cost=None):
+        self.name = name if isinstance(name, str) else "Action"
+        self.preconditions = normalize_list(preconditions, "condition")
+        self.effects = normalize_list(effects, "effect")
+        self.cost_key = None
+        self.cost_per = 1
+        if isinstance(cost, dict):
+            self.cost_key = cost.get("key")
+            self.cost_per = cost.get("per") if is_real(cost.get("per")) else 1
+            cost = cost.get("base")
+        self.cost = cost if is_real(cost) else 1
+
+    def cost_of(self, state):
+        """Animus_Action.cost(state): the constant, or the state-dependent cost read by key."""
+        if self.cost_key is None:
+            return self.cost
+        if not isinstance(state, dict):
+            raise TypeError(f"{self.name}: a state-dependent cost needs a struct state")
+        value = state.get(self.cost_key)
+        return self.cost + self.cost_per * value if is_real(value) else self.cost
+
+
+class Goal:
+    def __init__(self, name, desired_effects, priority=None, relevant=True):
+        self.name = name if isinstance(name, str) else "Goal"
+        self.desired_effects = normalize_list(desired_effects, "condition")
+        self.priority = priority if is_real(priority) else 0
+        self.relevant = bool(relevant)
+
+    def unsatisfied(self, state):
+        return sum(1 for pred in self.desired_effects if not holds(state, pred))
+
+
+class Clock:
+    """Stands in for current_time: `ms_per_expansion` per expansion since the plan() call."""
+    def __init__(self, ms_per_expansion=0.0):
+        self.ms_per_expansion = ms_per_expansion
+        self.expansions = 0
+
+    def elapsed(self):
+        return self.expansions * self.ms_per_expansion
+
+
+class SearchResult:
+    def __init__(self, goal):
+        self.goal = goal
+        self.actions = []
+        self.cost = 0
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        self.open_peak = 0
+        self.found = False        # search_plan returned a result (else: undefined)
+        self.is_partial = False
+        self.reason = None
+        self.budget_exhausted = False
+
+    def as_dict(self):
+        return {
+            "goal": self.goal.name,
+            "found": self.found,
+            "actions": [a.name for a in self.actions],
+            "cost": self.cost,
+            "nodes_expanded": self.nodes_expanded,
+            "nodes_generated": self.nodes_generated,
+            "open_peak": self.open_peak,
+            "is_partial": self.is_partial,
+            "reason": self.reason,
+            "budget_exhausted": self.budget_exhausted,
+        }
+
+
+def search_plan(goal, actions, state, config, clock=None, lifo=False, segments=None, trace=None, heuristic=None):
+    """Animus_Planner.search_plan for one goal from `state`: a dict, or a flat state with its
+    hash `segments` (intern). Every hash computed is appended to `trace` if given.
+    `heuristic(goal, state)` stands in for heuristic_to_goal, which is also the goal test
+    (h == 0); the default counts unsatisfied desired effects."""
+    clock = clock or Clock()
+    flat = segments is not None
+    h_of = (lambda s: heuristic(goal, s)) if heuristic else goal.unsatisfied
+
+    def hash_of(s):
+        h = flat_hash(s, segments) if flat else state_hash(s)
+        if trace is not None:
+            trace.append(h)
+        return h
+
+    result = SearchResult(goal)
+    seq = itertools.count()
+    sign = -1 if lifo else 1
+    open_heap = []
+    open_best = {}
+    closed = set()
+    best_node = None
+    best_score = NO_G
+
+    h = h_of(state)
+    # node: (state, g, h, depth, via_action, parent)
+    heapq.heappush(open_heap, (h, sign * next(seq), (list(state) if flat else dict(state), 0, h, 0, None, None)))
+    open_best[hash_of(state)] = 0
+    result.nodes_generated += 1
+
+    max_expansions = config["max_expansions"]
+    max_depth = config["max_depth"]
+    time_budget = config["time_budget_ms"]
+    reopen = config["reopen_closed_on_better_g"]
+    while open_heap:
+        if max_expansions >= 0 and result.nodes_expanded >= max_expansions:
+            result.budget_exhausted = True
+            break
+        if time_budget > 0 and clock.elapsed() > time_budget:
+            result.budget_exhausted = True
+            break
+        current = heapq.heappop(open_heap)[2]
+        result.nodes_expanded += 1
+        clock.expansions += 1
+        cur_state, cur_g, _h, cur_depth = current[:4]
+
+        if h_of(cur_state) == 0:
+            best_node = current
+            break
+        closed.add(hash_of(cur_state))
+        if len(open_heap) > result.open_peak:
+            result.open_peak = len(open_heap)
+        if max_depth > 0 and cur_depth >= max_depth:
+            continue
+
+        for action in actions:
+            if not all(holds(cur_state, pred) for pred in action.preconditions):
+                continue
+            if flat:
+                next_state = list(cur_state)
+                for pred in action.effects:
+                    apply_effect_flat(next_state, pred)
+            else:
+                next_state = dict(cur_state)
+                for pred in action.effects:
+                    apply_effect(next_state, pred)
+            next_hash = hash_of(next_state)
+            if next_hash in closed:
+                continue
+            next_g = cur_g + action.cost_of(cur_state)
+            best_g_known = open_best.get(next_hash, NO_G)
+            if not reopen and next_g >= best_g_known:
+                continue
+            if next_g < best_g_known:
+                open_best[next_hash] = next_g
+            next_h = h_of(next_state)
+            node = (next_state, next_g, next_h, cur_depth + 1, action, current)
+            f = next_g + next_h
+            heapq.heappush(open_heap, (f, sign * next(seq), node))
+            result.nodes_generated += 1
+            if f < best_score:
+                best_node = node
+                best_score = f
+
+    if best_node is None:
+        return result
+    result.found = True
+    if h_of(best_node[0]) != 0:
+        result.is_partial = True
+        result.reason = "budget_exhausted" if result.budget_exhausted else "no_solution"
+    walker = best_node
+    while walker is not None and walker[4] is not None:
+        result.actions.append(walker[4])
+        walker = walker[5]
+    result.actions.reverse()
+    result.cost = best_node[1]
+    return result
+
+
+def prioritized(goals):
+    return sorted((g for g in goals if g.relevant), key=lambda g: -g.priority)
+
+
+def goal_actions(goal, actions, relevance):
+    """The actions plan() searches `goal` over: its entry of a relevance table, else all."""
+    if relevance is None or goal.name not in relevance:
+        return actions
+    return [actions[i] for i in relevance[goal.name]]
+
+
+def plan(actions, goals, state, config, ms_per_expansion=0.0, lifo=False, relevance=None, registry=None):
+    """Animus_Planner.plan without reuse: (SearchResult of the plan returned or None,
+    results of the goals searched in order). A goal already met yields an empty plan.
+    `relevance` is a relevance table's `goals` ({goal name: action indices}), `registry`
+    a key registry's `keys` (searches then run on flat states when every key is in it)."""
+    clock = Clock(ms_per_expansion)
+    best = None
+    attempts = []
+    ordered = prioritized(goals)
+    search_state, segments = state, None
+    interned = intern(registry, actions, ordered, state) if registry is not None else None
+    if interned is not None:
+        actions, ordered, search_state, segments = interned
+    for goal in ordered:
+        if goal.unsatisfied(state) == 0:
+            empty = SearchResult(goal)
+            empty.found = True
+            attempts.append(empty)
+            return empty, attempts
+        result = search_plan(goal, goal_actions(goal, actions, relevance), search_state, config, clock, lifo,
+                             segments)
+        attempts.append(result)
+        if not result.found:
+            continue
+        best = result
+        if not result.is_partial:
+            break
+    return best, attempts
+
+
+# ---- fixtures ---------------------------------------------------------------
+
+def load_fixture(path):
+    data = pathlib.Path(path).read_bytes()
+    if str(path).endswith(".json"):
+        doc = json.loads(data)
+    else:
+        import yaml
+        doc = yaml.safe_load(data.decode("utf-8"))
+    if not isinstance(doc, dict):
+        raise ValueError(f"{path}: fixture must be a mapping")
+    return doc
+
+
+def domain(doc):
+    """(actions, goals) of a fixture."""
+    actions = [Action(a.get("name"), a.get("preconditions"), a.get("effects"), a.get("cost"))
+               for a in doc.get("actions") or [] if isinstance(a, dict)]
+    goals = [Goal(g.get("name"), g.get("desired_effects"), g.get("priority"), g.get("relevant", True))
+             for g in doc.get("goals") or [] if isinstance(g, dict)]
+    return actions, goals
+
+
+def agents(doc):
+    """[(name, initial state)] of a fixture: its `agents`, else the base state alone."""
+    base = {str(k): v for k, v in (doc.get("state") or {}).items()}
+    spec = doc.get("agents")
+    if isinstance(spec, dict):
+        rng = random.Random(spec.get("seed", 0))
+        vary = spec.get("vary") or {}
+        out = []
+        for i in range(int(spec.get("count", 1))):
+            state = dict(base)
+            for key, choices in vary.items():
+                state[str(key)] = rng.choice(choices)
+            out.append((f"agent{i}", state))
+        return out
+    if isinstance(spec, list):
+        return [(a.get("name", f"agent{i}"), {**base, **{str(k): v for k, v in (a.get("state") or {}).items()}})
+                for i, a in enumerate(spec)]
+    return [("state", base)]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0
+
+
+def summarize(runs, goals):
+    rows = []
+    for goal in goals:
+        results = [r for run in runs for r in run["goals"] if r["goal"] == goal.name]
+        if not results:
+            continue
+        expanded = [r["nodes_expanded"] for r in results]
+        rows.append({
+            "goal": goal.name,
+            "runs": len(results),
+            "complete": sum(r["found"] and not r["is_partial"] for r in results),
+            "budget_exhausted": sum(r["budget_exhausted"] for r in results),
+            "no_solution": sum(not r["budget_exhausted"] and (r["reason"] == "no_solution" or not r["found"])
+                               for r in results),
+            "expanded_p50": percentile(expanded, 50),
+            "expanded_p95": percentile(expanded, 95),
+            "expanded_max": max(expanded),
+            "generated_max": max(r["nodes_generated"] for r in results),
+            "open_peak_max": max(r["open_peak"] for r in results),
+            "cost_max": max(r["cost"] for r in results if r["found"]) if any(r["found"] for r in results) else None,
+        })
+    return rows
+
+
+def simulate(doc, config, ms_per_expansion=0.0, lifo=False, relevance=None):
+    """Every goal searched on its own (own clock) for each agent, plus what plan() returns."""
+    actions, goals = domain(doc)
+    runs = []
+    for name, state in agents(doc):
+        per_goal = [search_plan(g, goal_actions(g, actions, relevance), state, config,
+                                Clock(ms_per_expansion), lifo).as_dict()
+                    for g in prioritized(goals) if g.unsatisfied(state) != 0]
+        chosen, attempts = plan(actions, goals, state, config, ms_per_expansion, lifo, relevance)
+        runs.append({
+            "agent": name,
+            "goals": per_goal,
+            "plan": chosen.as_dict() if chosen else None,
+            "plan_expanded": sum(a.nodes_expanded for a in attempts),
+        })
+    return {"config": config, "runs": runs, "summary": summarize(runs, prioritized(goals))}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    ap.add_argument("fixture")
+    ap.add_argument("--max-expansions", default=None,
+                    help="override; a comma list (250,500,2000) runs one sweep per value")
+    ap.add_argument("--max-depth", type=int, default=None)
+    ap.add_argument("--time-budget-ms", type=float, default=None)
+    ap.add_argument("--ms-per-expansion", type=float, default=0.0,
+                    help="simulated cost of one expansion against time_budget_ms (0: time never runs out)")
+    ap.add_argument("--no-reopen", action="store_true", help="reopen_closed_on_better_g = false")
+    ap.add_argument("--ties", choices=("fifo", "lifo"), default="fifo", help="pop order of equal f in the open list")
+    ap.add_argument("--json", metavar="PATH", help="write every run and the summary as JSON")
+    ap.add_argument("--verbose", action="store_true", help="print each agent's plan")
+    ap.add_argument("--fail-on-exhausted", action="store_true",
+                    help="exit 1 if plan() returns a budget-exhausted partial plan for any agent")
+    args = ap.parse_args(argv)
+
+    try:
+        doc = load_fixture(args.fixture)
+    except (OSError, ValueError) as e:
+        print(f"[FAIL] {e}")
+        return 2
+    base = fixture_config(doc)
+    if args.max_depth is not None:
+        base["max_depth"] = args.max_depth
+    if args.time_budget_ms is not None:
+        base["time_budget_ms"] = args.time_budget_ms
+    if args.no_reopen:
+        base["reopen_closed_on_better_g"] = False
+    budgets = [base["max_expansions"]]
+    if args.max_expansions:
+        budgets = [int(v) for v in args.max_expansions.split(",") if v.strip()]
+
+    reports = []
+    exhausted = 0
+    for budget in budgets:
+        config = dict(base, max_expansions=budget)
+        report = simulate(doc, config, args.ms_per_expansion, args.ties == "lifo")
+        reports.append(report)
+        cfg_text = " ".join(f"{k}={gml_string(config[k])}" for k in CONFIG_KEYS)
+        print(f"[INFO] {args.fixture}: {len(report['runs'])} agent(s), {cfg_text}")
+        for run in report["runs"]:
+            chosen = run["plan"]
+            if chosen and chosen["reason"] == "budget_exhausted":
+                exhausted += 1
+            if args.verbose:
+                if chosen is None:
+                    print(f"  {run['agent']}: no plan ({run['plan_expanded']} expanded)")
+                else:
+                    state = "partial (" + chosen["reason"] + ")" if chosen["is_partial"] else "complete"
+                    print(f"  {run['agent']}: {chosen['goal']} {state} cost={gml_string(chosen['cost'])} "
+                          f"[{', '.join(chosen['actions'])}] ({run['plan_expanded']} expanded)")
+        for row in report["summary"]:
+            cost = "-" if row["cost_max"] is None else gml_string(row["cost_max"])
+            print(f"  goal {row['goal']}: {row['complete']}/{row['runs']} complete, "
+                  f"{row['budget_exhausted']} budget-exhausted, {row['no_solution']} unsolvable; "
+                  f"expanded p50={row['expanded_p50']} p95={row['expanded_p95']} max={row['expanded_max']}, "
+                  f"generated max={row['generated_max']}, open_peak max={row['open_peak_max']}, cost max={cost}")
+
+    if args.json:
+        out = reports[0] if len(reports) == 1 else {"sweep": reports}
+        pathlib.Path(args.json).write_text(json.dumps(out, indent=2) + "\n", encoding="utf-8")
+        print(f"[INFO] wrote {args.json}")
+    if args.fail_on_exhausted and exhausted:
+        print(f"[FAIL] {exhausted} plan(s) cut short by the budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 #!/usr/bin/env bash
 set -euo pipefail
-echo "[precommit] Animus sanity & integrity"
-python tools/gml_linter.py
-python tools/yy_integrity.py
+echo "[precommit] Animus sanity & integrity (staged changes)"
+python tools/gml_linter.py --staged
+python tools/yy_integrity.py --staged
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""Compiles a planner domain's predicates into straight-line GML functions.
+
+Animus_Predicate.evaluate and apply_effect interpret every predicate they are
+given. For each test they switch on the op string and read the state through
+_state_read, and action_applicable and heuristic_to_goal run them at every
+expansion. This compiler reads the actions and goals of a planner_sim fixture
+and emits, for each action:
+  <P>_pre_<i>(state)  the preconditions, one `if (...) return false;` per check
+                      (ops resolved, keys and constants inlined, duplicates dropped)
+  <P>_fx_<i>(state)   the effects, only the last write per key
+and, for each goal, <P>_h_<j>(state), the count of unmet desired effects. A
+dispatch function <P>() returns
+  { actions, signatures, applicable, apply, goals, goal_signatures, registry,
+    flat_applicable, flat_apply, flat_goals }
+Assign it to `planner.compiled_predicates`. The planner binds the functions in
+each plan() call, one action or goal at a time, and only while the action name
+and its predicates (key, op and value of each, in order, as recorded in
+`signatures`/`goal_signatures`) match. Otherwise, or for entries left undefined,
+it interprets as before.
+
+With --registry (a tools/key_registry.py output), flat variants are emitted too.
+They read slots of the key-interned state arrays directly, and are used only
+while planner.key_registry holds the same keys.
+
+Predicates with array or struct values are not compiled. GML == compares those
+by reference, so an inlined literal could never be equal. The action or goal
+keeps its interpreted path.
+
+An ordering op (gt/ge/lt/le) against a constant that is not a number is lowered
+to `false`, as planner_sim's _compare treats it.
+
+--verify is the differential harness. It runs the emitted GML text itself,
+translated line by line into Python (gml_to_python accepts only the subset this
+compiler writes), against planner_sim's interpreted evaluate/apply_effect (and
+the flat variants against evaluate_flat) on randomized states. The states are
+built from each key's constants, values beside them, undefined, bools and
+absent keys.
+
+The predicates come from the fixture, not from the game's own action and goal
+definitions. Nothing here notices when the two drift apart; the planner does, at
+bind time, through the recorded signatures, and interprets the entries that
+changed.
+"""
+import argparse
+import json
+import math
+import pathlib
+import random
+import re
+import sys
+
+from key_registry import previous_keys
+from planner_sim import (ABSENT, apply_effect, apply_effect_flat, domain, evaluate, evaluate_flat, gml_eq,
+                         intern, is_real, load_fixture)
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+CMP = {"gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+
+
+def _ident(v):
+    """Type-aware identity of a constant (True and 1 are different literals)."""
+    return (type(v).__name__, repr(v))
+
+
+def literal_ok(v):
+    if isinstance(v, float):
+        return math.isfinite(v)
+    return v is None or isinstance(v, (bool, int, str))
+
+
+def lower(pred):
+    """The (key, op, value) check of one predicate. An ordering op against a constant that is
+    not a number can never hold (planner_sim's _compare) and becomes op "never"."""
+    if pred["op"] in CMP and not is_real(pred["value"]):
+        return (pred["key"], "never", None)
+    return (pred["key"], pred["op"], pred["value"])
+
+
+def fold_checks(preds):
+    """Preconditions as (key, op, value) checks, duplicates dropped; None if not compilable."""
+    out, seen = [], set()
+    for p in preds:
+        if not literal_ok(p["value"]):
+            return None
+        ident = (p["key"], p["op"], _ident(p["value"]))
+        if ident not in seen:
+            seen.add(ident)
+            out.append(lower(p))
+    return out
+
+
+def fold_writes(preds):
+    """Effects as (key, value or ABSENT), the last write per key in first-write order; None if not compilable."""
+    last = {}
+    for p in preds:
+        if p["op"] != "unset" and not literal_ok(p["value"]):
+            return None
+        last[p["key"]] = ABSENT if p["op"] == "unset" else p["value"]
+    return list(last.items())
+
+
+# ---- backends ---------------------------------------------------------------
+
+def gml_literal(v):
+    if v is None:
+        return "undefined"
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, int):
+        return str(v)
+    if isinstance(v, float):
+        text = repr(v)
+        if "e" in text or "E" in text:
+            text = f"{v:.20f}".rstrip("0").rstrip(".")
+        return text
+    return json.dumps(v, ensure_ascii=False)
+
+
+def gml_predicate(pred):
+    return (f"{{ key: {json.dumps(pred['key'], ensure_ascii=False)}, op: {json.dumps(pred['op'])}, "
+            f"value: {gml_literal(pred.get('value'))} }}")
+
+
+def gml_signature(preds):
+    """A GML list of `preds` as { key, op, value } structs for the planner to compare its own
+    predicates with; undefined (never matches) when a value cannot be written as a literal."""
+    if not all(p["op"] == "unset" or literal_ok(p.get("value")) for p in preds):
+        return "undefined"
+    return "[" + ", ".join(gml_predicate(p) for p in preds) + "]"
+
+
+class Backend:
+    def __init__(self, flat):
+        self.flat = flat
+
+    def read(self, key, slot, var):
+        """Lines binding `var` to the key's value (undefined when absent); the flat form also
+        binds `var`_has to its presence."""
+        if self.flat:
+            return [f"var {var} = state[{slot}];",
+                    f"var {var}_has = !(is_struct({var}) && {var} == Animus_Predicate.absent);",
+                    f"if (!{var}_has) {var} = undefined;"]
+        # a struct read of a missing key is already undefined
+        return [f"var {var} = state[$ {json.dumps(key, ensure_ascii=False)}];"]
+
+    def present(self, key, var):
+        return f"{var}_has" if self.flat else f"variable_struct_exists(state, {json.dumps(key, ensure_ascii=False)})"
+
+    def test(self, op, var, present, value):
+        c = gml_literal(value)
+        if op == "never":
+            return "false"
+        if op == "unset":
+            return f"!{present}"
+        if op == "has":
+            return present
+        if op == "ne":
+            return f"{var} != {c}"
+        if op in CMP:
+            return f"is_real({var}) && {var} {CMP[op]} {c}"
+        return f"{var} == {c}"
+
+    def write(self, key, slot, value):
+        if self.flat:
+            v = "Animus_Predicate.absent" if value is ABSENT else gml_literal(value)
+            return [f"state[@ {slot}] = {v};"]
+        k = json.dumps(key, ensure_ascii=False)
+        if value is ABSENT:
+            return [f"if (variable_struct_exists(state, {k})) {{", f"    variable_struct_remove(state, {k});", "}"]
+        return [f"state[$ {k}] = {gml_literal(value)};"]
+
+
+def _body_checks(backend, checks, slots, on_fail):
+    """Lines testing `checks` in order, reading each key once, with on_fail(condition) per check."""
+    lines, names = [], {}
+    for key, op, value in checks:
+        if key not in names:
+            names[key] = f"v{len(names)}"
+            lines += backend.read(key, slots.get(key), names[key])
+        var = names[key]
+        lines += on_fail(backend.test(op, var, backend.present(key, var), value))
+    return lines
+
+
+def render_function(backend, kind, name, item, slots):
+    """Source lines of one compiled function: kind is pre, fx or h."""
+    fail = {"pre": lambda c: [f"if (!({c})) return false;"], "h": lambda c: [f"if (!({c})) n += 1;"]}
+    body = []
+    if kind == "fx":
+        for key, value in item:
+            body += backend.write(key, slots.get(key), value)
+    elif kind == "pre":
+        body = _body_checks(backend, item, slots, fail["pre"])
+        body.append("return true;")
+    else:
+        body = ["var n = 0;"]
+        body += _body_checks(backend, item, slots, fail["h"])
+        body.append("return n;")
+    return [f"function {name}(state) {{"] + ["    " + line for line in body] + ["}"]
+
+
+# ---- running the emitted GML ------------------------------------------------
+
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_OPERAND = r"[\w.@-]+"
+_EXPR = [
+    (re.compile(r"(\w+) == Animus_Predicate\.absent"), r"(\1 is ABSENT)"),
+    (re.compile(r"variable_struct_exists\(state, (@\d+@)\)"), r"(\1 in state)"),
+    (re.compile(r"state\[\$ (@\d+@)\]"), r"state.get(\1)"),
+    (re.compile(r"\bis_real\("), "_is_real("),
+    (re.compile(r"\bis_struct\("), "_is_struct("),
+    (re.compile(rf"(\w+) == ({_OPERAND})"), r"_eq(\1, \2)"),
+    (re.compile(rf"(\w+) != ({_OPERAND})"), r"(not _eq(\1, \2))"),
+    (re.compile(r"&&"), "and"),
+    (re.compile(r"!(?!=)"), "not "),
+    (re.compile(r"\btrue\b"), "True"),
+    (re.compile(r"\bfalse\b"), "False"),
+    (re.compile(r"\bundefined\b"), "None"),
+    (re.compile(r"Animus_Predicate\.absent"), "ABSENT"),
+]
+_STATEMENTS = [
+    (re.compile(r"var (\w+) = (.*);"), lambda m: f"{m[1]} = {_expr(m[2])}"),
+    (re.compile(r"return (.*);"), lambda m: f"return {_expr(m[1])}"),
+    (re.compile(r"(\w+) \+= 1;"), lambda m: f"{m[1]} += 1"),
+    (re.compile(r"(\w+) = (.*);"), lambda m: f"{m[1]} = {_expr(m[2])}"),
+    (re.compile(r"state\[@ (\d+)\] = (.*);"), lambda m: f"state[{m[1]}] = {_expr(m[2])}"),
+    (re.compile(r"state\[\$ (@\d+@)\] = (.*);"), lambda m: f"state[{m[1]}] = {_expr(m[2])}"),
+    (re.compile(r"variable_struct_remove\(state, (@\d+@)\);"), lambda m: f"del state[{m[1]}]"),
+]
+
+
+def _expr(text):
+    for rx, repl in _EXPR:
+        text = rx.sub(repl, text)
+    return text
+
+
+def _statement(text, line):
+    for rx, make in _STATEMENTS:
+        m = rx.fullmatch(text)
+        if m:
+            return make(m)
+    raise ValueError(f"no Python for emitted GML: {line.strip()}")
+
+
+def gml_to_python(lines):
+    """Python for the GML subset render_function emits, line by line, so --verify runs the
+    shipped text itself. Anything outside that subset raises ValueError."""
+    out = []
+    for line in lines:
+        indent = " " * (len(line) - len(line.lstrip(" ")))
+        strings = []
+        text = _STRING.sub(lambda m: strings.append(m.group(0)) or f"@{len(strings) - 1}@", line.strip())
+        head = re.fullmatch(r"function (\w+)\(state\) \{", text)
+        if head:
+            py = f"def {head[1]}(state):"
+        elif text == "}":
+            if out and out[-1].startswith("def "):
+                out.append(indent + "    pass")
+            continue
+        elif text.startswith("if ("):
+            depth, end = 0, None
+            for i in range(3, len(text)):
+                depth += {"(": 1, ")": -1}.get(text[i], 0)
+                if depth == 0:
+                    end = i
+                    break
+            if end is None:
+                raise ValueError(f"no Python for emitted GML: {line.strip()}")
+            cond, rest = _expr(text[4:end]), text[end + 1:].strip()
+            py = f"if {cond}:" if rest == "{" else f"if {cond}: {_statement(rest, line)}"
+        else:
+            py = _statement(text, line)
+        out.append(indent + re.sub(r"@(\d+)@", lambda m: strings[int(m[1])], py))
+    return out
+
+
+# ---- compilation ------------------------------------------------------------
+
+class Compiled:
+    def __init__(self, actions, goals, registry=None):
+        self.actions = actions
+        self.goals = goals
+        self.registry = registry
+        self.slots = {k: i for i, k in enumerate(registry or [])}
+        self.pre = [fold_checks(a.preconditions) for a in actions]
+        self.fx = [fold_writes(a.effects) for a in actions]
+        # goal heuristics count every predicate, duplicates included
+        self.h = [[lower(p) for p in g.desired_effects]
+                  if all(literal_ok(p["value"]) for p in g.desired_effects) else None for g in goals]
+        keys = {p["key"] for a in actions for p in a.preconditions + a.effects}
+        keys |= {p["key"] for g in goals for p in g.desired_effects}
+        self.flat = registry is not None and keys <= set(self.slots)
+
+    def functions(self, prefix, flat):
+        """[(kind, index, name, lines)] of every compiled GML function of one variant."""
+        backend = Backend(flat)
+        tag = "_flat" if flat else ""
+        out = []
+        for kind, items in (("pre", self.pre), ("fx", self.fx), ("h", self.h)):
+            for i, item in enumerate(items):
+                if item is None or (kind == "fx" and self.pre[i] is None) or (kind == "pre" and self.fx[i] is None):
+                    continue
+                name = f"{prefix}{tag}_{kind}_{i}"
+                out.append((kind, i, name, render_function(backend, kind, name, item, self.slots)))
+        return out
+
+    def render_gml(self, prefix, source):
+        q = lambda s: json.dumps(s, ensure_ascii=False)
+        lines = [f"// Generated by tools/predicate_compiler.py from {source}; do not edit.", ""]
+        variants = [False] + ([True] if self.flat else [])
+        names = {}
+        for flat in variants:
+            for kind, i, name, body in self.functions(prefix, flat):
+                names[(flat, kind, i)] = name
+                lines += body + [""]
+
+        def column(flat, kind, count):
+            return "[" + ", ".join(names.get((flat, kind, i), "undefined") for i in range(count)) + "]"
+        lines += [
+            "/// @desc Compiled predicate dispatch table (assign to planner.compiled_predicates).",
+            "/// @returns {Struct}",
+            f"function {prefix}() {{",
+            "    var goals = {};",
+        ]
+        lines += [f"    variable_struct_set(goals, {q(g.name)}, {names.get((False, 'h', j), 'undefined')});"
+                  for j, g in enumerate(self.goals)]
+        lines.append("    var goal_signatures = {};")
+        lines += [f"    variable_struct_set(goal_signatures, {q(g.name)}, {gml_signature(g.desired_effects)});"
+                  for g in self.goals]
+        if self.flat:
+            lines.append("    var flat_goals = {};")
+            lines += [f"    variable_struct_set(flat_goals, {q(g.name)}, {names.get((True, 'h', j), 'undefined')});"
+                      for j, g in enumerate(self.goals)]
+        n = len(self.actions)
+        lines += [
+            "    return {",
+            "        actions: [" + ", ".join(q(a.name) for a in self.actions) + "],",
+            "        signatures: [",
+            ",\n".join(f"            [{gml_signature(a.preconditions)}, {gml_signature(a.effects)}]"
+                       for a in self.actions),
+            "        ],",
+            f"        applicable: {column(False, 'pre', n)},",
+            f"        apply: {column(False, 'fx', n)},",
+            "        goals: goals,",
+            "        goal_signatures: goal_signatures,",
+        ]
+        if self.flat:
+            lines += [
+                "        registry: [" + ", ".join(q(k) for k in self.registry) + "],",
+                f"        flat_applicable: {column(True, 'pre', n)},",
+                f"        flat_apply: {column(True, 'fx', n)},",
+                "        flat_goals: flat_goals",
+            ]
+        else:
+            lines += [
+                "        registry: undefined,",
+                "        flat_applicable: undefined,",
+                "        flat_apply: undefined,",
+                "        flat_goals: undefined",
+            ]
+        lines += ["    };", "}"]
+        return "\n".join(lines) + "\n"
+
+    def python(self, flat):
+        """{(kind, index): function} of the emitted GML of one variant, run as Python."""
+        env = {"_eq": gml_eq, "_is_real": is_real, "_is_struct": lambda v: v is ABSENT or isinstance(v, dict),
+               "ABSENT": ABSENT}
+        out = {}
+        for kind, i, name, body in self.functions("c", flat):
+            exec("\n".join(gml_to_python(body)), env)
+            out[(kind, i)] = env[name]
+        return out
+
+
+# ---- differential harness ---------------------------------------------------
+
+def candidates(compiled):
+    """{key: values worth testing}: the key's constants, values beside them, undefined, bools."""
+    pool = {}
+    preds = [p for a in compiled.actions for p in a.preconditions + a.effects]
+    preds += [p for g in compiled.goals for p in g.desired_effects]
+    for p in preds:
+        values = pool.setdefault(p["key"], [ABSENT, None, True, False, 0, "x"])
+        v = p["value"]
+        if literal_ok(v):
+            values.append(v)
+            if is_real(v):
+                values += [v - 1, v + 1, v + 0.5, v - 0.5, v + 0.000001]
+    return pool
+
+
+def _snapshot(state):
+    return sorted((k, _ident(v)) for k, v in state.items())
+
+
+def differential(compiled, samples=2000, seed=0):
+    """Disagreements between compiled and interpreted evaluation on random states ([] if none)."""
+    rng = random.Random(seed)
+    pool = candidates(compiled)
+    variants = [(False, compiled.python(False))]
+    if compiled.flat:
+        variants.append((True, compiled.python(True)))
+    problems = []
+    for n in range(samples):
+        state = {}
+        for key, values in pool.items():
+            v = rng.choice(values)
+            if v is not ABSENT:
+                state[key] = v
+        if rng.random() < 0.5:
+            state["unrelated"] = rng.choice([1, "y", None])
+        for flat, fns in variants:
+            if flat:
+                acts, goals, values, _segments = intern(compiled.registry, compiled.actions, compiled.goals, state)
+                test, write, subject = evaluate_flat, apply_effect_flat, values
+            else:
+                acts, goals, test, write, subject = compiled.actions, compiled.goals, evaluate, apply_effect, state
+            where = "flat" if flat else "struct"
+            for i, action in enumerate(acts):
+                if ("pre", i) in fns:
+                    want = all(test(subject, p) for p in action.preconditions)
+                    if fns[("pre", i)](list(subject) if flat else dict(subject)) != want:
+                        problems.append(f"{where} sample {n}: {action.name} preconditions disagree on {state!r}")
+                if ("fx", i) in fns:
+                    a = list(subject) if flat else dict(subject)
+                    b = list(subject) if flat else dict(subject)
+                    for p in action.effects:
+                        write(a, p)
+                    fns[("fx", i)](b)
+                    same = ([_ident(x) for x in a] == [_ident(x) for x in b]) if flat else _snapshot(a) == _snapshot(b)
+                    if not same:
+                        problems.append(f"{where} sample {n}: {action.name} effects disagree on {state!r}")
+            for j, goal in enumerate(goals):
+                if ("h", j) in fns:
+                    want = sum(1 for p in goal.desired_effects if not test(subject, p))
+                    if fns[("h", j)](subject) != want:
+                        problems.append(f"{where} sample {n}: goal {goal.name} heuristic disagrees on {state!r}")
+        if len(problems) >= 20:
+            break
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    ap.add_argument("fixture")
+    ap.add_argument("--out", help="GML file to write (default: print)")
+    ap.add_argument("--name", help="dispatch function name and prefix (default: Animus_Compiled_<fixture stem>)")
+    ap.add_argument("--registry", help="key registry GML (tools/key_registry.py) to emit flat variants for")
+    ap.add_argument("--check", action="store_true", help="exit 1 if --out is missing or out of date; write nothing")
+    ap.add_argument("--verify", action="store_true", help="differential test against the interpreted predicates")
+    ap.add_argument("--samples", type=int, default=2000, help="random states for --verify (default 2000)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    try:
+        doc = load_fixture(args.fixture)
+    except (OSError, ValueError) as e:
+        print(f"[FAIL] {e}")
+        return 2
+    actions, goals = domain(doc)
+    names = [g.name for g in goals]
+    if len(set(names)) != len(names):
+        print("[FAIL] goal names must be unique (the table is keyed by name)")
+        return 2
+    registry = None
+    if args.registry:
+        registry = previous_keys(args.registry)
+        if not registry:
+            print(f"[FAIL] {args.registry}: no key registry entries found")
+            return 2
+    compiled = Compiled(actions, goals, registry)
+    prefix = args.name or "Animus_Compiled_" + pathlib.Path(args.fixture).stem
+    source = pathlib.Path(args.fixture).resolve()
+    source = source.relative_to(ROOT).as_posix() if source.is_relative_to(ROOT) else source.as_posix()
+    text = compiled.render_gml(prefix, source)
+
+    log = sys.stdout if args.out or args.verify else sys.stderr
+    skipped = [a.name for a, pre, fx in zip(actions, compiled.pre, compiled.fx) if pre is None or fx is None]
+    skipped += [g.name for g, h in zip(goals, compiled.h) if h is None]
+    print(f"[INFO] compiled {len(actions) - sum(1 for p, f in zip(compiled.pre, compiled.fx) if p is None or f is None)}"
+          f"/{len(actions)} action(s), {sum(h is not None for h in compiled.h)}/{len(goals)} goal(s)"
+          + (" with flat variants" if compiled.flat else ""), file=log)
+    for name in skipped:
+        print(f"[WARN] {name}: array/struct predicate values stay interpreted", file=log)
+    if registry is not None and not compiled.flat:
+        print(f"[WARN] {args.registry} lacks some of the domain's keys: no flat variants", file=log)
+
+    code = 0
+    if args.verify:
+        problems = differential(compiled, args.samples, args.seed)
+        for p in problems:
+            print(f"[FAIL] {p}", file=log)
+        if problems:
+            code = 1
+        else:
+            variants = "struct and flat" if compiled.flat else "struct"
+            print(f"[ok] {args.samples} random states: compiled {variants} evaluation matches the interpreter", file=log)
+
+    if args.check:
+        if not args.out:
+            print("[FAIL] --check needs --out")
+            return 2
+        try:
+            current = pathlib.Path(args.out).read_text(encoding="utf-8")
+        except OSError:
+            current = None
+        if current != text:
+            print(f"[FAIL] {args.out} is out of date; rerun without --check")
+            return 1
+        print(f"[ok] {args.out} is up to date")
+        return code
+    if args.out:
+        out = pathlib.Path(args.out)
+        out.write_text(text, encoding="utf-8")
+        print(f"[INFO] wrote {out}")
+        if out.suffix == ".gml" and not out.with_suffix(".yy").exists():
+            print(f"[WARN] {out.with_suffix('.yy')} does not exist: add the script to the project once in GameMaker")
+    elif not args.verify:
+        sys.stdout.write(text)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
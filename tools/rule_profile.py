@@ -0,0 +1,160 @@
+"""Per-rule timing, match counting and a runaway-regex guard for the Animus tools.
+
+A RuleTimer wraps each rule applied to one file:
+
+    timer = RuleTimer(budget=2.0, profile=True)
+    with timer.rule("ban_globals", len(code), out) as probe:
+        for m in probe.count(RX_GLOBAL.finditer(code)):
+            ...
+
+With a budget, the rule runs under a SIGALRM interval timer. The regex engine
+checks for signals while it backtracks, so a pathological pattern is interrupted.
+Its partial findings (anything appended to `out` inside the block) are rolled
+back and the rule is recorded as timed out. Where no alarm is available (worker
+threads, Windows), an overrun is only flagged after the fact.
+
+RuleProfile aggregates the per-file rows into top-N tables and JSON.
+"""
+import json
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUDGET_MS = 2000
+
+
+class RuleTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise RuleTimeout()
+
+
+def _can_alarm():
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def budget_seconds(cli_ms, cfg):
+    """CLI value wins over the config's `rule_time_budget_ms`; 0 disables the guard."""
+    ms = cli_ms if cli_ms is not None else cfg.get("rule_time_budget_ms", DEFAULT_BUDGET_MS)
+    return ms / 1000.0 if ms else None
+
+
+class Probe:
+    __slots__ = ("matches",)
+
+    def __init__(self):
+        self.matches = 0
+
+    def count(self, matches):
+        for m in matches:
+            self.matches += 1
+            yield m
+
+
+class RuleTimer:
+    """Times the rules run over one file. `rows` holds [rule, seconds, matches, bytes, timed_out]
+    for every rule when profiling, otherwise only for the rules that overran the budget."""
+
+    def __init__(self, budget=None, profile=False):
+        self.budget = budget
+        self.profile = profile
+        self.rows = []
+
+    @property
+    def timeouts(self):
+        return [row for row in self.rows if row[4]]
+
+    @contextmanager
+    def rule(self, name, nbytes, out=None):
+        mark = len(out) if out is not None else 0
+        probe = Probe()
+        armed = bool(self.budget) and _can_alarm()
+        if armed:
+            previous = signal.signal(signal.SIGALRM, _on_alarm)
+            signal.setitimer(signal.ITIMER_REAL, self.budget)
+        timed_out = False
+        t0 = time.perf_counter()
+        try:
+            yield probe
+        except RuleTimeout:
+            timed_out = True
+            if out is not None:
+                del out[mark:]
+        finally:
+            if armed:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+        elapsed = time.perf_counter() - t0
+        if self.budget and not armed and elapsed > self.budget:
+            # could not interrupt it; the findings stand but the overrun is still reported
+            timed_out = True
+        if self.profile or timed_out:
+            self.rows.append([name, elapsed, probe.matches, nbytes, timed_out])
+
+
+class RuleProfile:
+    """Aggregated rows from many files: (path, [rule, seconds, matches, bytes, timed_out])."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, path, rows):
+        for row in rows:
+            self.rows.append((str(path), *row))
+
+    def by_rule(self):
+        agg = {}
+        for path, rule, secs, matches, nbytes, timed_out in self.rows:
+            a = agg.setdefault(rule, {"rule": rule, "seconds": 0.0, "matches": 0, "bytes": 0, "files": 0, "timeouts": 0})
+            a["seconds"] += secs
+            a["matches"] += matches
+            a["bytes"] += nbytes
+            a["files"] += 1
+            a["timeouts"] += int(timed_out)
+        return sorted(agg.values(), key=lambda a: -a["seconds"])
+
+    def by_file(self):
+        agg = {}
+        for path, rule, secs, matches, nbytes, timed_out in self.rows:
+            a = agg.setdefault(path, {"path": path, "seconds": 0.0, "matches": 0, "bytes": 0, "slowest_rule": None, "_slowest": -1.0})
+            a["seconds"] += secs
+            a["matches"] += matches
+            a["bytes"] = max(a["bytes"], nbytes)
+            if secs > a["_slowest"]:
+                a["slowest_rule"], a["_slowest"] = rule, secs
+        out = sorted(agg.values(), key=lambda a: -a["seconds"])
+        for a in out:
+            del a["_slowest"]
+        return out
+
+    def to_json(self):
+        return {
+            "rules": self.by_rule(),
+            "files": self.by_file(),
+            "pairs": [{"path": p, "rule": r, "seconds": s, "matches": m, "bytes": b, "timed_out": t}
+                      for p, r, s, m, b, t in sorted(self.rows, key=lambda row: -row[2])],
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_json(), fh, indent=2)
+
+    def report(self, top=10, write=print):
+        rules = self.by_rule()
+        total = sum(a["seconds"] for a in rules)
+        write(f"[profile] {len(self.rows)} rule applications, {total * 1000:.1f} ms in rules")
+        write(f"[profile] top {min(top, len(rules))} rules by time:")
+        write(f"  {'ms':>9} {'%':>5} {'matches':>8} {'MB':>7} {'MB/s':>8} {'files':>6} {'t/o':>4}  rule")
+        for a in rules[:top]:
+            mb = a["bytes"] / 1e6
+            rate = mb / a["seconds"] if a["seconds"] > 0 else 0.0
+            pct = 100 * a["seconds"] / total if total else 0.0
+            write(f"  {a['seconds'] * 1000:9.2f} {pct:5.1f} {a['matches']:8d} {mb:7.2f} {rate:8.1f} {a['files']:6d} {a['timeouts']:4d}  {a['rule']}")
+        files = self.by_file()
+        write(f"[profile] top {min(top, len(files))} files by time:")
+        write(f"  {'ms':>9} {'matches':>8} {'KB':>8}  path (slowest rule)")
+        for a in files[:top]:
+            write(f"  {a['seconds'] * 1000:9.2f} {a['matches']:8d} {a['bytes'] / 1e3:8.1f}  {a['path']} ({a['slowest_rule']})")
@@ -1,26 +1,33 @@
 #!/usr/bin/env python3
-import json, pathlib, time
+import json, pathlib, sys, time
+from strategy_patch import patch
 ROOT = pathlib.Path('.')
 SUGG = ROOT / 'tools/.strategy_suggestions.json'
 
 def main():
     data = json.loads(SUGG.read_text(encoding='utf-8'))
-    for item in data.get('non_templated', []):
-        f = pathlib.Path(item['file'])
-        idx = item.get('anchor_index')
-        if not f.exists() or idx is None:
-            continue
-        text = f.read_text(encoding='utf-8')
-        stamp = time.strftime('%Y-%m-%d %H:%M:%S')
-        banner = f"/* ===== ANIMUS TEMPLATE (from suggestions {stamp}) =====\n"
-        code = item['suggested_template_code'].replace('\n', '\n// ')
-        tail = "\n===== END ANIMUS TEMPLATE ===== */\n"
-        patched = text[:idx] + banner + "// " + code + tail + text[idx:]
-        f.write_text(patched, encoding='utf-8')
-        print(f"[write] inserted suggestion block in {f}")
+    stamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    banner = f"/* ===== ANIMUS TEMPLATE (from suggestions {stamp}) =====\n"
+    tail = "\n===== END ANIMUS TEMPLATE ===== */\n"
+
+    def block(strategy):
+        return banner + "// " + strategy['suggested_template_code'].replace('\n', '\n// ') + tail
+    # grouped per file, verified against the report's digest, one atomic write per file
+    result = patch(data.get('non_templated', []), block, root=ROOT)
+    for f, blocks, moved in result.patched:
+        note = f" ({moved} re-anchored: file changed since the report)" if moved else ""
+        print(f"[write] inserted {blocks} suggestion block(s) in {f}{note}")
+    for f in result.applied:
+        print(f"[skip] {f}: suggestion blocks already present")
+    for f, reason in result.skipped:
+        print(f"[skip] {f}: {reason}")
+    if result.failed:
+        print(f"[fail] {result.failed[0]}: {result.failed[1]}; files already written were restored")
+        return 1
+    return 0
 
 if __name__ == '__main__':
     if SUGG.exists():
-        main()
+        sys.exit(main())
     else:
         print('[skip] suggestions file not found')
@@ -0,0 +1,157 @@
+"""Batch insertion of strategy suggestion blocks (enforcer `--patch`, strategy_apply_suggestions).
+
+The enforcer records in each suggestion a digest of the text it analysed and,
+per strategy, the anchor offset with CONTEXT characters of text on either side.
+patch() groups the blocks by file. It reads each file once, places every block
+and inserts from the last anchor back, so earlier offsets still hold. Each file
+is then written once, atomically.
+
+While the digest matches, the recorded offsets are used as they are (after a
+check of the context). A file edited since, or one whose bytes are not the text
+the enforcer saw (CRLF newlines, invalid UTF-8), has each anchor found again by
+its context. The occurrence nearest the recorded offset wins. A file with an
+anchor that cannot be found is left alone, and a block that is already in place
+is not inserted twice. Every file is planned before any is written. If a write
+fails, the files already written are put back.
+"""
+import os
+import pathlib
+
+from lint_cache import atomic_write_text, digest_bytes
+
+CONTEXT = 40
+
+
+def seen_text(data):
+    """File bytes as the enforcer reads them (Project.read_text: errors ignored, universal newlines)."""
+    return data.decode("utf-8", "ignore").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def text_digest(text):
+    """Digest of the text a suggestion was computed from: a str, or a mapping's bytes."""
+    return digest_bytes(text.encode("utf-8") if isinstance(text, str) else text)
+
+
+def anchor_context(text_str, pos):
+    """[before, after] of the anchor at `pos`; text_str(start, end) slices the analysed text."""
+    return [text_str(max(0, pos - CONTEXT), pos), text_str(pos, pos + CONTEXT)]
+
+
+class PatchResult:
+    def __init__(self):
+        self.patched = []     # (path, blocks inserted, of which re-anchored)
+        self.applied = []     # paths whose blocks were all in place already
+        self.skipped = []     # (path, reason): left untouched
+        self.failed = None    # (path, error) of a failed write; nothing stays written then
+
+    @property
+    def blocks(self):
+        return sum(n for _path, n, _moved in self.patched)
+
+
+def _already(raw, pos, tail):
+    """True if the text just before `pos` ends with a block (its last line `tail`)."""
+    at = raw.rfind(tail, 0, pos)
+    return at != -1 and not raw[at + len(tail):pos].strip()
+
+
+def _find(raw, key, hint):
+    """Offset of the occurrence of `key` nearest `hint`, or None."""
+    best = None
+    i = raw.find(key)
+    while i != -1:
+        if best is None or abs(i - hint) < abs(best - hint):
+            best = i
+        elif i > hint:
+            break    # occurrences only get farther from here
+        i = raw.find(key, i + 1)
+    return best
+
+
+def _plan(path, item, render):
+    """(new text, blocks, re-anchored) for one file, 'applied' if nothing is left to insert,
+    or a reason (str) to leave the file alone. Raises OSError if it cannot be read."""
+    spots = [s for s in (item.get("strategies") or [item]) if s.get("anchor_index") is not None]
+    if not spots:
+        return "no strategy anchor"
+    if "digest" not in item or any("context" not in s for s in spots):
+        return "suggestion has no digest/context (re-run the enforcer)"
+    data = path.read_bytes()
+    raw = data.decode("utf-8", "surrogateescape")
+    fresh = text_digest(seen_text(data)) == item["digest"]
+    nl = "\r\n" if "\r\n" in raw else "\n"
+
+    edits = {}
+    moved = 0
+    for spot in spots:
+        block = render(spot).replace("\n", nl)
+        tail = block.strip().rsplit(nl, 1)[-1]
+        before, after = (s.replace("\n", nl) for s in spot["context"])
+        pos = spot["anchor_index"]
+        if not (fresh and raw.startswith(before, pos - len(before)) and raw.startswith(after, pos)):
+            found = _find(raw, before + after, pos - len(before))
+            if found is None:
+                found = _find(raw, after, pos)
+                if found is not None and _already(raw, found, tail):
+                    continue
+                return f"strategy anchor at line {spot.get('line', '?')} not found (file changed since the report)"
+            pos = found + len(before)
+            moved += pos != spot["anchor_index"]
+        if _already(raw, pos, tail):
+            continue
+        if pos in edits:
+            return f"two strategies resolve to offset {pos}"
+        edits[pos] = block
+    if not edits:
+        return "applied"
+    parts, prev = [], len(raw)
+    for pos in sorted(edits, reverse=True):
+        parts.append(raw[pos:prev])
+        parts.append(edits[pos])
+        prev = pos
+    parts.append(raw[:prev])
+    return "".join(reversed(parts)), len(edits), moved
+
+
+def patch(items, render, root=pathlib.Path(".")):
+    """Insert render(strategy) before each strategy anchor of the suggestion records `items`
+    (entries of `non_templated`), one atomic write per file. Returns a PatchResult."""
+    result = PatchResult()
+    by_file = {}
+    for item in items:
+        by_file.setdefault(item["file"], []).append(item)
+
+    plans = []
+    for name, group in by_file.items():
+        path = root / name
+        # a report lists a file once; should it repeat, the last record is the current one
+        try:
+            plan = _plan(path, group[-1], render)
+        except OSError as e:
+            plan = f"cannot read: {e}"
+        if plan == "applied":
+            result.applied.append(path)
+        elif isinstance(plan, str):
+            result.skipped.append((path, plan))
+        else:
+            plans.append((path, plan))
+
+    written = []
+    try:
+        for path, (text, blocks, moved) in plans:
+            original = path.read_bytes()
+            mode = os.stat(path).st_mode
+            atomic_write_text(path, text, errors="surrogateescape")
+            written.append((path, original, mode))
+            os.chmod(path, mode & 0o7777)    # the temp file was created 0600
+            result.patched.append((path, blocks, moved))
+    except OSError as e:
+        result.failed = (path, e)
+        for done, original, mode in reversed(written):
+            try:
+                atomic_write_text(done, original.decode("utf-8", "surrogateescape"), errors="surrogateescape")
+                os.chmod(done, mode & 0o7777)
+            except OSError:
+                pass
+        result.patched = []
+    return result
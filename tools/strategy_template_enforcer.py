@@ -1,94 +1,154 @@
 #!/usr/bin/env python3
-# Animus Strategy Template Enforcer v2 — detects inline strategy structs (no build_strategy) and can scaffold above them.
-import re, sys, pathlib, yaml, argparse
-
-ROOT = pathlib.Path(".")
-CFG = yaml.safe_load((ROOT / "tools" / "animus_strategy_rules.yaml").read_text())
-
-def rx(p, flags=0): return re.compile(p, flags)
-
-GLOBS = CFG["strategy_file_globs"]
-NS_RE = rx(CFG["template_namespace_regex"])
-#!/usr/bin/env python3
-# Animus Strategy Template Enforcer v2.1 — emits machine-readable suggestions (JSON)
-import re, sys, pathlib, yaml, argparse, json, time
+# Animus Strategy Template Enforcer v2.2 — emits machine-readable suggestions (JSON)
+#
+# Strategies are found per struct: every `build_strategy = function(...) { ... }` body
+# (or, in a file without one, every `return { ... }` struct holding a strategy method),
+# with spans from one brace index over the lexer's code view. Each struct is
+# classified on its own text, so a file with several strategies gets one suggestion
+# each. A heuristic only runs on a struct holding the literals it needs (multi_scan's
+# prefilter); the rest cannot match and are skipped.
+import re, sys, pathlib, argparse, json, time
+from animus_project import Project
+from config_cache import load_config
+from git_scope import GitError, add_scope_args, scope_from_args, glob_match
+from gml_lexer import lex_braces, lex_mapped
+from lint_cache import digest_files
+from mapped_text import TextSource, as_source, large, open_mapped
+from multi_scan import Rule
+from rule_profile import RuleProfile, RuleTimer, budget_seconds
+from strategy_patch import anchor_context, patch, text_digest
 
 ROOT = pathlib.Path('.')
-CFG = yaml.safe_load((ROOT / 'tools' / 'animus_strategy_rules.yaml').read_text())
+CFG_PATH = ROOT / 'tools' / 'animus_strategy_rules.yaml'
 
 def rx(p, flags=0): return re.compile(p, flags)
 
-GLOBS = CFG['strategy_file_globs']
-NS_RE = rx(CFG['template_namespace_regex']) if CFG.get('template_namespace_regex') else None
-ALLOW_INLINE = CFG.get('allow_inline_return_scaffold', True)
-
-BSTART = CFG.get('patch_banner_start', '/* ===== ANIMUS TEMPLATE SUGGESTION (auto-inserted) =====')
-BEND   = CFG.get('patch_banner_end',   '===== END ANIMUS TEMPLATE SUGGESTION ===== */')
-
-INSTANT_RX = [rx(p, re.S) for p in CFG.get('instant_heuristics', [])]
-TIMED_RX   = [rx(p, re.S) for p in CFG.get('timed_heuristics', [])]
-MOVE_RX    = [rx(p, re.S) for p in CFG.get('move_heuristics', [])]
-
-SCAFFOLDS = CFG.get('template_scaffolds', {})
 REQ_METHODS = ['start','update','stop','invariant_check']
-
-SUG_ENABLE = CFG.get('enable_suggestions', False)
-SUG_PATH = CFG.get('suggestion_report_path', 'tools/.strategy_suggestions.json')
-
-def gather_files():
+RX_BUILD_STRATEGY = re.compile(r'\bbuild_strategy\s*=\s*function\s*\(')
+RX_RETURN_STRUCT = re.compile(r'\breturn\s*\{')
+# strategy files at least this big are scanned as mapped bytes (bounded memory, same results)
+MMAP_THRESHOLD_MB = 16
+
+class Settings:
+    """animus_strategy_rules.yaml, compiled. Built on first use by settings(), so importing
+    this module (e.g. from animus_lintd or animus.py) reads nothing."""
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.globs = cfg['strategy_file_globs']
+        self.ns_re = rx(cfg['template_namespace_regex']) if cfg.get('template_namespace_regex') else None
+        self.allow_inline = cfg.get('allow_inline_return_scaffold', True)
+
+        self.bstart = cfg.get('patch_banner_start', '/* ===== ANIMUS TEMPLATE SUGGESTION (auto-inserted) =====')
+        self.bend   = cfg.get('patch_banner_end',   '===== END ANIMUS TEMPLATE SUGGESTION ===== */')
+
+        self.instant_rx = [rx(p, re.S) for p in cfg.get('instant_heuristics', [])]
+        self.timed_rx   = [rx(p, re.S) for p in cfg.get('timed_heuristics', [])]
+        self.move_rx    = [rx(p, re.S) for p in cfg.get('move_heuristics', [])]
+        # (rule name, kind, compiled, prefilter) in config order
+        self.heuristics = [(f'{key}[{i}]', kind, r, Rule(key, r.pattern, re.S))
+                           for key, kind, rules in (('instant_heuristics', 'instant', self.instant_rx),
+                                                    ('timed_heuristics', 'timed', self.timed_rx),
+                                                    ('move_heuristics', 'move', self.move_rx))
+                           for i, r in enumerate(rules)]
+
+        self.scaffolds = cfg.get('template_scaffolds', {})
+
+        self.sug_enable = cfg.get('enable_suggestions', False)
+        self.sug_path = cfg.get('suggestion_report_path', 'tools/.strategy_suggestions.json')
+        self.delta_path = cfg.get('suggestion_delta_path', 'tools/.strategy_suggestions.delta.json')
+
+_SETTINGS = None
+
+def settings():
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = Settings(load_config(CFG_PATH)[0])
+    return _SETTINGS
+
+def gather_files(project):
+    scope = project.scope
+    if scope is not None:
+        # only touched files matching the strategy globs
+        cwd = ROOT.resolve()
+        out = []
+        for p in scope.changed_paths({'.gml'}):
+            rel = p.relative_to(cwd) if p.is_relative_to(cwd) else p
+            if any(glob_match(rel.as_posix(), g) for g in settings().globs):
+                out.append(rel)
+        return sorted(out)
     out = []
-    for g in GLOBS:
-        out.extend([p for p in ROOT.glob(g) if p.is_file() and p.suffix.lower()=='.gml'])
+    for g in settings().globs:
+        out.extend([ROOT / rel for rel in project.glob(g) if rel.lower().endswith('.gml')])
     return sorted(set(out))
 
-def classify_legacy(text):
+def classify_legacy(text, timer=None):
+    """`text` is a str or a mapped_text source (one strategy struct, or a whole file)."""
+    src = as_source(text)
+    timer = timer or RuleTimer()
     scores = {'instant':0, 'timed':0, 'move':0}
-    for r in INSTANT_RX:
-        try:
-            if r.search(text): scores['instant'] += 1
-        except re.error:
-            pass
-    for r in TIMED_RX:
-        try:
-            if r.search(text): scores['timed'] += 1
-        except re.error:
-            pass
-    for r in MOVE_RX:
-        try:
-            if r.search(text): scores['move'] += 1
-        except re.error:
-            pass
+    for name, kind, r, rule in settings().heuristics:
+        if not rule.possible(src.data):
+            # a literal every match needs is absent: the regex cannot match here
+            continue
+        with timer.rule(name, len(src)) as probe:
+            try:
+                if src.search(r):
+                    probe.matches += 1
+                    scores[kind] += 1
+            except re.error:
+                pass
     order = ['timed','move','instant']
     best = max(order, key=lambda k: (scores[k], 2 if k=='timed' else (1 if k=='move' else 0)))
     return best, scores
 
+def lex_strategy_file(text):
+    """Code view and brace index of a str (gml_lexer.lex_braces) or a mapped source
+    (gml_lexer.lex_mapped, braces paired on demand; takes ownership of the source)."""
+    return lex_braces(text) if isinstance(text, str) else lex_mapped(text)
+
+def _struct_end(lexed, brace):
+    # one past the closing brace (the end of the file if it never closes)
+    _lo, hi = lexed.block(brace)
+    return min(hi + 1, len(lexed.code))
+
+def find_build_strategy_spans(lexed):
+    """(brace, end) of every `build_strategy = function(...) { ... }` body."""
+    out = []
+    for m in lexed.finditer(lexed.pattern(RX_BUILD_STRATEGY)):
+        i = lexed.code.find(b'{' if lexed.binary else '{', m.end())
+        if i == -1:
+            break
+        if out and i < out[-1][1]:
+            continue    # nested in the previous body
+        out.append((i, _struct_end(lexed, i)))
+    return out
+
 def find_build_strategy_brace(text):
-    m = re.search(r'\bbuild_strategy\s*=\s*function\s*\(', text)
-    if not m: return None
-    i = text.find('{', m.end())
-    if i == -1: return None
-    return i
+    spans = find_build_strategy_spans(lex_braces(text) if isinstance(text, str) else text)
+    return spans[0][0] if spans else None
 
 def method_presence(block):
     missing = []
     for name in REQ_METHODS:
-        if re.search(rf'\b{name}\s*=\s*function\s*\(', block) is None:
+        # `name = function(` in a constructor body, `name: function(` in a struct literal
+        if re.search(rf'\b{name}\s*[=:]\s*function\s*\(', block) is None:
             missing.append(name)
     return missing
 
-def find_inline_strategy_return_spans(text):
+def find_inline_strategy_return_spans(lexed):
+    """(return, end) of every `return { ... }` struct holding at least one strategy method;
+    `lexed` as from lex_strategy_file() (a str is lexed here)."""
+    if isinstance(lexed, str):
+        lexed = lex_braces(lexed)
     out = []
-    for m in re.finditer(r'\breturn\s*\{', text):
-        i = m.end()-1
-        depth = 1
-        while i < len(text) and depth > 0:
-            if text[i] == '{': depth += 1
-            elif text[i] == '}': depth -= 1
-            i += 1
-        block = text[m.end():i-1]
-        miss = method_presence(block)
-        if len(miss) < 4:
-            out.append((m.start(), i))
+    for m in lexed.finditer(lexed.pattern(RX_RETURN_STRUCT)):
+        start, brace = m.start(), m.end() - 1
+        if out and start < out[-1][1]:
+            continue    # inside a strategy already found
+        end = _struct_end(lexed, brace)
+        if len(method_presence(lexed.code_str(brace, end))) < 4:
+            out.append((start, end))
     return out
 
 def make_template_code(kind):
@@ -120,12 +180,150 @@ def make_template_code(kind):
         '});'
     )
 
-def emit_suggestions(suggestions):
+def find_strategies(lexed, timer):
+    """[(anchor_type, anchor_index, start, end)] of the strategy structs in a lexed file."""
+    found = []   # stays empty if a timed-out rule is skipped
+    with timer.rule('build_strategy anchor', len(lexed.code)) as probe:
+        found = [('build_strategy', brace, brace, end) for brace, end in find_build_strategy_spans(lexed)]
+        probe.matches += len(found)
+    if not found:
+        with timer.rule('inline_return anchor', len(lexed.code)) as probe:
+            found = [('inline_return', start, start, end) for start, end in find_inline_strategy_return_spans(lexed)]
+            probe.matches += len(found)
+    return found
+
+def analyze_file(f, text, timer=None, digest=None):
+    """Suggestion record for a strategy file with non-templated strategies, or None if every
+    strategy in it uses the templates. `text` is the file's str, or a mapped_text.MappedSource
+    for a very large file.
+
+    The record holds one entry per non-templated strategy struct in `strategies`; its
+    top-level kind, scores and anchor are those of the first one. A file with no struct
+    found is classified as a whole, with no anchor. `digest` and each strategy's
+    `context` let strategy_patch place blocks in a file edited since; pass `digest` if the
+    caller has already computed text_digest of the file."""
+    lexed = lex_strategy_file(text)
     try:
-        p = ROOT / SUG_PATH
+        return _analyze(f, lexed, timer or RuleTimer(), digest)
+    finally:
+        if lexed.binary:
+            lexed.close()
+
+def _analyze(f, lexed, timer, digest=None):
+    ns_re = settings().ns_re
+
+    def templated(src, size):
+        if not ns_re:
+            return False
+        with timer.rule('template_namespace_regex', size) as probe:
+            hit = src.search(ns_re) is not None
+            probe.matches += hit
+        return hit
+
+    found = find_strategies(lexed, timer)
+    strategies = []
+    for anchor_type, anchor_idx, start, end in found:
+        region = TextSource(lexed.text_str(start, end))
+        if templated(region, end - start):
+            continue
+        kind, scores = classify_legacy(region, timer)
+        strategies.append({
+            'anchor_type': anchor_type,
+            'anchor_index': anchor_idx,
+            'line': lexed.line_of(anchor_idx),
+            'span': [start, end],
+            'context': anchor_context(lexed.text_str, anchor_idx),
+            'suggested_kind': kind,
+            'scores': scores,
+            'suggested_template_code': make_template_code(kind),
+        })
+    if strategies:
+        first = strategies[0]
+        kind, scores = first['suggested_kind'], first['scores']
+        anchor_type, anchor_idx = first['anchor_type'], first['anchor_index']
+    elif found:
+        return None
+    else:
+        whole = lexed.src if lexed.binary else TextSource(lexed.text)
+        if templated(whole, len(whole)):
+            return None
+        kind, scores = classify_legacy(whole, timer)
+        anchor_type = anchor_idx = None
+
+    return {
+        'file': str(f).replace('\\','/'),
+        'suggested_kind': kind,
+        'scores': scores,
+        'anchor_type': anchor_type,
+        'anchor_index': anchor_idx,
+        'suggested_template_code': make_template_code(kind),
+        'strategies': strategies,
+        # what strategy_patch checks the offsets against
+        'digest': digest or text_digest(lexed.src.data if lexed.binary else lexed.text),
+    }
+
+def report_fingerprint():
+    """Digest of everything a suggestion depends on besides the file: a report with another
+    fingerprint cannot stand in for analysing a file again."""
+    here = pathlib.Path(__file__).resolve().parent
+    sources = [here / 'strategy_template_enforcer.py', here / 'gml_lexer.py', here / 'multi_scan.py',
+               here / 'mapped_text.py', here / 'strategy_patch.py']
+    return digest_files([CFG_PATH] + sources)
+
+def load_report(path):
+    """A previous suggestions report, or None if there is none (or it is unreadable)."""
+    try:
+        doc = json.loads(pathlib.Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return doc if isinstance(doc, dict) else None
+
+def known_results(report):
+    """{file: (digest, suggestion or None)} a report vouches for: nothing if it was made by
+    other rules, and no file a heuristic timed out on."""
+    if not report or report.get('fingerprint') != report_fingerprint():
+        return {}
+    known = {f: (digest, None) for f, digest in (report.get('clean') or {}).items()}
+    for item in report.get('non_templated') or []:
+        if isinstance(item, dict) and 'digest' in item and not item.get('timed_out'):
+            known[item['file']] = (item['digest'], item)
+    return known
+
+def _signature(item):
+    # what a reader of the report sees change; scores and offsets moving alone are not news
+    return (item.get('suggested_kind'),
+            [(s.get('anchor_type'), s.get('suggested_kind')) for s in item.get('strategies') or []])
+
+def _compact(item):
+    out = {'file': item['file'], 'suggested_kind': item.get('suggested_kind')}
+    if item.get('strategies'):
+        out['strategies'] = [{'line': s.get('line'), 'suggested_kind': s.get('suggested_kind')}
+                             for s in item['strategies']]
+    return out
+
+def make_delta(baseline, suggestions, stats):
+    """New, changed and resolved entries of `suggestions` against the `baseline` report."""
+    before = {item['file']: item for item in (baseline or {}).get('non_templated') or []
+              if isinstance(item, dict) and 'file' in item}
+    now = {item['file']: item for item in suggestions}
+    return {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'baseline_generated_at': (baseline or {}).get('generated_at'),
+        **stats,
+        'new': [_compact(now[f]) for f in now if f not in before],
+        'changed': [_compact(now[f]) for f in now if f in before and _signature(now[f]) != _signature(before[f])],
+        'resolved': [_compact(before[f]) for f in before if f not in now],
+    }
+
+def emit_suggestions(suggestions, clean=None):
+    try:
+        p = ROOT / settings().sug_path
         payload = {
             'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-            'non_templated': suggestions
+            'fingerprint': report_fingerprint(),
+            'non_templated': suggestions,
+            # digests of the files found templated, so a --delta run can skip them while unchanged
+            'clean': clean or {},
         }
         p.parent.mkdir(parents=True, exist_ok=True)
         p.write_text(json.dumps(payload, indent=2), encoding='utf-8')
@@ -133,81 +331,156 @@ def emit_suggestions(suggestions):
     except Exception as e:
         print(f"[warn] failed to write suggestions: {e}")
 
-def main():
+def emit_delta(path, delta):
+    try:
+        p = ROOT / path
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(delta, indent=2), encoding='utf-8')
+        print(f"[emit] delta ({len(delta['new'])} new, {len(delta['changed'])} changed, "
+              f"{len(delta['resolved'])} resolved) -> {p}")
+    except Exception as e:
+        print(f"[warn] failed to write delta: {e}")
+
+def build_parser():
     ap = argparse.ArgumentParser()
     ap.add_argument('--patch', action='store_true')
     ap.add_argument('--strict', action='store_true')
     ap.add_argument('--verbose', action='store_true')
-    args = ap.parse_args()
-
-    files = gather_files()
+    ap.add_argument('--profile', nargs='?', type=int, const=10, default=None, metavar='N',
+                    help='Report time, matches and bytes per heuristic and per file (top N, default 10) on stderr.')
+    ap.add_argument('--profile-json', metavar='PATH', help='Write the full heuristic/file profile as JSON (implies --profile).')
+    ap.add_argument('--rule-budget-ms', type=int, default=None,
+                    help='Skip a heuristic that runs longer than this on one file (default: rule_time_budget_ms in the config; 0 = off).')
+    ap.add_argument('--mmap-threshold-mb', type=float, default=MMAP_THRESHOLD_MB,
+                    help=f'Scan files of at least this size as mapped bytes in bounded memory (default {MMAP_THRESHOLD_MB}; 0 = never).')
+    ap.add_argument('--delta', nargs='?', const='', default=None, metavar='PATH',
+                    help='Also write the new, changed and resolved suggestions against the previous report '
+                         '(default path: suggestion_delta_path in the config). Files unchanged since that report are not analysed again.')
+    ap.add_argument('--baseline', metavar='PATH',
+                    help='Report to compare with for --delta (default: the suggestions report as it was before this run).')
+    add_scope_args(ap)
+    return ap
+
+def run(project, args):
+    """Check the strategy files in `project`; prints the report and returns the exit code."""
+    scope = project.scope
+    if args.profile_json and args.profile is None:
+        args.profile = 10
+    st = settings()
+    budget = budget_seconds(args.rule_budget_ms, st.cfg)
+    prof = RuleProfile()
+
+    files = gather_files(project)
+    project.prefetch(files)
     if args.verbose: print(f"[scan] {len(files)} candidate files")
 
     suggestions = []
     issues = 0
     touched = 0
+    # the full report is only written for the whole tree, and it records a digest per file
+    record = st.sug_enable and scope is None
+    delta = getattr(args, 'delta', None) is not None and record
+    baseline = load_report(ROOT / (args.baseline or st.sug_path)) if delta else None
+    known = known_results(baseline) if delta else {}
+    clean = {}
+    reused = 0
+    # very large working-tree files are mapped instead of read (staged blobs are in memory anyway)
+    min_bytes = 0 if project.staged else int(getattr(args, 'mmap_threshold_mb', 0) * 1024 * 1024)
 
     for f in files:
-        text = f.read_text(encoding='utf-8', errors='ignore')
+        src = open_mapped(f) if large(f, min_bytes) else None
+        text = src if src is not None else project.read_text(f, errors='ignore')
 
-        if NS_RE and NS_RE.search(text):
+        key = str(f).replace('\\','/')
+        timer = RuleTimer(budget, args.profile is not None)
+        try:
+            digest = text_digest(src.data if src is not None else text) if record else None
+            prior = known.get(key)
+            if prior is not None and prior[0] == digest:
+                suggestion = prior[1]
+                reused += 1
+            else:
+                suggestion = analyze_file(f, text, timer, digest)
+        finally:
+            if src is not None:
+                src.close()
+        prof.add(f, timer.rows)
+        for rule, secs, _, _, _ in timer.timeouts:
+            print(f"[warn] {f}: `{rule}` exceeded the {budget * 1000:.0f} ms budget ({secs * 1000:.0f} ms); skipped", file=sys.stderr)
+        if timer.timeouts and suggestion is not None:
+            suggestion['timed_out'] = [rule for rule, *_ in timer.timeouts]
+        if suggestion is None:
+            if digest is not None and not timer.timeouts:
+                clean[key] = digest
             if args.verbose: print(f"[ok] {f} uses Animus_StrategyTemplates")
             continue
 
-        kind, scores = classify_legacy(text)
         if args.verbose:
-            print(f"{f}: non-templated strategy detected -> suggest `{kind}` template (scores={scores})")
-
-        # find anchors
-        anchor_idx = None
-        anchor_type = None
-        brace = find_build_strategy_brace(text)
-        if brace is not None:
-            anchor_idx = brace
-            anchor_type = 'build_strategy'
-        else:
-            spans = find_inline_strategy_return_spans(text)
-            if spans:
-                anchor_idx = spans[0][0]
-                anchor_type = 'inline_return'
-
-        suggested_code = make_template_code(kind)
-
-        suggestions.append({
-            'file': str(f).replace('\\','/'),
-            'suggested_kind': kind,
-            'scores': scores,
-            'anchor_type': anchor_type,
-            'anchor_index': anchor_idx,
-            'suggested_template_code': suggested_code
-        })
-
-        # patch behavior remains: insert comment scaffolds if requested
-        inserted = False
-        if args.patch and anchor_idx is not None:
-            if args.patch:
-                # Insert the commented scaffold (non-destructive)
-                banner = BSTART + '\n' + SCAFFOLDS.get(kind, '').rstrip() + '\n' + BEND + '\n'
-                new_text = text[:anchor_idx] + banner + text[anchor_idx:]
-                f.write_text(new_text, encoding='utf-8')
-                touched += 1
-                inserted = True
-                if args.verbose: print(f"[write] injected scaffold in {f}")
-
-        if args.strict or not args.patch:
-            if not inserted:
-                issues += 1
-
-    # emit JSON suggestions if enabled
-    if SUG_ENABLE:
-        emit_suggestions(suggestions)
+            for strategy in suggestion['strategies']:
+                print(f"{f}:{strategy['line']}: non-templated strategy detected -> suggest "
+                      f"`{strategy['suggested_kind']}` template (scores={strategy['scores']})")
+            if not suggestion['strategies']:
+                print(f"{f}: non-templated strategy detected -> suggest `{suggestion['suggested_kind']}` template "
+                      f"(scores={suggestion['scores']})")
+
+        suggestions.append(suggestion)
+        if not args.patch:
+            issues += 1
+
+    if args.patch:
+        # insert one commented scaffold per strategy (non-destructive); one write per file
+        def scaffold(strategy):
+            return st.bstart + '\n' + st.scaffolds.get(strategy['suggested_kind'], '').rstrip() + '\n' + st.bend + '\n'
+        result = patch(suggestions, scaffold, root=ROOT)
+        for path, blocks, _moved in result.patched:
+            if args.verbose: print(f"[write] injected {blocks} scaffold(s) in {path}")
+        for path, reason in result.skipped:
+            if reason != 'no strategy anchor':
+                print(f"[warn] {path}: not patched: {reason}")
+        if result.failed:
+            print(f"[warn] patch aborted, no file changed: {result.failed[0]}: {result.failed[1]}")
+        touched = len(result.patched)
+        if args.strict:
+            issues += len(suggestions) - len(result.patched) - len(result.applied)
+
+    # emit JSON suggestions if enabled; a scoped run must not replace the full-tree report
+    if record:
+        emit_suggestions(suggestions, clean)
+        if delta:
+            if args.verbose:
+                why = '' if known or not baseline else ' (baseline made by other rules or without digests)'
+                print(f"[delta] {reused} of {len(files)} files reused from the baseline report{why}")
+            stats = {'files': len(files), 'reused': reused}
+            emit_delta(args.delta or st.delta_path, make_delta(baseline, suggestions, stats))
+    elif st.sug_enable and (args.verbose or getattr(args, 'delta', None) is not None):
+        print(f"[skip] suggestions report{' and delta' if getattr(args, 'delta', None) is not None else ''} "
+              f"not written for a scoped run ({scope.describe()})")
+
+    if args.profile is not None:
+        prof.report(args.profile, write=lambda line: print(line, file=sys.stderr))
+        if args.profile_json:
+            prof.write_json(args.profile_json)
+            print(f"[profile] wrote {args.profile_json}", file=sys.stderr)
 
     if args.patch and args.verbose:
         print(f"[result] Scaffolds inserted in {touched} file(s)")
 
     if issues:
-        sys.exit(1)
+        return 1
     print('[result] All strategies templated (or scaffolds present).')
+    return 0
+
+def main():
+    ap = build_parser()
+    args = ap.parse_args()
+    if args.patch and args.staged:
+        ap.error('--patch edits the working tree and cannot be combined with --staged')
+    try:
+        scope = scope_from_args(args, ROOT)
+    except GitError as e:
+        print(f"[fail] {e}")
+        sys.exit(2)
+    sys.exit(run(Project(ROOT, scope), args))
 
 if __name__ == '__main__':
     main()
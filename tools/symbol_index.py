@@ -0,0 +1,230 @@
+"""Persistent identifier index of the project's .gml files (`.animus_cache/symbols/`).
+
+Maps each identifier to the files and offsets where it occurs in code (the
+lexer's code view: comments and string literals never count, and neither
+does a member access such as `self.name` or `global.name`). yy_fixit uses it
+to rewrite the call sites of a renamed script and for `find-references`.
+
+The index is sharded so a lookup reads what it needs, not the whole project:
+  manifest.json  { "fingerprint", "next_gen", "files": { path: [mtime_ns, size, gen] },
+                   "dirs": { dir: [mtime_ns, file names, subdir names] } }
+  NN.json        { identifier: { gen: [offset, ...] } }   (crc32(identifier) % BUCKETS)
+  next_gen       generations handed out, written before any bucket so an
+                 interrupted save can never have its numbers reused
+A generation number names one version of one file. A file is re-lexed only
+when its mtime or size changes; its new postings go to the buckets of its own
+identifiers under a fresh generation, so postings left behind by an older
+version (in buckets it no longer uses) name a generation the manifest no longer
+has: they are ignored when read and dropped the next time their bucket is
+written. GML keywords are not indexed. "dirs" lets the Project walk skip unchanged
+directories (Project.use_listings). As in yy_index, files written in the last
+couple of seconds are lexed on every run but never recorded.
+
+Offsets are str offsets into the file decoded as UTF-8 with surrogateescape and
+newlines untouched, so a rewrite can splice the text and write back the same
+bytes everywhere else. Staged runs (no mtimes) bypass the index.
+"""
+import json
+import pathlib
+import re
+import time
+import zlib
+
+from animus_project import RACY_NS
+from gml_lexer import code_view
+from lint_cache import atomic_write_text, digest_files
+
+INDEX_VERSION = 2
+BUCKETS = 256
+DEFAULT_DIR = pathlib.Path(".animus_cache") / "symbols"
+
+_KEYWORDS = frozenset("""
+    var globalvar function constructor static new delete return exit if then else begin end
+    for while do until repeat switch case default break continue with try catch finally throw
+    enum and or xor not div mod true false undefined self other global all noone
+""".split())
+# an identifier in the code view that is not a member access, nor part of a number (1e5, 0xFF, $FF)
+_IDENT = re.compile(r'(?<![\w$.])[A-Za-z_]\w*')
+
+
+def decode(data):
+    """File bytes as the text the offsets refer to (round-trips through encode())."""
+    return data.decode("utf-8", "surrogateescape")
+
+
+def encode(text):
+    return text.encode("utf-8", "surrogateescape")
+
+
+def scan(text):
+    """{identifier: [offset, ...]} of every identifier in the code of `text`."""
+    found = {}
+    get = found.get
+    for m in _IDENT.finditer(code_view(text)):
+        name = m.group()
+        offsets = get(name)
+        if offsets is not None:
+            offsets.append(m.start())
+        elif name not in _KEYWORDS:
+            found[name] = [m.start()]
+    return found
+
+
+def bucket_of(name):
+    return zlib.crc32(name.encode("utf-8")) % BUCKETS
+
+
+class SymbolIndex:
+    def __init__(self, project, path=DEFAULT_DIR, persistent=True):
+        self.project = project
+        self.dir = pathlib.Path(path)
+        self.persistent = persistent and not project.staged
+        here = pathlib.Path(__file__).resolve().parent
+        self.fingerprint = digest_files([here / "symbol_index.py", here / "gml_lexer.py"]) + f":{INDEX_VERSION}"
+        self.files = {}          # manifest: path -> [mtime_ns, size, gen]
+        self.dirs = {}
+        self.next_gen = 1
+        self.fresh = {}          # path -> {identifier: offsets} for files lexed this run
+        self._buckets = {}       # bucket number -> bucket document as read
+        self._pending = {}       # bucket number -> {identifier: {gen: offsets}} to add on save
+        self._rebuilt = False
+        self.dirty = False
+        self.lexed = 0
+
+    # ---- loading ----
+    def load(self):
+        if self.persistent:
+            try:
+                doc = json.loads((self.dir / "manifest.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                doc = None
+            if (isinstance(doc, dict) and doc.get("fingerprint") == self.fingerprint
+                    and all((self.dir / f"{b:02x}.json").exists() for b in range(BUCKETS))):
+                self.files = doc.get("files", {}) or {}
+                self.dirs = doc.get("dirs", {}) or {}
+                self.next_gen = doc.get("next_gen", 1)
+                try:
+                    self.next_gen = max(self.next_gen, int((self.dir / "next_gen").read_text()))
+                except (OSError, ValueError):
+                    pass
+            else:
+                self._reset()
+            self.project.use_listings(self.dirs)
+        self.refresh()
+        return self
+
+    def _reset(self):
+        """Forget everything recorded: every file is indexed again and every bucket rewritten."""
+        self.files = {}
+        self.fresh = {}
+        self._buckets = {b: {} for b in range(BUCKETS)}
+        self._pending = {}
+        self._rebuilt = True
+        self.dirty = True
+
+    def refresh(self):
+        """Re-lex every .gml whose mtime or size no longer matches the manifest."""
+        current = set(self.project.files(".gml"))
+        now = time.time_ns()
+        for path in sorted(current):
+            st = self.project.stat(path) if self.persistent else None
+            entry = self.files.get(path)
+            if st is not None and entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                continue
+            self.fresh[path] = scan(decode(self.project.read_bytes(path)))
+            self.lexed += 1
+            if st is not None and now - st.st_mtime_ns > RACY_NS:
+                self._record(path, st)
+            elif path in self.files:
+                del self.files[path]
+                self.dirty = True
+        for path in [p for p in self.files if p not in current]:
+            del self.files[path]
+            self.dirty = True
+
+    def _record(self, path, st):
+        gen = self.next_gen
+        self.next_gen += 1
+        self.files[path] = [st.st_mtime_ns, st.st_size, gen]
+        gen = str(gen)    # a JSON object key
+        for name, offsets in self.fresh[path].items():
+            self._pending.setdefault(bucket_of(name), {}).setdefault(name, {})[gen] = offsets
+        self.dirty = True
+
+    def _bucket(self, number):
+        bucket = self._buckets.get(number)
+        if bucket is None:
+            try:
+                bucket = json.loads((self.dir / f"{number:02x}.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                # damaged: its postings are unknown, so nothing recorded can be trusted
+                self._reset()
+                self.refresh()
+                return self._buckets[number]
+            self._buckets[number] = bucket
+        return bucket
+
+    # ---- queries ----
+    def references(self, name):
+        """{path: [offset, ...]} of `name` in code, paths sorted."""
+        out = {}
+        if self.persistent:
+            postings = self._bucket(bucket_of(name)).get(name)
+            if postings:
+                paths = self._paths()
+                for gen, offsets in postings.items():
+                    path = paths.get(gen)
+                    if path is not None:
+                        out[path] = offsets
+        for path, found in self.fresh.items():
+            if name in found:
+                out[path] = found[name]
+            else:
+                out.pop(path, None)
+        return dict(sorted(out.items()))
+
+    def _paths(self):
+        """gen (as a key) -> path of every file version the manifest knows."""
+        return {str(entry[2]): path for path, entry in self.files.items()}
+
+    # ---- saving ----
+    def save(self):
+        if not self.persistent:
+            return
+        listings = self.project.listings
+        if listings is not None and listings != self.dirs:
+            self.dirs = listings
+            self.dirty = True
+        if not self.dirty:
+            return
+        try:
+            for number in sorted(self._pending):
+                self._bucket(number)    # a damaged one rebuilds everything before anything is written
+            numbers = range(BUCKETS) if self._rebuilt else sorted(self._pending)
+            if self._pending:
+                atomic_write_text(self.dir / "next_gen", str(self.next_gen))
+            paths = self._paths()
+            for number in numbers:
+                bucket = self._bucket(number)
+                for name, postings in self._pending.get(number, {}).items():
+                    bucket.setdefault(name, {}).update(postings)
+                # drop postings of files that changed or went away since they were written
+                for name in list(bucket):
+                    live = {gen: offsets for gen, offsets in bucket[name].items() if gen in paths}
+                    if live:
+                        bucket[name] = live
+                    else:
+                        del bucket[name]
+                atomic_write_text(self.dir / f"{number:02x}.json", json.dumps(bucket, separators=(",", ":")))
+            # the manifest last: until it is replaced, the new postings carry unknown generations
+            doc = {"fingerprint": self.fingerprint, "next_gen": self.next_gen, "files": self.files, "dirs": self.dirs}
+            atomic_write_text(self.dir / "manifest.json", json.dumps(doc, separators=(",", ":")))
+            self._pending = {}
+            self._rebuilt = False
+            self.dirty = False
+        except OSError:
+            # a read-only checkout must not fail the run
+            pass
+
+    def stats(self):
+        return {"lexed": self.lexed, "buckets_read": len(self._buckets) if not self._rebuilt else BUCKETS}
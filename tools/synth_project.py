@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+synth_project.py — generate a synthetic Animus/GameMaker project for benchmarks
+
+Builds a fake project at a chosen scale with the real layout:
+`GOAP/scripts/<Name>/<Name>.gml` + `<Name>.yy`, a `GOAP/GOAP.yyp` declaring every
+script, and a `GOAP/GOAP.resource_order` (JSON block followed by the path listing).
+The scripts are a deterministic mix, driven by --seed:
+  - action strategies: templated (`Animus_StrategyTemplates.*`) and inline
+    instant/timed/move `build_strategy` structs (what the enforcer classifies);
+  - `Animus_*` domain modules and `Game_*` helpers (constructors, loops, docs);
+  - a small share of lint findings (bare `return;`, trailing whitespace, `global.`,
+    wall-clock calls, planner calls without the plan-shape assertion).
+The tools/ directory (scripts + YAML configs) is copied in, so every tool runs
+against the synthetic tree exactly as it does here: `cd OUT && python tools/X.py`.
+
+Usage:
+  python tools/synth_project.py --out .animus_cache/bench/p10000 --files 10000 [--seed 1] [--force]
+
+`--files` counts script files (.gml + .yy), so N files means N/2 scripts.
+An existing tree generated with the same parameters is reused unless --force.
+"""
+import argparse, json, pathlib, random, shutil, sys
+
+TOOLS = pathlib.Path(__file__).resolve().parent
+GENERATOR_VERSION = 1
+STAMP = ".synth.json"
+
+VERBS = ["Gather", "Chop", "Mine", "Patrol", "Flee", "Eat", "Sleep", "Build", "Haul", "Guard", "Scout", "Craft"]
+NOUNS = ["Inventory", "Squad", "Stockpile", "Route", "Threat", "Needs", "Workshop", "Territory", "Schedule", "Supply"]
+KINDS = [("templated", 20), ("instant", 10), ("timed", 10), ("move", 10), ("module", 20), ("helper", 30)]
+
+
+def yy_doc(name):
+    return json.dumps({
+        "$GMScript": "v1",
+        "%Name": name,
+        "isCompatibility": False,
+        "isDnD": False,
+        "name": name,
+        "parent": {"name": "GOAP", "path": "GOAP.yyp"},
+        "resourceType": "GMScript",
+        "resourceVersion": "2.0",
+    }, indent=2) + "\n"
+
+
+def helper_function(rng, name, k):
+    fn = f"{name}_step_{k}"
+    lines = [
+        f"/// @desc Helper {k} for {name}.",
+        "/// @param {Struct} context",
+        "/// @returns {Real}",
+        f"function {fn}(context) {{",
+        "    var _total = 0;",
+        f"    for (var _i = 0; _i < {rng.randint(2, 64)}; _i++) {{",
+        f"        _total += context.weights[_i mod {rng.randint(2, 9)}] * {rng.randint(1, 100)} / 100;",
+        "    }",
+    ]
+    roll = rng.random()
+    if roll < 0.03:
+        lines += ["    if (_total <= 0) {", "        return;", "    }"]
+    elif roll < 0.05:
+        lines += ["    var _debug = global.animus_debug_level;   "]
+    elif roll < 0.06:
+        lines += ["    context.stamp = current_time;"]
+    elif roll < 0.07:
+        lines += ["    var _plan = context.planner.plan(context.agent, context.goals, context.memory, undefined);"]
+    lines += [
+        "    var _record = {",
+        f"        key: \"{name.lower()}_{k}\",",
+        f"        cost: {rng.randint(1, 20)},",
+        "        tags: [\"synthetic\", \"bench\"],",
+        "    };",
+        "    return _total + _record.cost;",
+        "}",
+        "",
+    ]
+    return lines
+
+
+def strategy_body(kind, name):
+    if kind == "templated":
+        return [
+            "    build_strategy = function(agent) {",
+            "        return Animus_StrategyTemplates.timed({",
+            f"            expected_duration: {len(name) % 5 + 1}.5,",
+            "            on_start: function(ctx) { ctx.memory.write(\"busy\", true); },",
+            "            on_stop: function(ctx, reason) { ctx.memory.write(\"busy\", false); }",
+            "        });",
+            "    };",
+        ]
+    head = ["    build_strategy = function(agent) {", "        return {"]
+    tail = ["        };", "    };"]
+    if kind == "instant":
+        body = [
+            "            start: function(context) {},",
+            "            update: function(context, dt) { return \"success\"; },",
+            "            stop: function(context, reason) {},",
+            "            invariant_check: function(context) { return true; }",
+        ]
+    elif kind == "timed":
+        body = [
+            "            elapsed: 0,",
+            "            start: function(context) { elapsed = 0; },",
+            "            update: function(context, dt) { elapsed += dt; if (elapsed >= 2) { return \"success\"; } return \"running\"; },",
+            "            stop: function(context, reason) {},",
+            "            invariant_check: function(context) { return true; },",
+            "            get_expected_duration: function(context) { return 2; }",
+        ]
+    else:
+        body = [
+            "            start: function(context) { context.nav.request(context.target); },",
+            "            update: function(context, dt) { return context.nav.arrived() ? \"success\" : \"running\"; },",
+            "            stop: function(context, reason) { context.nav.cancel(); },",
+            "            invariant_check: function(context) { return context.nav.path_valid(); },",
+            "            get_reservation_keys: function(context) { return [\"path:\" + string(context.target)]; }",
+        ]
+    return head + body + tail
+
+
+def script_source(rng, kind, name):
+    lines = [f"/// @desc Synthetic {kind} script {name}.", ""]
+    if kind in ("templated", "instant", "timed", "move"):
+        lines += [
+            "/// @param {Struct} params",
+            f"/// @returns {{{name}}}",
+            f"function {name}(params) : Animus_Action(params) constructor {{",
+            f"    name = \"{name}\";",
+            f"    cost = {rng.randint(1, 10)};",
+        ] + strategy_body(kind, name) + ["}", ""]
+    elif kind == "module":
+        lines += [
+            f"function {name}() constructor {{",
+            "    entries = ds_map_create();",
+            "    get = function(key) { return entries[? key]; };",
+            "    set = function(key, value) { entries[? key] = value; };",
+            "}",
+            "",
+        ]
+    for k in range(rng.randint(2, 10)):
+        lines += helper_function(rng, name, k)
+    return "\n".join(lines)
+
+
+def baked_table(path, nbytes, seed=1):
+    """Write a codegen-style table script of about `nbytes` (one row per line, a few findings
+    sprinkled in) without holding it in memory; returns its name."""
+    rng = random.Random(seed)
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    name = path.stem
+    with open(path, "w", encoding="ascii", newline="\n") as fh:
+        fh.write(f"/// @desc Baked lookup table (generated)\nfunction {name}_data() {{\n    return [\n")
+        size, i = 0, 0
+        while size < nbytes:
+            row = f"        [{i}, {rng.randint(0, 9999)}, {rng.randint(0, 9999)}, \"cell_{i}\", {rng.random():.6f}], // row {i}"
+            if i % 50000 == 7:
+                row = "        return;"
+            elif i % 70001 == 3:
+                row += "  "
+            fh.write(row + "\n")
+            size += len(row) + 1
+            i += 1
+        fh.write("    ];\n}\n")
+    (path.parent / f"{name}.yy").write_text(yy_doc(name), encoding="utf-8")
+    return name
+
+
+def script_names(files, seed):
+    """[(name, kind)] for files // 2 scripts, deterministic in (files, seed)."""
+    rng = random.Random(seed)
+    kinds = [k for k, _w in KINDS]
+    weights = [w for _k, w in KINDS]
+    out = []
+    for i in range(max(1, files // 2)):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "helper":
+            name = f"Game_{rng.choice(NOUNS)}_{i:06d}"
+        elif kind == "module":
+            name = f"Animus_{rng.choice(NOUNS)}_{i:06d}"
+        else:
+            name = f"Animus_Action{rng.choice(VERBS)}_{i:06d}"
+        out.append((name, kind))
+    return out
+
+
+def copy_tools(out):
+    dst = out / "tools"
+    dst.mkdir(parents=True, exist_ok=True)
+    for src in list(TOOLS.glob("*.py")) + list(TOOLS.glob("*.yaml")):
+        shutil.copy2(src, dst / src.name)
+
+
+def generate(out, files, seed=1, force=False):
+    """Create (or reuse) the project at `out`; returns its stamp: scale, totals and a probe script."""
+    out = pathlib.Path(out)
+    params = {"version": GENERATOR_VERSION, "files": files, "seed": seed}
+    stamp_path = out / STAMP
+    if not force and stamp_path.exists():
+        try:
+            stamp = json.loads(stamp_path.read_text(encoding="utf-8"))
+            if stamp.get("params") == params:
+                copy_tools(out)    # always bench the current tools
+                return stamp
+        except ValueError:
+            pass
+    if out.exists() and any(out.iterdir()):
+        if not stamp_path.exists():
+            raise FileExistsError(f"{out} exists and was not made by synth_project; refusing to replace it")
+        shutil.rmtree(out)
+
+    rng = random.Random(seed + 1)
+    scripts_dir = out / "GOAP" / "scripts"
+    names = script_names(files, seed)
+    total_bytes = 0
+    for name, kind in names:
+        folder = scripts_dir / name
+        folder.mkdir(parents=True)
+        gml = script_source(rng, kind, name)
+        yy = yy_doc(name)
+        (folder / f"{name}.gml").write_text(gml, encoding="utf-8")
+        (folder / f"{name}.yy").write_text(yy, encoding="utf-8")
+        total_bytes += len(gml.encode("utf-8")) + len(yy)
+
+    rels = [f"scripts/{name}/{name}.yy" for name, _kind in names]
+    resources = ",\n".join(f"    {{\"id\": {{\"name\": \"{name}\", \"path\": \"{rel}\"}}}}" for (name, _k), rel in zip(names, rels))
+    yyp = ("{\n  \"$GMProject\": \"v1\",\n  \"%Name\": \"GOAP\",\n  \"name\": \"GOAP\",\n"
+           f"  \"resources\": [\n{resources}\n  ],\n"
+           "  \"resourceType\": \"GMProject\",\n  \"resourceVersion\": \"2.0\"\n}\n")
+    (out / "GOAP" / "GOAP.yyp").write_text(yyp, encoding="utf-8")
+    order_json = ",\n".join(f"    {{\"name\": \"{name}\", \"order\": {i + 1}, \"path\": \"{rel}\"}}"
+                            for i, ((name, _k), rel) in enumerate(zip(names, rels)))
+    order = ("{\n  \"FolderOrderSettings\": [],\n  \"ResourceOrderSettings\": [\n" + order_json + "\n  ]\n}\n\n"
+             + "\n".join(sorted(rels)) + "\n")
+    (out / "GOAP" / "GOAP.resource_order").write_text(order, encoding="utf-8")
+    total_bytes += len(yyp) + len(order)
+
+    copy_tools(out)
+    counts = {}
+    for _name, kind in names:
+        counts[kind] = counts.get(kind, 0) + 1
+    probe = names[len(names) // 2][0]
+    stamp = {"params": params, "scripts": len(names), "files": 2 * len(names), "bytes": total_bytes,
+             "kinds": counts, "probe_script": f"GOAP/scripts/{probe}/{probe}.gml"}
+    stamp_path.write_text(json.dumps(stamp, indent=2) + "\n", encoding="utf-8")
+    return stamp
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a synthetic Animus project for benchmarks.")
+    ap.add_argument("--out", required=True, help="directory to create (replaced if it holds another scale)")
+    ap.add_argument("--files", type=int, default=1000, help="script files to create (.gml + .yy)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--force", action="store_true", help="regenerate even if the stamp matches")
+    args = ap.parse_args()
+    try:
+        stamp = generate(args.out, args.files, args.seed, args.force)
+    except FileExistsError as e:
+        print(f"[synth] {e}", file=sys.stderr)
+        return 2
+    print(f"[synth] {args.out}: {stamp['scripts']} scripts, {stamp['files']} files, "
+          f"{stamp['bytes'] / 1e6:.1f} MB ({', '.join(f'{k} {v}' for k, v in sorted(stamp['kinds'].items()))})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""Field extraction from GameMaker .yy/.yyp files without parsing the whole document.
+
+The tools read a handful of top-level fields (`name`, `resourceType`,
+`parent`, and the .yyp `resources[].id` pairs), while room and sprite .yy
+files can be megabytes of layers and frames. extract() walks the top-level
+object, parses the members it was asked for and skips everything else, so no
+object tree is built for the skipped parts. GameMaker writes each top-level
+member on its own line at two spaces of indentation, and a raw newline cannot
+occur inside a JSON string, so the next such line is a candidate end for a
+skipped value. The candidate is checked with C-speed string and bracket
+passes; a file laid out any other way is skipped bracket by bracket instead.
+
+Documents up to FULL_PARSE_MAX (and the .yyp, whose resource list is needed
+whole anyway) are first tried with json.loads: C-speed and exact for strict
+JSON. The extractor then only runs for dialect or errors.
+
+GameMaker's dialect is tolerated: trailing commas before `}` / `]` are
+accepted and reported back in `trailing_commas` (the repo keeps .yy/.yyp
+strict JSON, so yy_integrity turns them into issues). Anything else that is
+not JSON raises YyError with a line and column. In skipped containers only
+strings, bracket nesting and trailing commas are checked.
+
+.yyp resource entries in GameMaker's own shape,
+`{"id": {"name": "...", "path": "..."}}`, are matched by one regex each;
+any other entry goes through the general parser.
+"""
+import json
+import re
+
+from line_index import LineIndex
+
+_WS = re.compile(r'[ \t\n\r]*')
+_S = r'"([^"\\\x00-\x1f]*(?:\\.[^"\\\x00-\x1f]*)*)"'    # a strict JSON string, body in group 1
+_STRING = re.compile(_S, re.S)
+_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?')
+_LITERALS = {"true": True, "false": False, "null": None,
+             "NaN": float("nan"), "Infinity": float("inf"), "-Infinity": float("-inf")}
+_LITERAL = re.compile(r'true|false|null|NaN|-?Infinity')
+# what matters while skipping: a whole string, a bracket, or a quote that never closes
+_STRUCT = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]|"', re.S)
+_RESOURCE = re.compile(r'\{\s*"id"\s*:\s*\{\s*"name"\s*:\s*' + _S + r'\s*,\s*"path"\s*:\s*' + _S + r'\s*\}\s*\}', re.S)
+_CLOSE = {"{": "}", "[": "]"}
+# candidate end of a top-level value: the next two-space member line, or the closing brace
+_NEXT_MEMBER = re.compile(r'\n(?:  "|\}[ \t\r\n]*\Z)')
+_NOT_STRUCTURE = bytes(b for b in range(256) if b not in b'"{}[]')
+
+FULL_PARSE_MAX = 1024 * 1024
+
+
+def _position(lines, pos):
+    line = lines.line_of(pos)
+    start = lines.newlines[line - 2] if line > 1 else -1
+    return line, pos - start
+
+
+class YyError(ValueError):
+    def __init__(self, msg, text, pos):
+        self.lineno, self.colno = _position(LineIndex(text), pos)
+        super().__init__(f"{msg}: line {self.lineno} column {self.colno} (char {pos})")
+
+
+class Extracted:
+    """Wanted top-level fields (absent keys are missing) plus dialect deviations."""
+
+    def __init__(self, text):
+        self.text = text
+        self.fields = {}
+        self.resources = None          # .yyp: [(name, path) or the raw entry value, ...]
+        self.trailing_commas = []      # offsets of commas before a closing bracket
+        self._lines = None
+
+    def position(self, pos):
+        """(line, column) of offset `pos`, 1-based."""
+        if self._lines is None:
+            self._lines = LineIndex(self.text)
+        return _position(self._lines, pos)
+
+
+def _unescape(raw, text, pos):
+    if "\\" not in raw:
+        return raw
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        raise YyError("Invalid \\escape", text, pos) from None
+
+
+class _Parser:
+    def __init__(self, text, out):
+        self.text = text
+        self.out = out
+
+    def ws(self, pos):
+        return _WS.match(self.text, pos).end()
+
+    def string(self, pos):
+        m = _STRING.match(self.text, pos)
+        if m is None:
+            raise YyError("Unterminated or invalid string", self.text, pos)
+        return _unescape(m.group(1), self.text, pos), m.end()
+
+    def value(self, pos):
+        """(value, end) of the JSON value at `pos`, leading whitespace skipped."""
+        text = self.text
+        pos = self.ws(pos)
+        ch = text[pos:pos + 1]
+        if ch == '"':
+            return self.string(pos)
+        if ch == "{":
+            return self.object(pos)
+        if ch == "[":
+            items = []
+
+            def item(p):
+                value, end = self.value(p)
+                items.append(value)
+                return end
+            return items, self.sequence(pos, "]", item)
+        m = _LITERAL.match(text, pos)
+        if m:
+            return _LITERALS[m.group()], m.end()
+        m = _NUMBER.match(text, pos)
+        if m:
+            num = m.group()
+            return (float(num) if any(c in num for c in ".eE") else int(num)), m.end()
+        raise YyError("Expecting value", text, pos)
+
+    def object(self, pos, member=None):
+        """(dict, end) of the object at `pos`. With `member(key, pos) -> end` the members are
+        handed to it instead and the dict stays empty."""
+        obj = {}
+
+        def one(p):
+            if not self.text.startswith('"', p):
+                raise YyError("Expecting property name enclosed in double quotes", self.text, p)
+            key, p = self.string(p)
+            p = self.ws(p)
+            if not self.text.startswith(":", p):
+                raise YyError("Expecting ':' delimiter", self.text, p)
+            if member is not None:
+                return member(key, p + 1)
+            obj[key], p = self.value(p + 1)
+            return p
+        return obj, self.sequence(pos, "}", one)
+
+    def sequence(self, pos, close, one):
+        """Walk the container opening at `pos`; `one(p)` consumes an element and returns its end.
+        Returns the offset after the closing bracket."""
+        text = self.text
+        pos = self.ws(pos + 1)
+        if text.startswith(close, pos):
+            return pos + 1
+        while True:
+            pos = self.ws(one(pos))
+            if text.startswith(close, pos):
+                return pos + 1
+            if not text.startswith(",", pos):
+                raise YyError("Expecting ',' delimiter" if pos < len(text) else f"Expecting '{close}'", text, pos)
+            comma = pos
+            pos = self.ws(pos + 1)
+            if text.startswith(close, pos):
+                self.out.trailing_commas.append(comma)
+                return pos + 1
+
+    def resources(self, pos):
+        """The .yyp `resources` array: (name, path) per entry in the usual shape, else the entry."""
+        pos = self.ws(pos)
+        if not self.text.startswith("[", pos):
+            raise YyError("Expecting '[' (resources)", self.text, pos)
+        items = self.out.resources = []
+
+        def one(p):
+            m = _RESOURCE.match(self.text, p)
+            if m:
+                items.append((_unescape(m.group(1), self.text, p), _unescape(m.group(2), self.text, p)))
+                return m.end()
+            value, end = self.value(p)
+            items.append(value)
+            return end
+        return self.sequence(pos, "]", one)
+
+    def skip_member(self, pos):
+        """End of the top-level member value at `pos` without building it."""
+        pos = self.ws(pos)
+        if self.text[pos:pos + 1] in ("{", "["):
+            end = self._layout_end(pos)
+            if end is not None:
+                return end
+        return self.skip(pos)
+
+    def _layout_end(self, pos):
+        """End of the container at `pos` if the next member line closes it exactly, else None.
+        None also covers anything the byte passes cannot settle (escapes, trailing commas,
+        brackets inside strings): skip() then walks the value and records where."""
+        m = _NEXT_MEMBER.search(self.text, pos)
+        if m is None:
+            return None
+        span = self.text[pos:m.start()].rstrip()
+        if span.endswith(","):
+            span = span[:-1].rstrip()
+        if not span.endswith(_CLOSE[span[0]]) or "\\" in span:
+            return None
+        data = span.encode("utf-8").translate(None, b" \t\r\n")
+        if b",]" in data or b",}" in data:
+            return None
+        # quotes and brackets only; without escapes every string is now "" unless it holds a bracket
+        skel = data.translate(None, _NOT_STRUCTURE).replace(b'""', b"")
+        if b'"' in skel or skel[-1:] != span[-1].encode():
+            return None
+        # the opener must close at the very end: the brackets between must pair up on their own
+        inner = skel[1:-1]
+        while inner:
+            shorter = inner.replace(b"{}", b"").replace(b"[]", b"")
+            if shorter == inner:
+                return None
+            inner = shorter
+        return pos + len(span)
+
+    def skip(self, pos):
+        """End of the value at `pos` without building it."""
+        text = self.text
+        pos = self.ws(pos)
+        if text[pos:pos + 1] not in ("{", "["):
+            return self.value(pos)[1]
+        stack = []
+        prev = pos
+        for m in _STRUCT.finditer(text, pos):
+            tok = m.group()
+            if tok in ("{", "["):
+                stack.append(tok)
+            elif tok in ("}", "]"):
+                if not stack or _CLOSE[stack.pop()] != tok:
+                    raise YyError("Mismatched bracket", text, m.start())
+                gap = text[prev:m.start()].rstrip()
+                if gap.endswith(","):
+                    self.out.trailing_commas.append(prev + len(gap) - 1)
+                if not stack:
+                    return m.end()
+            elif tok == '"':
+                raise YyError("Unterminated string", text, m.start())
+            prev = m.end()
+        raise YyError("Unterminated container", text, pos)
+
+
+def extract(text, wanted=(), resources=False):
+    """Extracted fields `wanted` from the top-level object of `text` (and the .yyp resource
+    list with `resources=True`); raises YyError if `text` is not (GameMaker) JSON."""
+    out = Extracted(text)
+    if resources or len(text) <= FULL_PARSE_MAX:
+        try:
+            doc = json.loads(text)
+        except ValueError:
+            doc = None    # dialect or broken: the extractor below says which, and where
+        if isinstance(doc, dict) and isinstance(doc.get("resources", []), list):
+            out.fields = {key: doc[key] for key in wanted if key in doc}
+            if resources:
+                out.resources = doc.get("resources")
+            return out
+    parser = _Parser(text, out)
+    pos = parser.ws(1 if text.startswith("\ufeff") else 0)
+    if not text.startswith("{", pos):
+        raise YyError("Expecting object", text, pos)
+
+    def member(key, pos):
+        if resources and key == "resources":
+            return parser.resources(pos)
+        if key in wanted:
+            out.fields[key], end = parser.value(pos)
+            return end
+        return parser.skip_member(pos)
+    end = parser.ws(parser.object(pos, member)[1])
+    if end != len(text):
+        raise YyError("Extra data", text, end)
+    return out
+
+
+def loads(text):
+    """The whole document as json.loads would return it, trailing commas allowed."""
+    commas = extract(text).trailing_commas
+    if commas:
+        parts, prev = [], 0
+        for pos in sorted(commas):
+            parts.append(text[prev:pos])
+            prev = pos + 1
+        parts.append(text[prev:])
+        text = "".join(parts)
+    return json.loads(text)
+
+
+def strict_note(trailing):
+    """Issue text for a file's trailing commas ([[line, col], ...] or None), or None if there are none."""
+    if not trailing:
+        return None
+    line, col = trailing[0]
+    if len(trailing) == 1:
+        return f"trailing comma at line {line} column {col}"
+    return f"{len(trailing)} trailing commas, first at line {line} column {col}"
+
+
+def _with_commas(fields, doc):
+    # kept only when present: the index holds one of these per script
+    if doc.trailing_commas:
+        fields["trailing_commas"] = [list(doc.position(p)) for p in doc.trailing_commas]
+    return fields
+
+
+def script_fields(text):
+    """What yy_integrity reads from a script .yy: {"name": ...} (+ "trailing_commas")."""
+    doc = extract(text, ("name", "Name"))
+    return _with_commas({"name": doc.fields.get("name") or doc.fields.get("Name")}, doc)
+
+
+def project_fields(text):
+    """Declared resources of a .yyp: {"declared": {path: name}, "malformed": [repr, ...], ...}."""
+    doc = extract(text, resources=True)
+    declared, malformed = {}, []
+    for res in doc.resources or []:
+        if isinstance(res, tuple):
+            name, path = res
+            res = {"id": {"name": name, "path": path}}
+        else:
+            rid = res.get("id", {}) if isinstance(res, dict) else None
+            name = rid.get("name") if isinstance(rid, dict) else None
+            path = rid.get("path") if isinstance(rid, dict) else None
+        if not name or not path:
+            malformed.append(str(res))
+            continue
+        declared[path] = name
+    return _with_commas({"declared": declared, "malformed": malformed}, doc)
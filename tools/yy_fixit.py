@@ -10,6 +10,12 @@ Usage:
   python tools/yy_fixit.py rename --script "GOAP/scripts/Animus_Planner/Animus_Planner.gml" \
        --new-folder "GOAP/scripts/Animus_PlannerV2" --new-name "Animus_PlannerV2"
 
+  # Many renames/moves at once: one CSV row per script (script,new_name[,new_folder])
+  python tools/yy_fixit.py rename --batch renames.csv
+
+  # Every code reference to an identifier (from the symbol index)
+  python tools/yy_fixit.py find-references Animus_Planner
+
   # Repair a mismatch (name/path drift); picks a source of truth (default: filesystem)
   python tools/yy_fixit.py repair --script "GOAP/scripts/Animus_Planner/Animus_Planner.gml"
 
@@ -17,10 +23,32 @@ Flags:
   --apply   actually perform changes (default is dry-run)
   --force   allow overwriting existing files (use carefully)
   --truth=[fs|yy|yyp]  choose source of truth when repairing (default fs)
+  --no-references  rename without rewriting call sites in other .gml files
 
 Exits non-zero on errors to play nice with CI.
+
+`rename --batch` is transactional: every row is checked (missing sources, clashing or
+existing destinations, a new name given twice or already taken by another resource
+in the .yyp -- the latter allowed with --force, unreadable .yy) before anything is
+touched, the renames are
+applied in memory, and each affected file (.yyp, resource_order, every .yy) is
+written once, atomically, with one backup. Moves are recorded in the git index in a
+single update (what `git mv` does, without a process per file). A failure while
+applying undoes every step taken so far.
+
+Renames also rewrite every code reference to the old name (calls, `new`, the
+function declaration itself; not comments, strings or member accesses). The
+files to touch come from the persistent symbol index (symbol_index.py), so the
+cost follows the number of references, not the size of the project.
+
+Files are read in GameMaker's JSON dialect (trailing commas allowed) and written
+back as strict JSON. `repair` decides from the extracted names alone and only
+loads the full .yy/.yyp when something has to change.
 """
-import argparse, json, pathlib, shutil, sys, time
+import argparse, csv, json, os, pathlib, shutil, subprocess, sys, time
+from lint_cache import atomic_write_text
+from symbol_index import decode, encode, scan
+from yy_extract import extract, loads
 
 ROOT = pathlib.Path(".")
 YYP_PATH = ROOT / "GOAP" / "GOAP.yyp"
@@ -32,20 +60,87 @@ def warn(msg): print(f"[WARN] {msg}")
 
 def load_json(p: pathlib.Path):
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        return loads(p.read_text(encoding="utf-8"))
+    except Exception as e:
+        die(f"Failed to read/parse JSON {p}: {e}")
+
+def load_fields(p: pathlib.Path, wanted=(), resources=False):
+    """Just the `wanted` top-level fields (and the .yyp resource list) of p, see yy_extract."""
+    try:
+        return extract(p.read_text(encoding="utf-8"), wanted, resources)
     except Exception as e:
         die(f"Failed to read/parse JSON {p}: {e}")
 
+def to_json(data) -> str:
+    return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+def backup_path(p: pathlib.Path, stamp: str) -> pathlib.Path:
+    return p.with_suffix(p.suffix + f".bak.{stamp}")
+
 def dump_json(p: pathlib.Path, data, apply_changes: bool):
     stamp = time.strftime("%Y%m%d-%H%M%S")
-    backup = p.with_suffix(p.suffix + f".bak.{stamp}")
+    backup = backup_path(p, stamp)
     if apply_changes:
         shutil.copy2(p, backup)
-        p.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        p.write_text(to_json(data), encoding="utf-8")
         info(f"Updated {p} (backup: {backup})")
     else:
         info(f"(dry-run) Would update {p} (backup would be {backup})")
 
+def dump_source(p: pathlib.Path, text: str, apply_changes: bool):
+    """dump_json for a .gml: bytes outside the rewritten spots stay as they were."""
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    backup = backup_path(p, stamp)
+    if apply_changes:
+        shutil.copy2(p, backup)
+        p.write_bytes(encode(text))
+        info(f"Updated {p} (backup: {backup})")
+    else:
+        info(f"(dry-run) Would update {p} (backup would be {backup})")
+
+# ---- call sites (symbol index) ----
+def load_symbols():
+    from animus_project import Project
+    from symbol_index import SymbolIndex
+    return SymbolIndex(Project(ROOT)).load()    # callers save() after their queries
+
+def plan_references(index, renames, moved):
+    """{path after the renames: (new text, references rewritten)} for every .gml referencing one
+    of the (old, new) names. `moved` maps root-relative paths to where the renames put them."""
+    spots = {}
+    for old, new in renames:
+        if old == new:
+            continue
+        clash = index.references(new)
+        if clash:
+            warn(f"'{new}' already appears in code in {len(clash)} file(s) (e.g. {next(iter(clash))}); check for clashes")
+        for rel, offsets in index.references(old).items():
+            spots.setdefault(rel, {})[old] = (new, offsets)
+    edits = {}
+    for rel, names in sorted(spots.items()):
+        text = decode(index.project.read_bytes(rel))
+        found = None
+        at = []
+        for old, (new, offsets) in names.items():
+            if any(text[o:o + len(old)] != old for o in offsets):
+                # the file changed since it was indexed: take the offsets from the text itself
+                found = found or scan(text)
+                offsets = found.get(old, [])
+            at.extend((o, old, new) for o in offsets)
+        parts, last = [], 0
+        for o, old, new in sorted(at):
+            parts.append(text[last:o])
+            parts.append(new)
+            last = o + len(old)
+        parts.append(text[last:])
+        edits[moved.get(rel, rel)] = ("".join(parts), len(at))
+    return edits
+
+def print_references(edits):
+    if edits:
+        count = sum(n for _text, n in edits.values())
+        print(f"Rewrite {count} reference(s) in {len(edits)} .gml file(s)")
+
 def rel_to_project(p: pathlib.Path) -> str:
     return p.relative_to(YYP_PATH.parent).as_posix()
 
@@ -64,6 +159,15 @@ def yyp_find_resource(yyp, script_yy_rel: str):
             return res
     return None
 
+def yyp_find_extracted(resources, script_yy_rel: str):
+    """yyp_find_resource over an extracted resource list: the resource as a dict, or None."""
+    for res in resources or []:
+        if isinstance(res, tuple):
+            res = {"id": {"name": res[0], "path": res[1]}}
+        if res.get("id", {}).get("path") == script_yy_rel:
+            return res
+    return None
+
 def ensure_resource_order_has(path_rel: str, apply_changes: bool):
     if not ORDER_PATH.exists():
         warn(f"{ORDER_PATH} not found; skipping order update.")
@@ -84,7 +188,6 @@ def cmd_git_mv(src: pathlib.Path, dst: pathlib.Path, apply_changes: bool, force:
     dst.parent.mkdir(parents=True, exist_ok=True)
     if apply_changes:
         try:
-            import subprocess
             subprocess.run(["git", "mv", str(src), str(dst)], check=True)
             info(f"git mv {src} -> {dst}")
         except Exception:
@@ -93,7 +196,8 @@ def cmd_git_mv(src: pathlib.Path, dst: pathlib.Path, apply_changes: bool, force:
     else:
         info(f"(dry-run) Would move {src} -> {dst}")
 
-def rename_script(script_gml: pathlib.Path, new_folder: pathlib.Path, new_name: str, apply_changes: bool, force: bool):
+def rename_script(script_gml: pathlib.Path, new_folder: pathlib.Path, new_name: str, apply_changes: bool, force: bool,
+                  references: bool = True):
     old_gml = script_gml
     old_yy = find_script_pair(old_gml)
     if old_yy is None or not old_yy.exists():
@@ -103,17 +207,25 @@ def rename_script(script_gml: pathlib.Path, new_folder: pathlib.Path, new_name:
     new_gml = new_dir / f"{new_name}.gml"
     new_yy  = new_dir / f"{new_name}.yy"
 
+    edits = {}
+    if references:
+        index = load_symbols()
+        moved = {index.project.rel(str(old_gml)): index.project.rel(str(new_gml))}
+        edits = plan_references(index, [(old_gml.stem, new_name)], moved)
+        index.save()
+
     print("=== PLAN ===")
     print(f"Move {old_gml} -> {new_gml}")
     print(f"Move {old_yy} -> {new_yy}")
     print("Update Script.yy: field `name`")
     print("Update GOAP.yyp:   id.path & id.name")
     if ORDER_PATH.exists(): print("Ensure GOAP.resource_order contains new path")
+    print_references(edits)
 
     cmd_git_mv(old_gml, new_gml, apply_changes, force)
     cmd_git_mv(old_yy, new_yy, apply_changes, force)
 
-    yy_json = load_json(new_yy)
+    yy_json = load_json(new_yy if apply_changes else old_yy)    # a dry run moved nothing
     yy_json["name"] = new_name
     dump_json(new_yy, yy_json, apply_changes)
 
@@ -133,17 +245,18 @@ def rename_script(script_gml: pathlib.Path, new_folder: pathlib.Path, new_name:
 
     ensure_resource_order_has(new_rel, apply_changes)
 
+    for rel, (text, _count) in edits.items():
+        dump_source(ROOT / rel, text, apply_changes)
+
 def repair(script_gml: pathlib.Path, truth: str, apply_changes: bool, force: bool):
     yy = find_script_pair(script_gml)
     if not yy or not yy.exists():
         die("Repair requires a Script.yy next to the .gml")
 
-    yyp = load_json(YYP_PATH)
-    yy_json = load_json(yy)
     fs_name = script_gml.stem
-    yy_name = yy_json.get("name", "")
+    yy_name = load_fields(yy, ("name",)).fields.get("name", "")
     rel = rel_to_project(yy)
-    res = yyp_find_resource(yyp, rel)
+    res = yyp_find_extracted(load_fields(YYP_PATH, resources=True).resources, rel)
 
     if truth == "fs":
         desired_name = fs_name
@@ -160,6 +273,11 @@ def repair(script_gml: pathlib.Path, truth: str, apply_changes: bool, force: boo
         info("Nothing to repair; names and paths are aligned.")
         return
 
+    # something changes: now load the full documents
+    yyp = load_json(YYP_PATH)
+    yy_json = load_json(yy)
+    res = yyp_find_resource(yyp, rel)
+
     print("=== PLAN (repair) ===")
     if fs_name != desired_name:
         print(f"Rename file stems to '{desired_name}'")
@@ -186,14 +304,301 @@ def repair(script_gml: pathlib.Path, truth: str, apply_changes: bool, force: boo
 
     ensure_resource_order_has(rel, apply_changes)
 
+# ---- rename --batch ----
+def read_mapping(path: pathlib.Path):
+    """(script .gml, new name, new folder or None) per CSV row; a `script,...` header,
+    blank lines and `#` comments are skipped."""
+    try:
+        text = path.read_text(encoding="utf-8-sig")
+    except OSError as e:
+        die(f"Cannot read mapping {path}: {e}")
+    rows = []
+    for lineno, row in enumerate(csv.reader(text.splitlines()), 1):
+        row = [c.strip() for c in row]
+        if not row or not any(row) or row[0].startswith("#"):
+            continue
+        if lineno == 1 and row[0].lower() == "script":
+            continue
+        if len(row) < 2 or not row[0] or not row[1] or len(row) > 3:
+            die(f"{path}:{lineno}: expected script,new_name[,new_folder], got {row}")
+        folder = pathlib.Path(row[2]) if len(row) == 3 and row[2] else None
+        rows.append((pathlib.Path(row[0]), row[1], folder))
+    if not rows:
+        die(f"No renames in {path}")
+    return rows
+
+class Transaction:
+    """Undo journal for a batch: each step records how to take itself back."""
+
+    def __init__(self, stamp: str):
+        self.stamp = stamp
+        self.undo = []
+
+    def move(self, src: pathlib.Path, dst: pathlib.Path):
+        made = []
+        parent = dst.parent
+        while not parent.exists():
+            made.append(parent)
+            parent = parent.parent
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(src, dst)
+
+        def back():
+            os.replace(dst, src)
+            for d in made:            # innermost first
+                try:
+                    d.rmdir()
+                except OSError:
+                    break
+        self.undo.append(back)
+
+    def write(self, p: pathlib.Path, text: str):
+        """Atomic write of p with one backup beside it; undo puts the original back."""
+        backup = backup_path(p, self.stamp)
+        shutil.copy2(p, backup)
+        self.undo.append(lambda: os.replace(backup, p))
+        atomic_write_text(p, text, errors="surrogateescape")    # .gml text comes from symbol_index.decode
+        shutil.copymode(backup, p)    # the temp file was created 0600
+        info(f"Updated {p} (backup: {backup})")
+
+    def rollback(self):
+        for step in reversed(self.undo):
+            try:
+                step()
+            except OSError as e:
+                warn(f"Rollback step failed: {e}")
+        self.undo.clear()
+
+def git_index_entries(paths):
+    """(top-level prefix of the cwd, {path: (mode, sha)} for the tracked ones), or None outside a
+    git work tree. Paths are as given; unmerged entries are refused."""
+    try:
+        prefix = subprocess.run(["git", "rev-parse", "--show-prefix"], capture_output=True, check=True,
+                                text=True).stdout.strip()
+        out = subprocess.run(["git", "ls-files", "-s", "-z", "--"] + [str(p) for p in paths],
+                             capture_output=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    wanted = {os.path.normpath(str(p)).replace(os.sep, "/"): p for p in paths}
+    entries = {}
+    for rec in out.decode("utf-8").split("\0"):
+        if not rec:
+            continue
+        meta, path = rec.split("\t", 1)
+        mode, sha, stage = meta.split()
+        if stage != "0":
+            die(f"{path} has unresolved merge conflicts; resolve them before renaming")
+        if path in wanted:
+            entries[wanted[path]] = (mode, sha)
+    return prefix, entries
+
+def git_stage_moves(prefix, entries, moves):
+    """Move index entries like `git mv`, all in one `git update-index --index-info`."""
+    def top(p):
+        # --index-info paths are relative to the top of the work tree, not the cwd
+        return prefix + os.path.normpath(str(p)).replace(os.sep, "/")
+    records = []
+    for src, dst in moves:
+        if src not in entries:
+            continue
+        mode, sha = entries[src]
+        records.append(f"0 {'0' * len(sha)}\t{top(src)}")
+        records.append(f"{mode} {sha}\t{top(dst)}")
+    if records:
+        subprocess.run(["git", "update-index", "-z", "--index-info"],
+                       input=("\0".join(records) + "\0").encode("utf-8"), check=True)
+        info(f"git index: {len(records) // 2} file(s) moved in one update")
+
+def rename_batch(mapping: pathlib.Path, apply_changes: bool, force: bool, references: bool = True):
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    rows = read_mapping(mapping)
+
+    # ---- plan and check everything before touching anything ----
+    def key(p):
+        return os.path.normpath(str(p))
+    conflicts, plan = [], []
+    sources, targets = {}, {}
+    for gml, new_name, new_folder in rows:
+        yy = gml.with_suffix(".yy")
+        new_dir = new_folder if new_folder else gml.parent
+        new_gml, new_yy = new_dir / f"{new_name}.gml", new_dir / f"{new_name}.yy"
+        if not gml.exists():
+            conflicts.append(f"Script .gml not found: {gml}")
+        if not yy.exists():
+            conflicts.append(f"Script .yy not found: {yy}")
+        if key(gml) in sources:
+            conflicts.append(f"{gml} is renamed twice")
+        sources[key(gml)] = sources[key(yy)] = gml
+        plan.append((gml, yy, new_gml, new_yy, new_name))
+    for gml, yy, new_gml, new_yy, _name in plan:
+        for src, dst in ((gml, new_gml), (yy, new_yy)):
+            if key(src) == key(dst):
+                continue
+            if key(dst) in targets:
+                conflicts.append(f"{dst} is the destination of both {targets[key(dst)]} and {src}")
+            targets[key(dst)] = src
+            if key(dst) in sources:
+                conflicts.append(f"{dst} is renamed by this batch as well; chained renames need two batches")
+            elif dst.exists() and not force:
+                conflicts.append(f"Destination exists: {dst} (use --force to overwrite)")
+
+    # resource names: GameMaker needs them unique, and the reference rewrite would merge the
+    # call sites of two scripts given the same name
+    yyp = load_json(YYP_PATH)
+    names = {}
+    for res in yyp.get("resources", []):
+        rid = res.get("id") if isinstance(res, dict) else None
+        if isinstance(rid, dict) and isinstance(rid.get("name"), str):
+            names.setdefault(rid["name"].casefold(), rid["name"])
+    renamed = {gml.stem.casefold() for gml, *_ in plan}
+    wanted = {}
+    for gml, _yy, _new_gml, _new_yy, new_name in plan:
+        folded = new_name.casefold()
+        if folded in wanted:
+            conflicts.append(f"{new_name} is the new name of both {wanted[folded]} and {gml}")
+            continue
+        wanted[folded] = gml
+        if folded == gml.stem.casefold():
+            continue
+        if folded in renamed:
+            conflicts.append(f"{new_name} is renamed by this batch as well; chained renames need two batches")
+        elif folded in names and not force:
+            conflicts.append(f"A resource named {names[folded]} already exists (use --force to rename anyway)")
+
+    yy_docs = {}
+    for gml, yy, *_ in plan:
+        if yy.exists():
+            try:
+                yy_docs[key(yy)] = loads(yy.read_text(encoding="utf-8"))
+            except Exception as e:
+                conflicts.append(f"Failed to read/parse JSON {yy}: {e}")
+    if conflicts:
+        for c in conflicts:
+            print(f"[FAIL] {c}")
+        die(f"{len(conflicts)} conflict(s) in {mapping}; nothing was changed")
+
+    by_path = {}
+    for res in yyp.get("resources", []):
+        rid = res.get("id") if isinstance(res, dict) else None
+        if isinstance(rid, dict) and rid.get("path"):
+            by_path.setdefault(rid["path"], res)
+    order_lines = None
+    if ORDER_PATH.exists():
+        order_lines = [ln.strip() for ln in ORDER_PATH.read_text(encoding="utf-8").splitlines()]
+    order_set = set(order_lines or ())
+    order_added = []
+    dropped = set()
+
+    # ---- apply in memory ----
+    moves, yy_out = [], []
+    for gml, yy, new_gml, new_yy, new_name in plan:
+        for src, dst in ((gml, new_gml), (yy, new_yy)):
+            if key(src) != key(dst):
+                moves.append((src, dst))
+        doc = yy_docs[key(yy)]
+        doc["name"] = new_name
+        yy_out.append((new_yy, doc))
+        old_rel, new_rel = rel_to_project(yy), rel_to_project(new_yy)
+        res = by_path.pop(old_rel, None) or by_path.pop(new_rel, None)
+        if res and new_rel in by_path:
+            # --force over another script: its entry goes with its files
+            dropped.add(id(by_path.pop(new_rel)))
+        if not res:
+            warn(f"Resource for {old_rel} not found in .yyp; creating new entry")
+            res = {"id": {"name": new_name, "path": new_rel}}
+            yyp.setdefault("resources", []).append(res)
+        else:
+            res["id"]["name"] = new_name
+            res["id"]["path"] = new_rel
+        by_path[new_rel] = res
+        if order_lines is not None and new_rel not in order_set:
+            order_set.add(new_rel)
+            order_added.append(new_rel)
+
+    if dropped:
+        yyp["resources"] = [res for res in yyp["resources"] if id(res) not in dropped]
+
+    edits = {}
+    if references:
+        index = load_symbols()
+        rel = index.project.rel
+        moved = {rel(str(src)): rel(str(dst)) for src, dst in moves}
+        edits = plan_references(index, [(gml.stem, name) for gml, _yy, _g, _y, name in plan], moved)
+        index.save()
+
+    print(f"=== PLAN (batch: {len(plan)} script(s) from {mapping}) ===")
+    for src, dst in moves:
+        print(f"Move {src} -> {dst}")
+    print(f"Update {len(yy_out)} Script.yy `name` field(s)")
+    print(f"Update GOAP.yyp: id.path & id.name ({len(plan)} resource(s)), written once")
+    if order_lines is None:
+        warn(f"{ORDER_PATH} not found; skipping order update.")
+    elif order_added:
+        print(f"Add {len(order_added)} path(s) to GOAP.resource_order, written once")
+    print_references(edits)
+
+    if not apply_changes:
+        info(f"(dry-run) Would move {len(moves)} file(s) and write {len(yy_out) + 1 + bool(order_added) + len(edits)} file(s) "
+             f"(backups would be *.bak.{stamp})")
+        return
+
+    index = git_index_entries([src for src, _dst in moves]) if moves else None
+    tx = Transaction(stamp)
+    try:
+        for src, dst in moves:
+            if dst.exists():
+                # --force: the overwritten file is set aside (and restored on rollback)
+                tx.move(dst, backup_path(dst, f"overwritten.{stamp}"))
+            tx.move(src, dst)
+        info(f"Moved {len(moves)} file(s)")
+        for p, doc in yy_out:
+            tx.write(p, to_json(doc))
+        tx.write(YYP_PATH, to_json(yyp))
+        if order_added:
+            tx.write(ORDER_PATH, "\n".join(order_lines + order_added) + "\n")
+            info(f"Added {len(order_added)} path(s) to resource_order")
+        for rel, (text, _count) in edits.items():
+            tx.write(ROOT / rel, text)
+        if index is not None:
+            git_stage_moves(*index, moves)
+    except (OSError, subprocess.CalledProcessError) as e:
+        tx.rollback()
+        die(f"Batch rename failed ({e}); every change was rolled back")
+
+def decode_shown(text: str) -> str:
+    # undecodable bytes (kept as surrogates for the rewrite) print as U+FFFD
+    return encode(text).decode("utf-8", "replace")
+
+def find_references(name: str):
+    from line_index import LineIndex
+    index = load_symbols()
+    refs = index.references(name)
+    index.save()
+    for rel, offsets in refs.items():
+        text = decode(index.project.read_bytes(rel))
+        lines = LineIndex(text)
+        for o in offsets:
+            line = lines.line_of(o)
+            start = text.rfind("\n", 0, o) + 1
+            end = text.find("\n", o)
+            shown = decode_shown(text[start:end if end >= 0 else len(text)].strip())
+            print(f"{rel}:{line}:{o - start + 1}: {shown}")
+    stats = index.stats()
+    info(f"{sum(map(len, refs.values()))} reference(s) to {name} in {len(refs)} file(s) "
+         f"({stats['lexed']} file(s) re-indexed)")
+
 def main():
     ap = argparse.ArgumentParser()
     sub = ap.add_subparsers(dest="cmd", required=True)
 
-    a = sub.add_parser("rename", help="move/rename a script")
-    a.add_argument("--script", required=True, help="Path to .gml")
-    a.add_argument("--new-name", required=True, help="New stem (without extension)")
+    a = sub.add_parser("rename", help="move/rename a script (or many, with --batch)")
+    a.add_argument("--script", help="Path to .gml")
+    a.add_argument("--new-name", help="New stem (without extension)")
     a.add_argument("--new-folder", default=None, help="Optional new folder for the script")
+    a.add_argument("--batch", default=None, metavar="MAPPING.CSV",
+                   help="CSV of script,new_name[,new_folder] rows, applied as one transaction")
+    a.add_argument("--no-references", dest="references", action="store_false",
+                   help="do not rewrite call sites of the renamed scripts")
     a.add_argument("--apply", action="store_true")
     a.add_argument("--force", action="store_true")
 
@@ -203,12 +608,27 @@ def main():
     r.add_argument("--apply", action="store_true")
     r.add_argument("--force", action="store_true")
 
+    f = sub.add_parser("find-references", help="list every code reference to an identifier (symbol index)")
+    f.add_argument("name")
+
     args = ap.parse_args()
+
+    if args.cmd == "find-references":
+        find_references(args.name)
+        return
+
+    if args.cmd == "rename" and args.batch:
+        if args.script or args.new_name or args.new_folder:
+            ap.error("--batch takes the scripts from the CSV; drop --script/--new-name/--new-folder")
+        rename_batch(pathlib.Path(args.batch), args.apply, args.force, args.references)
+        return
+    if args.cmd == "rename" and not (args.script and args.new_name):
+        ap.error("rename needs --script and --new-name (or --batch)")
     script = pathlib.Path(args.script)
 
     if args.cmd == "rename":
         new_folder = pathlib.Path(args.new_folder) if args.new_folder else None
-        rename_script(script, new_folder, args.new_name, args.apply, args.force)
+        rename_script(script, new_folder, args.new_name, args.apply, args.force, args.references)
     else:
         repair(script, args.truth, args.apply, args.force)
 
@@ -0,0 +1,134 @@
+"""Persistent index of the GameMaker resource files (`.animus_cache/yy_index.json`).
+
+yy_integrity needs a few fields from every script .yy, the .yyp resource list
+and the resource_order listing (see yy_extract.py). Parsing all of them costs seconds on a large
+project, while a typical run changes a handful. The index keeps, per
+root-relative path, the file's mtime, size and the fields extracted from it:
+  { "fingerprint": <tool hash>, "entries": { path: [mtime_ns, size, {fields}] },
+    "dirs": { dir: [mtime_ns, file names, subdir names] } }
+A file whose mtime and size still match is answered from the index; anything
+else is parsed again and re-recorded. "dirs" lets the Project walk skip
+reading directories whose mtime is unchanged (Project.use_listings). Files
+written in the last couple of seconds are not recorded: a second edit in the
+same mtime tick that keeps the size would otherwise go unnoticed (git's
+"racy clean" problem).
+
+Staged runs read blobs from the git index, which have no mtime, so there the
+index is bypassed and every file is parsed.
+"""
+import json
+import os
+import pathlib
+import time
+
+from animus_project import RACY_NS
+from lint_cache import atomic_write_text, digest_files
+
+INDEX_VERSION = 2
+
+
+class ResourceIndex:
+    def __init__(self, project, path, persistent=True):
+        self.project = project
+        self.path = pathlib.Path(path)
+        # staged blobs have no mtime to validate against
+        self.persistent = persistent and not project.staged
+        # field extraction lives in yy_extract.py; a new version of either re-parses everything
+        here = pathlib.Path(__file__).resolve().parent
+        self.fingerprint = digest_files([here / "yy_index.py", here / "yy_extract.py"]) + f":{INDEX_VERSION}"
+        self.entries = {}
+        self.dirs = {}
+        self.dirty = False
+        self.hits = 0
+        self.parsed = 0
+
+    def load(self):
+        if not self.persistent:
+            return self
+        try:
+            doc = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            doc = None
+        if isinstance(doc, dict) and doc.get("fingerprint") == self.fingerprint:
+            self.entries = doc.get("entries", {}) or {}
+            self.dirs = doc.get("dirs", {}) or {}
+        else:
+            self.dirty = self.path.exists()
+        self.project.use_listings(self.dirs)
+        return self
+
+    def fields(self, path, parse):
+        """parse(path)'s fields for `path`, from the index while the file is unchanged;
+        raises what parse raises."""
+        fields = self.fields_many([path], parse, jobs=1)[path]
+        if isinstance(fields, Exception):
+            raise fields
+        return fields
+
+    def fields_many(self, paths, parse, jobs=0):
+        """{path: fields} for several files, with the exception parse raised in place of the
+        fields of a file it rejected (those are never recorded). Files the index cannot answer
+        are parsed on a pool of `jobs` threads (0: one per CPU, 1: in this thread)."""
+        out, todo = {}, []
+        for path in paths:
+            st = self.project.stat(path) if self.persistent else None
+            entry = self.entries.get(self.project.rel(path)) if st is not None else None
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self.hits += 1
+                out[path] = entry[2]
+            else:
+                todo.append((path, st))
+        if not todo:
+            return out
+        self.parsed += len(todo)
+        # staged blobs: one git call here, so the workers only read memory
+        self.project.prefetch([path for path, _st in todo])
+
+        def attempt(path):
+            try:
+                return parse(path)
+            except Exception as e:
+                return e
+        workers = jobs if jobs > 0 else (os.cpu_count() or 1)
+        if workers > 1 and len(todo) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+                results = list(pool.map(attempt, [path for path, _st in todo]))
+        else:
+            results = [attempt(path) for path, _st in todo]
+
+        now = time.time_ns()
+        for (path, st), fields in zip(todo, results):
+            out[path] = fields
+            if st is None:
+                continue
+            rel = self.project.rel(path)
+            if not isinstance(fields, Exception) and now - st.st_mtime_ns > RACY_NS:
+                self.entries[rel] = [st.st_mtime_ns, st.st_size, fields]
+                self.dirty = True
+            elif rel in self.entries:
+                del self.entries[rel]
+                self.dirty = True
+        return out
+
+    def save(self):
+        if not self.persistent:
+            return
+        listings = self.project.listings
+        if listings is not None and listings != self.dirs:
+            self.dirs = listings
+            self.dirty = True
+        if not self.dirty:
+            return
+        # forget files that are gone
+        self.entries = {rel: e for rel, e in self.entries.items() if self.project.exists(rel)}
+        doc = {"fingerprint": self.fingerprint, "entries": self.entries, "dirs": self.dirs}
+        try:
+            atomic_write_text(self.path, json.dumps(doc, separators=(",", ":")))
+            self.dirty = False
+        except OSError:
+            # a read-only checkout must not fail the run
+            pass
+
+    def stats(self):
+        return {"indexed": self.hits, "parsed": self.parsed}
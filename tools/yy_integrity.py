@@ -5,18 +5,30 @@ Animus GameMaker integrity checker:
 - Validates each Script .yy vs its .gml filename & path
 - Catches orphan .gml (no .yy), orphan .yy (no .gml), and yyp references to missing files
 - Warns if resource_order is out of sync (optional)
-Exit code 1 on any violation.
+Exit code 1 on any violation. Every malformed .yy/.yyp is reported in the same run,
+and trailing commas (GameMaker's dialect, not strict JSON) are issues too.
+
+With --staged / --changed-since REF only the touched scripts are checked (staged
+contents are read from the index), but their .yyp declarations are still verified;
+touching the .yyp itself re-checks every declared resource.
+
+Parsed .yy/.yyp/resource_order fields are kept in .animus_cache/yy_index.json
+(see yy_index.py) and re-read only for files whose mtime or size changed;
+--no-cache parses everything and leaves the index alone. Only the fields the
+checks use are extracted (yy_extract.py), on a thread pool (--jobs).
 """
-import sys, json, yaml, pathlib
+import sys, pathlib, posixpath, argparse
+from animus_project import Project
+from config_cache import load_config
+from git_scope import GitError, add_scope_args, scope_from_args, glob_match
+from yy_extract import project_fields, script_fields, strict_note
+from yy_index import ResourceIndex
 
 ROOT = pathlib.Path(".")
-CFG = yaml.safe_load((ROOT / "tools" / "yy_rules.yaml").read_text())
+INDEX_PATH = ROOT / ".animus_cache" / "yy_index.json"
 
-def load_json(p):
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception as e:
-        die(f"Cannot parse JSON: {p} ({e})")
+def load_cfg():
+    return load_config(ROOT / "tools" / "yy_rules.yaml")[0]
 
 def die(msg):
     print(f"[FATAL] {msg}")
@@ -28,92 +40,184 @@ def warn(msg):
 def info(msg):
     print(f"[INFO] {msg}")
 
-yyp_path = ROOT / CFG["yyp_path"]
-if not yyp_path.exists():
-    die(f".yyp not found at {yyp_path}")
-
-yyp = load_json(yyp_path)
-
-# Collect resources declared in .yyp
-declared = {}
-for res in yyp.get("resources", []):
-    rid = res.get("id", {})
-    name = rid.get("name")
-    path = rid.get("path")
-    if not name or not path:
-        warn(f"Malformed yyp resource: {res}")
-        continue
-    declared[path] = name
-
-# Scan disk for .gml files
-gml_files = set()
-for pat in CFG["script_globs"]:
-    for p in ROOT.glob(pat):
-        if p.is_file() and p.suffix.lower() == ".gml":
-            gml_files.add(p)
-
-issues = 0
-
-def issue(msg):
-    global issues
-    issues += 1
-    print(f"[ISSUE] {msg}")
-
-# 1) For each .gml, check .yy sibling and consistency
-for gml in sorted(gml_files):
-    folder = gml.parent
-    expected_name = gml.stem
-    yy = folder / f"{expected_name}.yy"
-    if CFG.get("require_script_yy", True):
-        if not yy.exists():
-            issue(f"Missing .yy for script: {gml}")
-            continue
-        j = load_json(yy)
-        model_name = j.get("name") or j.get("Name")
-        if CFG.get("enforce_filename_matches_name", True):
-            if model_name and model_name != expected_name:
-                issue(f"Name mismatch: {yy} has name '{model_name}' but file is '{expected_name}.gml'")
-        proj_rel = yy.relative_to(yyp_path.parent).as_posix()
-        if CFG.get("enforce_path_sync", True):
-            if proj_rel not in declared:
-                issue(f".yyp does not declare script resource for: {proj_rel}")
+class Report:
+    def __init__(self):
+        self.issues = 0
+        self.entries = []    # (subject path, message), for callers that map issues to files
+
+    def issue(self, msg, path=None):
+        self.issues += 1
+        self.entries.append((path, msg))
+        print(f"[ISSUE] {msg}")
+
+def cwd_rel(p):
+    """Repo paths from GitScope are absolute; report them relative to ROOT like a full scan."""
+    try:
+        return p.relative_to(ROOT.resolve())
+    except ValueError:
+        return p
+
+def path_key(p):
+    """Sort key giving posix path strings the order sorted() gives pathlib paths."""
+    return p.split("/")
+
+def join(base, rel):
+    """`base / rel` as a posix string (what pathlib would print, for clean relative paths)."""
+    if not base:
+        return rel
+    if rel.startswith("/") or "//" in rel or rel.endswith("/") or "/./" in f"/{rel}/":
+        return (pathlib.PurePosixPath(base) / rel).as_posix()
+    return f"{base}/{rel}"
+
+def relative_to(path, base):
+    if not base:
+        return path
+    if not path.startswith(base + "/"):
+        raise ValueError(f"{path!r} is not in the subpath of {base!r}")
+    return path[len(base) + 1:]
+
+def gather_scripts(cfg, project):
+    """Touched (or all) script .gml paths, as posix strings relative to ROOT."""
+    gml_files = set()
+    scope = project.scope
+    if scope is None:
+        root = ROOT.as_posix()
+        root = "" if root == "." else root
+        for pat in cfg["script_globs"]:
+            for rel in project.glob(pat):
+                if rel.lower().endswith(".gml"):
+                    gml_files.add(join(root, rel))
+        return gml_files
+    # touched scripts: changed .gml files plus the .gml beside any changed .yy
+    for p in scope.changed_paths({".gml", ".yy"}):
+        gml = cwd_rel(p.with_suffix(".gml"))
+        if any(glob_match(gml.as_posix(), pat) for pat in cfg["script_globs"]) and project.exists(gml):
+            gml_files.add(gml.as_posix())
+    return gml_files
+
+def check_strict(report, path, fields):
+    note = strict_note(fields.get("trailing_commas"))
+    if note:
+        report.issue(f"Not strict JSON: {path} ({note})", path)
+
+def run(cfg, project=None, use_index=True, jobs=0):
+    project = project or Project(ROOT)
+    scope = project.scope
+    exists = project.exists
+    index = ResourceIndex(project, INDEX_PATH, persistent=use_index).load()
+
+    yyp_path = ROOT / cfg["yyp_path"]
+    if not exists(yyp_path):
+        die(f".yyp not found at {yyp_path}")
+    yyp_dir = yyp_path.parent.as_posix()
+    yyp_dir = "" if yyp_dir == "." else yyp_dir
+
+    report = Report()
+
+    # Collect resources declared in .yyp (None if it cannot be read: declaration checks are skipped)
+    declared = None
+    try:
+        yyp = index.fields(yyp_path, lambda p: project_fields(project.read_text(p, errors="strict")))
+    except Exception as e:
+        report.issue(f"Cannot parse JSON: {yyp_path} ({e})", yyp_path)
+    else:
+        for res in yyp["malformed"]:
+            warn(f"Malformed yyp resource: {res}")
+        check_strict(report, yyp_path, yyp)
+        declared = yyp["declared"]
+
+    # Scan disk (or the diff) for .gml files
+    gml_files = sorted(gather_scripts(cfg, project), key=path_key)
+    require_yy = cfg.get("require_script_yy", True)
+    scripts = {}
+    if require_yy:
+        scripts = index.fields_many([gml[:-4] + ".yy" for gml in gml_files if exists(gml[:-4] + ".yy")],
+                                    lambda p: script_fields(project.read_text(p, errors="strict")), jobs)
+
+    # 1) For each .gml, check .yy sibling and consistency
+    for gml in gml_files:
+        base = gml[:-4]    # every gathered path ends in ".gml"
+        expected_name = posixpath.basename(base)
+        yy = base + ".yy"
+        if require_yy:
+            if not exists(yy):
+                report.issue(f"Missing .yy for script: {gml}", gml)
+                continue
+            fields = scripts[yy]
+            if isinstance(fields, Exception):
+                report.issue(f"Cannot parse JSON: {yy} ({fields})", yy)
+                continue
+            check_strict(report, yy, fields)
+            model_name = fields["name"]
+            if cfg.get("enforce_filename_matches_name", True):
+                if model_name and model_name != expected_name:
+                    report.issue(f"Name mismatch: {yy} has name '{model_name}' but file is '{expected_name}.gml'", yy)
+            proj_rel = relative_to(yy, yyp_dir)
+            if cfg.get("enforce_path_sync", True) and declared is not None:
+                if proj_rel not in declared:
+                    report.issue(f".yyp does not declare script resource for: {proj_rel}", yy)
+                else:
+                    dec_name = declared[proj_rel]
+                    if model_name and dec_name != model_name:
+                        report.issue(f".yyp declares name '{dec_name}' but {proj_rel} has '{model_name}'", yy)
+
+    # 2) Check for orphan .yy without .gml and missing files on disk
+    res_paths = list(declared.keys()) if declared is not None else []
+    if scope is not None and not scope.is_changed(yyp_path):
+        # only the declarations whose .yy or .gml the diff touched (deletions included)
+        touched = {cwd_rel(p).with_suffix("").as_posix()
+                   for p in scope.changed_paths({".gml", ".yy"}, include_deleted=True)}
+        res_paths = [r for r in res_paths
+                     if (yyp_path.parent / r).with_suffix("").as_posix() in touched]
+    for res_path in res_paths:
+        disk_path = join(yyp_dir, res_path)
+        if not exists(disk_path):
+            if cfg.get("fail_on_missing_resource", True):
+                report.issue(f".yyp references missing file on disk: {res_path}", yyp_path)
             else:
-                dec_name = declared[proj_rel]
-                if model_name and dec_name != model_name:
-                    issue(f".yyp declares name '{dec_name}' but {proj_rel} has '{model_name}'")
-
-# 2) Check for orphan .yy without .gml and missing files on disk
-for res_path in declared.keys():
-    disk_path = (yyp_path.parent / res_path)
-    if not disk_path.exists():
-        if CFG.get("fail_on_missing_resource", True):
-            issue(f".yyp references missing file on disk: {res_path}")
+                warn(f".yyp references missing file on disk: {res_path}")
         else:
-            warn(f".yyp references missing file on disk: {res_path}")
-    else:
-        if disk_path.suffix.lower() == ".yy" and "/scripts/" in res_path:
-            stem = disk_path.stem
-            gml = disk_path.parent / f"{stem}.gml"
-            if not gml.exists():
-                issue(f"Script resource missing .gml sibling: {disk_path} expects {gml.name}")
-
-# 3) Optional: resource_order sanity
-order_path = ROOT / CFG.get("resource_order_file", "")
-if order_path and order_path.exists():
+            stem, suffix = posixpath.splitext(disk_path)
+            if suffix.lower() == ".yy" and "/scripts/" in res_path:
+                gml = stem + ".gml"
+                if not exists(gml):
+                    report.issue(f"Script resource missing .gml sibling: {disk_path} expects {posixpath.basename(gml)}", disk_path)
+
+    # 3) Optional: resource_order sanity
+    order_path = ROOT / cfg.get("resource_order_file", "")
+    if order_path and exists(order_path):
+        try:
+            # only .yy lines can match an entry below, so only those are kept
+            order_lines = set(index.fields(order_path, lambda p: {"yy_lines": [
+                ln for ln in project.lines(p) if ln.endswith(".yy")]})["yy_lines"])
+            needed = []
+            for gml in gml_files:
+                yy = gml[:-4] + ".yy"
+                if exists(yy):
+                    needed.append(relative_to(yy, yyp_dir))
+            missing = [p for p in needed if p not in order_lines]
+            for p in missing:
+                warn(f"resource_order missing entry for: {p}")
+        except Exception as e:
+            warn(f"Could not parse resource_order: {e}")
+
+    index.save()
+    return report
+
+def main():
+    ap = argparse.ArgumentParser()
+    add_scope_args(ap)
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and do not update .animus_cache/yy_index.json.")
+    ap.add_argument("--jobs", "-j", type=int, default=0, help="threads parsing .yy files (0 = one per CPU)")
+    args = ap.parse_args()
     try:
-        order_lines = [ln.strip() for ln in order_path.read_text(encoding="utf-8").splitlines() if ln.strip()]
-        needed = []
-        for gml in sorted(gml_files):
-            yy = gml.with_suffix(".yy")
-            if yy.exists():
-                proj_rel = yy.relative_to(yyp_path.parent).as_posix()
-                needed.append(proj_rel)
-        missing = [p for p in needed if p not in order_lines]
-        for p in missing:
-            warn(f"resource_order missing entry for: {p}")
-    except Exception as e:
-        warn(f"Could not parse resource_order: {e}")
+        scope = scope_from_args(args, ROOT)
+    except GitError as e:
+        die(str(e))
 
-if issues:
-    sys.exit(1)
-info("YY/YYP integrity OK.")
+    if run(load_cfg(), Project(ROOT, scope), use_index=not args.no_cache, jobs=args.jobs).issues:
+        sys.exit(1)
+    info("YY/YYP integrity OK.")
+
+if __name__ == "__main__":
+    main()